@@ -0,0 +1,246 @@
+# -*- coding: utf-8 -*-
+"""
+
+    Copyright (C) 2025 plugin.video.youtube
+
+    SPDX-License-Identifier: GPL-2.0-only
+    See LICENSES/GPL-2.0-only for more information.
+
+    Latency benchmark of IPC round trips between plugin invocations and the
+    add-on service, over the IPC socket and the notification fallback.
+
+    FILE_READ, FILE_WRITE and CHECK_SETTINGS requests are made through
+    XbmcContext.ipc_exec, as made by the add-on, with small and large JSON
+    files. The round trip time of each request over each transport is
+    reported, and compared against a saved baseline.
+
+    Usage:
+        python benchmarks/bench_ipc.py [--repeat N]
+                                       [--baseline FILE]
+                                       [--save-baseline FILE]
+                                       [--tolerance RATIO]
+"""
+
+from __future__ import absolute_import, division, print_function
+
+import argparse
+import json
+import os
+import sys
+
+import harness
+import xbmc
+
+
+# Number of entries in each JSON file, similar in size to the playback history
+# and bookmarks of a new and a long-standing profile
+SIZES = (10, 2000)
+TRANSPORTS = ('socket', 'notification')
+
+
+def get_filepath(size):
+    return xbmc.translatePath(
+        'special://temp/bench_ipc_{0}.json'.format(size)
+    )
+
+
+def create_file(size):
+    filepath = get_filepath(size)
+    if not os.path.exists(os.path.dirname(filepath)):
+        os.makedirs(os.path.dirname(filepath))
+    data = {
+        'items': {
+            'video_{0:05d}'.format(index): {
+                'play_count': 1,
+                'played_percent': 50,
+                'played_time': 123.4,
+                'total_time': 246.8,
+            }
+            for index in range(size)
+        },
+    }
+    with open(filepath, 'w') as json_file:
+        json.dump(data, json_file)
+    return filepath
+
+
+def set_transport(context, service, transport):
+    """
+    Requests are made over the IPC socket if its address is available, and
+    otherwise use notifications, with any content passed in a property
+    """
+    from youtube_plugin.kodion.constants import SERVICE_IPC_ADDRESS
+
+    ui = context.get_ui()
+    if transport == 'socket':
+        ui.set_property(SERVICE_IPC_ADDRESS,
+                        service.ipc_server.address,
+                        log_value='<redacted>')
+    else:
+        ui.clear_property(SERVICE_IPC_ADDRESS)
+
+
+def get_requests(context, filepath):
+    """Returns (name, request function) of each round trip to be timed"""
+    from youtube_plugin.kodion.constants import (
+        CHECK_SETTINGS,
+        FILE_READ,
+        FILE_WRITE,
+    )
+
+    state = {'version': None, 'count': 1}
+
+    def read():
+        version, content = context.ipc_exec(
+            FILE_READ,
+            timeout=5,
+            payload={'filepath': filepath, 'version': None},
+            raise_exc=True,
+            return_content=True,
+        )
+        if not version or not content:
+            raise RuntimeError('File not read: {0}'.format(filepath))
+        state['version'] = version
+        return len(content)
+
+    def read_unchanged():
+        version, _ = context.ipc_exec(
+            FILE_READ,
+            timeout=5,
+            payload={'filepath': filepath, 'version': state['version']},
+            raise_exc=True,
+            return_content=True,
+        )
+        # Content of the previous read may remain in the property used by
+        # the notification fallback, so only the version is checked, as in
+        # JSONStore.load
+        if version != state['version']:
+            raise RuntimeError('File changed: {0}'.format(filepath))
+        return 0
+
+    def write():
+        state['count'] += 1
+        content = json.dumps({'items': {'video_00000': {
+            'play_count': state['count'],
+        }}})
+        version = context.ipc_exec(
+            FILE_WRITE,
+            timeout=5,
+            payload={'filepath': filepath, 'update': True},
+            raise_exc=True,
+            content=content,
+        )
+        if not version:
+            raise RuntimeError('File not written: {0}'.format(filepath))
+        state['version'] = version
+        return len(content)
+
+    def check_settings():
+        if not context.ipc_exec(CHECK_SETTINGS,
+                                timeout=5,
+                                payload={'state': 'defer'},
+                                raise_exc=True):
+            raise RuntimeError('Settings check not acknowledged')
+        return 0
+
+    return (
+        ('FILE_READ', read),
+        ('FILE_READ (unchanged)', read_unchanged),
+        ('FILE_WRITE (update)', write),
+        ('CHECK_SETTINGS', check_settings),
+    )
+
+
+def run(args):
+    harness.configure(verbose=args.verbose)
+
+    from youtube_plugin.kodion.context import XbmcContext
+
+    context = XbmcContext()
+    context.init()
+    service = harness.start_service(context)
+
+    results = {}
+    rows = []
+    for size in SIZES:
+        filepath = create_file(size)
+        medians = {}
+        for name, request in get_requests(context, filepath):
+            if name == 'CHECK_SETTINGS' and size != SIZES[0]:
+                continue
+            for transport in TRANSPORTS:
+                set_transport(context, service, transport)
+                stats, _, num_bytes = harness.measure(request,
+                                                      repeat=args.repeat,
+                                                      trace_memory=False)
+                median = stats.median * 1000
+                medians[transport] = median
+                key = 'ipc.{0}.{1}.{2}'.format(
+                    transport,
+                    name.lower().replace(' ', '_').strip('()'),
+                    size,
+                )
+                results[key] = round(median, 3)
+                rows.append((
+                    name,
+                    size,
+                    transport,
+                    num_bytes,
+                    '{0:.2f}'.format(median),
+                    '{0:.2f}'.format(stats.min * 1000),
+                    '{0:.2f}'.format(stats.max * 1000),
+                    '{0:.1f}x'.format(median / medians['socket']),
+                ))
+        set_transport(context, service, 'socket')
+
+    harness.print_table(
+        'IPC round trips (ms, content in bytes)',
+        ('Request', 'Entries', 'Transport', 'Content',
+         'Median', 'Min', 'Max', 'vs socket'),
+        rows,
+    )
+
+    harness.stop_service(context, service)
+    service.flush_json_files()
+    for size in SIZES:
+        filepath = get_filepath(size)
+        if os.path.exists(filepath):
+            os.remove(filepath)
+
+    if args.save_baseline:
+        harness.save_baseline(args.save_baseline, results)
+        print('\nBaseline saved: {0}'.format(args.save_baseline))
+
+    regressions = harness.compare_baseline(
+        results,
+        harness.load_baseline(args.baseline),
+        args.tolerance,
+    )
+    if regressions:
+        harness.print_table(
+            'IPC regressions (ms)',
+            ('Benchmark', 'Expected', 'Result'),
+            [(name, '{0:.2f}'.format(expected), '{0:.2f}'.format(value))
+             for name, expected, value in regressions],
+        )
+        return 1
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[2])
+    parser.add_argument('--repeat', type=int, default=20,
+                        help='number of timed round trips of each request')
+    parser.add_argument('--baseline',
+                        help='JSON file of previous results to compare with')
+    parser.add_argument('--save-baseline',
+                        help='JSON file to save the results to')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='allowed slowdown ratio compared to the baseline')
+    parser.add_argument('--verbose', action='store_true',
+                        help='show all Kodi log output')
+    return run(parser.parse_args())
+
+
+if __name__ == '__main__':
+    sys.exit(main())
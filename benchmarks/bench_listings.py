@@ -0,0 +1,440 @@
+# -*- coding: utf-8 -*-
+"""
+
+    Copyright (C) 2025 plugin.video.youtube
+
+    SPDX-License-Identifier: GPL-2.0-only
+    See LICENSES/GPL-2.0-only for more information.
+
+    Offline benchmark of the listing pipeline, from the API responses to the
+    ListItems added to the Kodi directory.
+
+    Search results, the subscriptions feed, a playlist and a channel page are
+    listed by XbmcPlugin.run, with recorded API responses and RSS feeds served
+    by a local stand-in server. Each recorded response is scaled to the number
+    of items of the page, with unique ids for each item. Throughput in items
+    per second and peak memory of each page are reported, along with the
+    timings of each stage of the pipeline from a separate traced run.
+
+    Usage:
+        python benchmarks/bench_listings.py [--sizes N [N ...]]
+                                            [--repeat N]
+                                            [--baseline FILE]
+                                            [--save-baseline FILE]
+                                            [--tolerance RATIO]
+"""
+
+from __future__ import absolute_import, division, print_function
+
+import argparse
+import copy
+import gc
+import json
+import re
+import sys
+import xml.etree.ElementTree as ElementTree
+from math import ceil
+
+import harness
+
+
+LISTING_FIXTURES = 'listings'
+SIZES = (50, 500, 5000)
+
+# Number of entries of each RSS feed. The subscriptions feed is scaled by the
+# number of bookmarked channels, and each channel owns the videos of its feed.
+FEED_ENTRIES = 15
+
+NAMESPACES = {
+    '': 'http://www.w3.org/2005/Atom',
+    'yt': 'http://www.youtube.com/xml/schemas/2015',
+    'media': 'http://search.yahoo.com/mrss/',
+}
+
+# Placeholder API details, only used to allow API requests to be made
+API_SETTINGS = {
+    'youtube.api.key': 'AIzaSyBenchmarkBenchmarkBenchmarkBench',
+    'youtube.api.id': '123456789012-benchmarkbenchmarkbenchmarkbench',
+    'youtube.api.secret': 'GOCSPX-BenchmarkBenchmarkBenchm',
+}
+
+
+def video_id(index):
+    return 'BV{0:09d}'.format(index)
+
+
+def channel_id(index):
+    return 'UCbench{0:017d}'.format(index)
+
+
+def owner_channel_id(video_index):
+    return channel_id(video_index // FEED_ENTRIES)
+
+
+def playlist_id(index):
+    return 'PLbench{0:027d}'.format(index)
+
+
+def id_index(item_id, index_re=re.compile(r'\d+$')):
+    match = index_re.search(item_id)
+    return int(match.group(0)) if match else 0
+
+
+class ListingFixtures(object):
+    """
+    Resolver of the fixture server, returning recorded responses scaled to
+    the current page size. Responses are only generated once for each request,
+    so that the work of the server is not included in the timed runs.
+    """
+
+    def __init__(self):
+        self.size = SIZES[0]
+        self._responses = {}
+        self._templates = {
+            name: json.loads(harness.load_fixture(
+                LISTING_FIXTURES, name + '.json',
+            ).decode('utf-8'))
+            for name in ('search',
+                         'videos',
+                         'channels',
+                         'playlists',
+                         'playlist_items')
+        }
+        for prefix, uri in NAMESPACES.items():
+            ElementTree.register_namespace(prefix, uri)
+        self._feed = ElementTree.fromstring(harness.load_fixture(
+            LISTING_FIXTURES, 'feed.xml',
+        ))
+
+    def __call__(self, request):
+        key = (request.host,
+               request.path,
+               tuple(sorted(request.params.items())),
+               self.size)
+        response = self._responses.get(key)
+        if response is None:
+            response = self._resolve(request)
+            self._responses[key] = response
+        return response
+
+    def _resolve(self, request):
+        path = request.path
+        params = request.params
+        if path.startswith('/youtube/v3/'):
+            endpoint = path[len('/youtube/v3/'):]
+            if endpoint == 'search':
+                data = self._list('search', self._search_item)
+            elif endpoint == 'videos':
+                data = self._get('videos', params['id'], self._video)
+            elif endpoint == 'channels':
+                data = self._get('channels', params['id'], self._channel)
+            elif endpoint == 'playlists':
+                data = self._get('playlists', params['id'], self._playlist)
+            elif endpoint == 'playlistItems':
+                data = self._list('playlist_items', self._playlist_item)
+            else:
+                return None
+            return 200, 'application/json', json.dumps(data).encode('utf-8')
+        if path == '/feeds/videos.xml':
+            return 200, 'text/xml; charset=UTF-8', self._get_feed(
+                params['playlist_id'],
+            )
+        return None
+
+    def _list(self, name, create_item):
+        template = self._templates[name]
+        items = template['items']
+        num_items = len(items)
+        data = dict(template)
+        data['items'] = [
+            create_item(copy.deepcopy(items[index % num_items]), index)
+            for index in range(self.size)
+        ]
+        data['pageInfo'] = {
+            'totalResults': self.size * 10,
+            'resultsPerPage': self.size,
+        }
+        return data
+
+    def _get(self, name, ids, create_item):
+        template = self._templates[name]
+        items = template['items']
+        num_items = len(items)
+        data = dict(template)
+        data['items'] = [
+            create_item(copy.deepcopy(items[id_index(item_id) % num_items]),
+                        item_id)
+            for item_id in ids.split(',')
+        ]
+        data['pageInfo'] = {
+            'totalResults': len(data['items']),
+            'resultsPerPage': len(data['items']),
+        }
+        return data
+
+    @staticmethod
+    def _search_item(item, index):
+        kind = item['id']['kind']
+        if kind == 'youtube#channel':
+            # Duplicate channels are removed from the listing, so each
+            # channel result is a different channel
+            item['id']['channelId'] = channel_id(index)
+            item['snippet']['channelId'] = channel_id(index)
+            return item
+        if kind == 'youtube#video':
+            item['id']['videoId'] = video_id(index)
+        elif kind == 'youtube#playlist':
+            item['id']['playlistId'] = playlist_id(index)
+        item['snippet']['channelId'] = owner_channel_id(index)
+        return item
+
+    @staticmethod
+    def _playlist_item(item, index):
+        new_video_id = video_id(index)
+        item['id'] = 'PLI{0:045d}'.format(index)
+        item['snippet']['position'] = index
+        item['snippet']['resourceId']['videoId'] = new_video_id
+        item['snippet']['videoOwnerChannelId'] = owner_channel_id(index)
+        item['contentDetails']['videoId'] = new_video_id
+        return item
+
+    @staticmethod
+    def _video(item, item_id):
+        item['id'] = item_id
+        item['snippet']['channelId'] = owner_channel_id(id_index(item_id))
+        return item
+
+    @staticmethod
+    def _channel(item, item_id):
+        item['id'] = item_id
+        item['contentDetails']['relatedPlaylists']['uploads'] = (
+            'UU' + item_id[2:]
+        )
+        return item
+
+    @staticmethod
+    def _playlist(item, item_id):
+        item['id'] = item_id
+        return item
+
+    def _get_feed(self, feed_playlist_id):
+        root = copy.deepcopy(self._feed)
+        feed_channel_id = 'UC' + feed_playlist_id[4:]
+        offset = id_index(feed_channel_id) * FEED_ENTRIES
+        ns = {'atom': NAMESPACES[''], 'yt': NAMESPACES['yt']}
+        root.find('yt:playlistId', ns).text = feed_playlist_id
+        root.find('yt:channelId', ns).text = feed_channel_id[2:]
+        for index, entry in enumerate(root.iterfind('atom:entry', ns)):
+            new_video_id = video_id(offset + index)
+            entry.find('atom:id', ns).text = 'yt:video:' + new_video_id
+            entry.find('yt:videoId', ns).text = new_video_id
+            entry.find('yt:channelId', ns).text = feed_channel_id[2:]
+        return ElementTree.tostring(root, encoding='utf-8')
+
+
+class Listings(object):
+    """Lists each page in the same way as a plugin invocation by Kodi"""
+
+    def __init__(self, fixtures):
+        from youtube_plugin.kodion.context import XbmcContext
+        from youtube_plugin.kodion.plugin import XbmcPlugin
+        from youtube_plugin.youtube.provider import Provider
+
+        self.fixtures = fixtures
+        self.context = XbmcContext()
+        self.context.init()
+        self.plugin = XbmcPlugin()
+        self.provider = Provider()
+        self.service = harness.start_service(self.context)
+
+    def stop(self):
+        harness.stop_service(self.context, self.service)
+
+    def set_size(self, size):
+        self.fixtures.size = size
+        harness.set_settings(self.context, **{
+            'kodion.content.max_per_page': size,
+        })
+        # Subscriptions feed is created from the RSS feeds of each
+        # bookmarked channel
+        bookmarks = self.context.get_bookmarks_list()
+        bookmarks.clear()
+        for index in range(int(ceil(size / FEED_ENTRIES))):
+            # Channel bookmarks without details are stored as None
+            bookmarks.add_item(channel_id(index), str(None))
+
+    def clear_caches(self):
+        context = self.context
+        context.get_data_cache().clear()
+        context.get_function_cache().clear()
+        context.get_feed_history().clear()
+        context.get_requests_cache().clear()
+
+    def list(self, path, query=''):
+        sys.argv = [
+            'plugin://plugin.video.youtube' + path,
+            '1',
+            '?' + query if query else '',
+        ]
+        harness.clear_directory()
+        self.context.init()
+        # Garbage collection is disabled while the plugin runs, as it is
+        # when run by the plugin runner
+        gc_threshold = gc.get_threshold()
+        gc.set_threshold(0)
+        try:
+            self.plugin.run(self.provider, self.context)
+        finally:
+            gc.set_threshold(*gc_threshold)
+        directory = harness.get_directory()
+        if not directory['succeeded']:
+            raise RuntimeError('Listing failed: {0}'.format(path))
+        return len(directory['items'])
+
+
+LISTINGS = (
+    ('search', '/kodion/search/query/', 'q=benchmark'),
+    ('subscriptions', '/special/my_subscriptions/', ''),
+    ('playlist', '/playlist/{0}/'.format(playlist_id(0)), ''),
+    ('channel', '/channel/{0}/'.format(channel_id(0)), ''),
+)
+
+
+def get_stages(tracer, categories=('List response', 'Listing')):
+    """Returns (name, elapsed ms, blocks) of each stage recorded by Timings"""
+    stages = {}
+    for event in tracer._events:
+        if event['cat'] not in categories:
+            continue
+        name = event['name']
+        elapsed, blocks = stages.get(name, (0, 0))
+        stages[name] = (
+            elapsed + event['dur'] / 1000,
+            blocks + (event['args'].get('blocks') or 0),
+        )
+    return [(name, elapsed, blocks)
+            for name, (elapsed, blocks) in stages.items()]
+
+
+def run(args):
+    settings = dict(API_SETTINGS)
+    settings.update({
+        'kodion.cache.listings': 0,
+        'youtube.folder.my_subscriptions.sources': ['bookmark_channels'],
+    })
+    harness.configure(verbose=args.verbose, **settings)
+
+    fixtures = ListingFixtures()
+    server = harness.FixtureServer(fixtures).start()
+    harness.mount_fixture_server(server)
+
+    from youtube_plugin.kodion.debug import Tracer
+
+    listings = Listings(fixtures)
+
+    results = {}
+    throughput_rows = []
+    stage_rows = []
+    for size in args.sizes:
+        listings.set_size(size)
+        for name, path, query in LISTINGS:
+            for scenario, setup in (('cold', listings.clear_caches),
+                                    ('cached', None)):
+                stats, peak, num_items = harness.measure(
+                    lambda _path=path, _query=query: listings.list(_path,
+                                                                   _query),
+                    repeat=args.repeat,
+                    setup=setup,
+                )
+                # Listed items can be fewer than the page size, as items
+                # like live streams in search results are filtered out
+                if not num_items:
+                    raise RuntimeError('{0}: no items listed'.format(name))
+                key = 'listing.{0}.{1}.{2}'.format(name, size, scenario)
+                results[key] = round(stats.median * 1000, 3)
+                throughput_rows.append((
+                    name,
+                    scenario,
+                    size,
+                    num_items,
+                    '{0:.1f}'.format(stats.median * 1000),
+                    '{0:.0f}'.format(size / stats.median),
+                    '{0:.0f}'.format(peak / 1024),
+                    '{0:.1f}'.format(peak / 1024 / size),
+                ))
+
+            # Per stage timings are only recorded when debugging, so are
+            # measured separately from a cold listing
+            listings.clear_caches()
+            harness.set_debugging(True)
+            Tracer.enable()
+            try:
+                listings.list(path, query)
+                stages = get_stages(Tracer)
+            finally:
+                Tracer.enable(False)
+                harness.set_debugging(False)
+            for stage, elapsed, blocks in stages:
+                stage_rows.append((
+                    name,
+                    size,
+                    stage,
+                    '{0:.1f}'.format(elapsed),
+                    '{0:+d}'.format(blocks),
+                ))
+
+    listings.stop()
+    server.stop()
+
+    harness.print_table(
+        'Listing throughput (ms, memory in KiB)',
+        ('Listing', 'Caches', 'Size', 'Items', 'Median',
+         'Items/s', 'Peak mem', 'Per item'),
+        throughput_rows,
+    )
+    harness.print_table(
+        'Stages of cold listings'
+        ' (ms, change in allocated memory blocks)',
+        ('Listing', 'Size', 'Stage', 'Elapsed', 'Blocks'),
+        stage_rows,
+    )
+
+    if args.save_baseline:
+        harness.save_baseline(args.save_baseline, results)
+        print('\nBaseline saved: {0}'.format(args.save_baseline))
+
+    regressions = harness.compare_baseline(
+        results,
+        harness.load_baseline(args.baseline),
+        args.tolerance,
+    )
+    if regressions:
+        harness.print_table(
+            'Listing regressions (ms)',
+            ('Benchmark', 'Expected', 'Result'),
+            [(name, '{0:.1f}'.format(expected), '{0:.1f}'.format(value))
+             for name, expected, value in regressions],
+        )
+        return 1
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[2])
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES,
+                        help='number of items of each listed page')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='number of timed runs of each listing')
+    parser.add_argument('--baseline',
+                        help='JSON file of previous results to compare with')
+    parser.add_argument('--save-baseline',
+                        help='JSON file to save the results to')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='allowed slowdown ratio compared to the baseline')
+    parser.add_argument('--verbose', action='store_true',
+                        help='show all Kodi log output')
+    return run(parser.parse_args())
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,282 @@
+# -*- coding: utf-8 -*-
+"""
+
+    Copyright (C) 2025 plugin.video.youtube
+
+    SPDX-License-Identifier: GPL-2.0-only
+    See LICENSES/GPL-2.0-only for more information.
+
+    Offline replay benchmark of stream loading, from the player requests to
+    the generated MPEG-DASH manifest.
+
+    Recorded player responses, for each client used by the add-on, are served
+    by a local stand-in server. Each scenario is timed end to end, a separate
+    traced run reports the timings and allocated memory blocks of each stage,
+    and time-to-manifest is compared against a saved baseline.
+
+    Usage:
+        python benchmarks/bench_player.py [--repeat N]
+                                          [--baseline FILE]
+                                          [--save-baseline FILE]
+                                          [--tolerance RATIO]
+"""
+
+from __future__ import absolute_import, division, print_function
+
+import argparse
+import os
+import sys
+
+import harness
+
+
+VIDEO_IDS = ('dQw4w9WgXcQ', 'M8lt1AudI0x')
+PLAYER_FIXTURES = 'player'
+NEXT_FIXTURES = 'next'
+
+
+def resolve(request):
+    """Returns the recorded response for each request made by the client"""
+    path = request.path
+    if path == '/youtubei/v1/player':
+        body = request.json()
+        client_name = body['context']['client']['clientName']
+        filename = os.path.join(harness.FIXTURES_PATH,
+                                PLAYER_FIXTURES,
+                                body['videoId'],
+                                client_name + '.json')
+        if not os.path.exists(filename):
+            return 200, 'application/json', (
+                b'{"playabilityStatus":{"status":"ERROR",'
+                b'"reason":"This video is unavailable"}}'
+            )
+        with open(filename, 'rb') as fixture:
+            return 200, 'application/json', fixture.read()
+    if path == '/youtubei/v1/next':
+        body = request.json()
+        return 200, 'application/json', harness.load_fixture(
+            NEXT_FIXTURES, body['videoId'] + '.json',
+        )
+    if path.endswith('.m3u8'):
+        return 200, 'application/vnd.apple.mpegurl', harness.load_fixture(
+            PLAYER_FIXTURES, 'common', 'index.m3u8',
+        )
+    if path == '/watch':
+        return 200, 'text/html; charset=utf-8', harness.load_fixture(
+            PLAYER_FIXTURES, 'common', 'watch.html',
+        )
+    if path.endswith('/base.js'):
+        return 200, 'text/javascript', harness.load_fixture(
+            PLAYER_FIXTURES, 'common', 'base.js',
+        )
+    return None
+
+
+def clear_manifests(client):
+    path = client.BASE_PATH
+    for filename in os.listdir(path):
+        if filename.endswith(('.mpd', '.json')):
+            os.remove(os.path.join(path, filename))
+
+
+def check_streams(streams, use_mpd):
+    if not streams:
+        raise RuntimeError('No streams loaded')
+    if use_mpd and not any(stream.get('container') == 'mpd'
+                           for stream in streams):
+        raise RuntimeError('MPD manifest not generated')
+
+
+def get_stages(tracer, category='Stream info'):
+    """Returns (name, elapsed ms, blocks) of each stage recorded by Timings"""
+    stages = []
+    for event in tracer._events:
+        if event['cat'] != category:
+            continue
+        stages.append((
+            event['name'],
+            event['dur'] / 1000,
+            event['args'].get('blocks'),
+        ))
+    return stages
+
+
+def run(args):
+    harness.configure(verbose=args.verbose)
+    server = harness.FixtureServer(resolve).start()
+    harness.mount_fixture_server(server)
+
+    from youtube_plugin.kodion.context import XbmcContext
+    from youtube_plugin.kodion.debug import Tracer
+    from youtube_plugin.youtube.provider import Provider
+
+    context = XbmcContext()
+    context.init()
+    service = harness.start_service(context)
+    provider = Provider()
+    client = provider.get_client(context)
+    budget = client.STREAM_PROCESSING_BUDGET
+
+    results = {}
+    regressions = []
+    timing_rows = []
+    stage_rows = []
+    for video_id in VIDEO_IDS:
+        scenarios = (
+            ('mpd (cold)', True, lambda: clear_manifests(client)),
+            ('mpd (cached)', True, None),
+            ('progressive', False, None),
+        )
+        for scenario, use_mpd, setup in scenarios:
+            def load(_video_id=video_id, _use_mpd=use_mpd):
+                streams, _ = client.load_stream_info(_video_id,
+                                                     use_mpd=_use_mpd,
+                                                     ask_for_quality=False)
+                check_streams(streams, _use_mpd)
+                return streams
+
+            server.pop_requests()
+            stats, peak, streams = harness.measure(load,
+                                                   repeat=args.repeat,
+                                                   setup=setup)
+            num_requests = len(server.pop_requests()) // (args.repeat + 2)
+            key = 'player.{0}.{1}'.format(video_id, scenario)
+            results[key] = round(stats.median * 1000, 3)
+            timing_rows.append((
+                video_id,
+                scenario,
+                len(streams),
+                num_requests,
+                '{0:.1f}'.format(stats.median * 1000),
+                '{0:.1f}'.format(stats.min * 1000),
+                '{0:.1f}'.format(stats.max * 1000),
+                '{0:.0f}'.format(peak / 1024),
+            ))
+
+            # Per stage timings are only recorded when debugging, so are
+            # measured separately to avoid including the logging overhead
+            # in the timings above
+            if setup:
+                setup()
+            harness.set_debugging(True)
+            Tracer.enable()
+            try:
+                load()
+                stages = get_stages(Tracer)
+            finally:
+                Tracer.enable(False)
+                harness.set_debugging(False)
+            processing = 0
+            for name, elapsed, blocks in stages:
+                if not name.startswith('Player request'):
+                    processing += elapsed
+                stage_rows.append((
+                    video_id,
+                    scenario,
+                    name,
+                    '{0:.2f}'.format(elapsed),
+                    '' if blocks is None else '{0:+d}'.format(blocks),
+                ))
+            if processing > budget * 1000:
+                regressions.append((key + ' (processing budget)',
+                                    budget * 1000,
+                                    processing))
+
+    harness.print_table(
+        'Stream loading (ms, memory in KiB)',
+        ('Video', 'Scenario', 'Streams', 'Requests',
+         'Median', 'Min', 'Max', 'Peak mem'),
+        timing_rows,
+    )
+    harness.print_table(
+        'Stages (ms, change in allocated memory blocks)',
+        ('Video', 'Scenario', 'Stage', 'Elapsed', 'Blocks'),
+        stage_rows,
+    )
+
+    # Related videos are requested and added to the playlist when playback
+    # of a video starts, if autoplay of related videos is enabled
+    related_rows = []
+    for video_id in VIDEO_IDS:
+        stats, peak, related = harness.measure(
+            lambda _video_id=video_id: client.get_related_videos(_video_id),
+            repeat=args.repeat,
+        )
+        if not related or not related.get('items'):
+            raise RuntimeError('No related videos loaded')
+        results['next.{0}'.format(video_id)] = round(stats.median * 1000, 3)
+        related_rows.append((
+            video_id,
+            len(related['items']),
+            '{0:.1f}'.format(stats.median * 1000),
+            '{0:.1f}'.format(stats.min * 1000),
+            '{0:.1f}'.format(stats.max * 1000),
+            '{0:.0f}'.format(peak / 1024),
+        ))
+    harness.print_table(
+        'Related videos (ms, memory in KiB)',
+        ('Video', 'Items', 'Median', 'Min', 'Max', 'Peak mem'),
+        related_rows,
+    )
+
+    # Fetching and caching of the player JavaScript is only required when
+    # signature or nsig handling is enabled, but is timed for completeness
+    data_cache = context.get_data_cache()
+    stats, peak, player_js = harness.measure(
+        client._get_player_js,
+        repeat=args.repeat,
+        setup=data_cache.clear,
+    )
+    if not player_js:
+        raise RuntimeError('Player JavaScript not loaded')
+    results['player.player_js'] = round(stats.median * 1000, 3)
+    harness.print_table(
+        'Player JavaScript (ms, memory in KiB)',
+        ('Median', 'Min', 'Max', 'Peak mem'),
+        [('{0:.1f}'.format(stats.median * 1000),
+          '{0:.1f}'.format(stats.min * 1000),
+          '{0:.1f}'.format(stats.max * 1000),
+          '{0:.0f}'.format(peak / 1024))],
+    )
+
+    server.stop()
+    harness.stop_service(context, service)
+
+    if args.save_baseline:
+        harness.save_baseline(args.save_baseline, results)
+        print('\nBaseline saved: {0}'.format(args.save_baseline))
+
+    baseline = harness.load_baseline(args.baseline)
+    regressions.extend(harness.compare_baseline(
+        {key: value for key, value in results.items() if 'mpd' in key},
+        baseline,
+        args.tolerance,
+    ))
+    if regressions:
+        harness.print_table(
+            'Time-to-manifest regressions (ms)',
+            ('Benchmark', 'Expected', 'Result'),
+            [(name, '{0:.1f}'.format(expected), '{0:.1f}'.format(value))
+             for name, expected, value in regressions],
+        )
+        return 1
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[2])
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='number of timed runs of each scenario')
+    parser.add_argument('--baseline',
+                        help='JSON file of previous results to compare with')
+    parser.add_argument('--save-baseline',
+                        help='JSON file to save the results to')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='allowed slowdown ratio compared to the baseline')
+    parser.add_argument('--verbose', action='store_true',
+                        help='show all Kodi log output')
+    return run(parser.parse_args())
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,15 @@
+var _yt_player={};(function(g){var window=this;
+/* Stub of the YouTube player JavaScript used by the offline benchmarks.
+   Only the signature and nsig transform functions are provided, in the same
+   form as the player, so that they can be located and evaluated. */
+'use strict';
+var Xy={Zw:function(a,b){a.splice(0,b)},
+kL:function(a){a.reverse()},
+Qn:function(a,b){var c=a[0];a[0]=a[b%a.length];a[b%a.length]=c}};
+var Zy=function(a){a=a.split("");Xy.Qn(a,43);Xy.kL(a,2);Xy.Zw(a,3);Xy.Qn(a,17);Xy.kL(a,78);return a.join("")};
+var Bma=function(a){var b=a.split(""),c=[1538419286,function(d,e){e=(e%d.length+d.length)%d.length;d.splice(e,1)},
+function(d){d.reverse()},function(d,e){e=(e%d.length+d.length)%d.length;var f=d[0];d[0]=d[e];d[e]=f}];
+c[1](b,c[0]);c[2](b);c[3](b,-1427);return b.join("")};
+g.Nv=function(a,b,c){b=void 0===b?"":b;c=void 0===c?"":c;a=new URL(a);a.searchParams.set(b,Zy(c));return a.toString()};
+g.nsig=function(a){return Bma(a)};
+})(_yt_player);
@@ -0,0 +1,326 @@
+# -*- coding: utf-8 -*-
+"""
+
+    Copyright (C) 2025 plugin.video.youtube
+
+    SPDX-License-Identifier: GPL-2.0-only
+    See LICENSES/GPL-2.0-only for more information.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+import gc
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from urllib.parse import parse_qsl, urlsplit
+
+
+BENCHMARKS_PATH = os.path.dirname(os.path.abspath(__file__))
+FIXTURES_PATH = os.path.join(BENCHMARKS_PATH, 'fixtures')
+ROOT_PATH = os.path.dirname(BENCHMARKS_PATH)
+
+# Stub Kodi modules must be importable before the add-on is imported
+sys.path[0:0] = [
+    os.path.join(BENCHMARKS_PATH, 'kodi_stubs'),
+    os.path.join(ROOT_PATH, 'resources', 'lib'),
+]
+
+import _stub_state  # noqa: E402
+import xbmc  # noqa: E402
+import xbmcaddon  # noqa: E402
+
+
+def configure(verbose=False, **settings):
+    """
+    Sets the add-on settings used by the benchmark, before the add-on is
+    imported. Any setting not provided uses the default from settings.xml.
+    Kodi log output is only shown for errors, unless verbose is True.
+    """
+    # Plugin invocation arguments, as provided by Kodi
+    sys.argv = ['plugin://plugin.video.youtube/', '1', '']
+    overrides = xbmcaddon.Addon.overrides
+    # Setup wizard and API key prompts can not be answered
+    overrides['kodion.setup_wizard'] = False
+    overrides['kodion.setup_wizard.forced_runs'] = 2 ** 31 - 1
+    overrides.update(settings)
+    _stub_state.log_level = xbmc.LOGDEBUG if verbose else xbmc.LOGERROR
+
+
+def set_settings(context, **settings):
+    """
+    Changes add-on settings after the add-on has been imported. The changes
+    are applied in the same way as changes made in Kodi, with the settings
+    and client reloaded on the next invocation of the plugin.
+    """
+    from youtube_plugin.kodion.constants import CHECK_SETTINGS
+
+    xbmcaddon.Addon.overrides.update(settings)
+    if xbmcaddon.Addon._settings is not None:
+        xbmcaddon.Addon._settings.update(settings)
+    context.get_settings(refresh=True)
+    context.get_ui().set_property(CHECK_SETTINGS)
+
+
+def clear_directory():
+    _stub_state.directory.update(items=[], succeeded=None, resolved=None)
+
+
+def get_directory():
+    """
+    Returns the directory items, as tuples of (url, ListItem, is_folder),
+    the success of the listing and the resolved ListItem, as recorded by the
+    stub xbmcplugin module.
+    """
+    return _stub_state.directory
+
+
+def set_debugging(enabled):
+    """
+    Enables or disables debug logging, which also enables the per stage
+    Timings recorded by the add-on.
+    """
+    from youtube_plugin.kodion import logging
+
+    logging.getLogger().debugging = enabled
+
+
+def start_service(context):
+    """
+    Starts the IPC server of the add-on service in a background thread, so
+    that shared files are read and written through the service, as in Kodi.
+    Returns the service monitor, to be stopped with stop_service.
+    """
+    from youtube_plugin.kodion.constants import SERVICE_RUNNING_FLAG
+    from youtube_plugin.kodion.monitors.service_monitor import ServiceMonitor
+
+    monitor = ServiceMonitor(context)
+    monitor.start_ipc_server()
+    context.get_ui().set_property(SERVICE_RUNNING_FLAG)
+    return monitor
+
+
+def stop_service(context, monitor):
+    from youtube_plugin.kodion.constants import SERVICE_RUNNING_FLAG
+
+    context.get_ui().clear_property(SERVICE_RUNNING_FLAG)
+    monitor.shutdown_ipc_server()
+
+
+def load_fixture(*path):
+    with open(os.path.join(FIXTURES_PATH, *path), 'rb') as fixture:
+        return fixture.read()
+
+
+class FixtureServer(ThreadingMixIn, HTTPServer):
+    """
+    Local stand-in for the YouTube servers. Responses are provided by the
+    resolver callable, which is called with a Request for every request and
+    returns a tuple of (status, content_type, body), or None for a 404.
+    """
+
+    daemon_threads = True
+
+    class Request(object):
+        def __init__(self, method, host, path, params, body):
+            self.method = method
+            self.host = host
+            self.path = path
+            self.params = params
+            self.body = body
+
+        def json(self):
+            return json.loads(self.body.decode('utf-8')) if self.body else {}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        disable_nagle_algorithm = True
+
+        def _respond(self):
+            server = self.server
+            parts = urlsplit(self.path)
+            host, _, path = parts.path.lstrip('/').partition('/')
+            length = int(self.headers.get('Content-Length') or 0)
+            request = server.Request(
+                self.command,
+                host,
+                '/' + path,
+                dict(parse_qsl(parts.query, keep_blank_values=True)),
+                self.rfile.read(length) if length else b'',
+            )
+            with server.lock:
+                server.requests.append((request.method,
+                                        request.host,
+                                        request.path))
+            response = server.resolver(request)
+            if response:
+                status, content_type, body = response
+            else:
+                status, content_type, body = 404, 'text/plain', b'Not found'
+            # Stream URLs in recorded responses expire, so expiry times are
+            # set relative to the time of the request
+            body = body.replace(b'__EXPIRE__',
+                                str(int(time.time()) + 21540).encode('ascii'))
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            if self.command != 'HEAD':
+                self.wfile.write(body)
+
+        do_GET = do_HEAD = do_POST = _respond
+
+        def log_message(self, *args):
+            pass
+
+    def __init__(self, resolver):
+        HTTPServer.__init__(self, ('127.0.0.1', 0), self.Handler)
+        self.resolver = resolver
+        self.lock = threading.Lock()
+        self.requests = []
+        self._thread = None
+
+    @property
+    def url(self):
+        return 'http://{0}:{1}'.format(*self.server_address)
+
+    def start(self):
+        thread = threading.Thread(target=self.serve_forever)
+        thread.daemon = True
+        thread.start()
+        self._thread = thread
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def pop_requests(self):
+        with self.lock:
+            requests = self.requests
+            self.requests = []
+        return requests
+
+
+def mount_fixture_server(server):
+    """
+    Replaces the transports used by the add-on for all HTTPS requests with a
+    transport that sends each request to the fixture server instead.
+    """
+    from requests.adapters import HTTPAdapter
+    from youtube_plugin.kodion.network.requests import BaseRequestsClass
+
+    base_url = server.url
+
+    class FixtureAdapter(HTTPAdapter):
+        def send(self, request, **kwargs):
+            parts = urlsplit(request.url)
+            request.url = ''.join((
+                base_url,
+                '/',
+                parts.netloc,
+                parts.path,
+                '?' + parts.query if parts.query else '',
+            ))
+            return super(FixtureAdapter, self).send(request, **kwargs)
+
+    session = BaseRequestsClass._session
+    for host_class in session.HOST_CLASSES:
+        session.mount_transport(host_class, FixtureAdapter())
+    session.mount('http://', FixtureAdapter())
+
+
+class Stats(object):
+    """Summary statistics of repeated measurements"""
+
+    def __init__(self, values):
+        values = sorted(values)
+        self.values = values
+        self.count = len(values)
+        self.min = values[0] if values else 0
+        self.max = values[-1] if values else 0
+        self.mean = sum(values) / len(values) if values else 0
+        self.median = values[len(values) // 2] if values else 0
+
+
+def measure(func, repeat=5, warmup=1, setup=None, trace_memory=True):
+    """
+    Calls func repeat times, after warmup calls, and returns a tuple of
+    (Stats of elapsed seconds, peak traced memory in bytes, result of the last
+    call). If provided, setup is called before each call of func, and is not
+    included in the measurements. Memory is traced in a separate call so that
+    the overhead of tracemalloc is not included in the elapsed times.
+    """
+    result = None
+    for _ in range(warmup):
+        if setup:
+            setup()
+        result = func()
+
+    elapsed = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        gc.collect()
+        start = time.perf_counter()
+        result = func()
+        elapsed.append(time.perf_counter() - start)
+
+    peak = None
+    if trace_memory:
+        if setup:
+            setup()
+        gc.collect()
+        tracemalloc.start()
+        try:
+            func()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return Stats(elapsed), peak, result
+
+
+def load_baseline(path):
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path) as baseline_file:
+        return json.load(baseline_file)
+
+
+def save_baseline(path, results):
+    with open(path, 'w') as baseline_file:
+        json.dump(results, baseline_file, indent=2, sort_keys=True)
+        baseline_file.write('\n')
+
+
+def compare_baseline(results, baseline, tolerance):
+    """
+    Returns a list of (name, baseline, result) for each result that is slower
+    than its baseline value by more than the tolerance ratio.
+    """
+    regressions = []
+    for name, value in sorted(results.items()):
+        expected = baseline.get(name)
+        if expected and value > expected * (1 + tolerance):
+            regressions.append((name, expected, value))
+    return regressions
+
+
+def print_table(title, header, rows):
+    print()
+    print(title)
+    widths = [
+        max(len(str(row[column])) for row in [header] + rows)
+        for column in range(len(header))
+    ]
+    line = '  '.join('{{{0}:>{1}}}'.format(column, width)
+                     for column, width in enumerate(widths))
+    print(line.format(*header))
+    print(line.format(*('-' * width for width in widths)))
+    for row in rows:
+        print(line.format(*row))
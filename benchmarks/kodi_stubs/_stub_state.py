@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""
+Shared state of the stub Kodi modules used by the benchmarks.
+
+Only the parts of the Kodi Python API used by the add-on are implemented,
+with just enough behaviour for the add-on to run outside of Kodi.
+"""
+
+import atexit
+import os
+import shutil
+import tempfile
+
+KODI_VERSION = (21, 2)
+ISA_VERSION = '21.5.10'
+
+ROOT = os.environ.get('KODI_STUB_HOME')
+if not ROOT:
+    # Profile and temp files are discarded after each run, unless a persistent
+    # location is provided
+    ROOT = tempfile.mkdtemp(prefix='kodi_')
+    atexit.register(shutil.rmtree, ROOT, True)
+SPECIAL_PATHS = {
+    'special://home/': os.path.join(ROOT, 'home', ''),
+    'special://profile/': os.path.join(ROOT, 'userdata', ''),
+    'special://temp/': os.path.join(ROOT, 'temp', ''),
+    'special://masterprofile/': os.path.join(ROOT, 'userdata', ''),
+    'special://xbmc/': os.path.join(ROOT, 'xbmc', ''),
+}
+
+# Window properties, keyed by window id then property name
+properties = {}
+# Values returned by xbmc.getInfoLabel and xbmc.getCondVisibility
+info_labels = {
+    'System.BuildVersion': '{0}.{1} (stub)'.format(*KODI_VERSION),
+    'System.Language': 'English',
+}
+info_bools = {
+    'System.HasAddon(inputstream.adaptive)': True,
+    'System.AddonIsEnabled(inputstream.adaptive)': True,
+}
+# Values returned by the Settings.GetSettingValue JSON-RPC method
+kodi_settings = {
+    'locale.language': 'resource.language.en_gb',
+    'locale.audiolanguage': 'mediadefault',
+    'locale.subtitlelanguage': 'original',
+    'debug.showloginfo': False,
+}
+# Directory items, resolved URLs and log output recorded for inspection
+directory = {
+    'items': [],
+    'succeeded': None,
+    'resolved': None,
+}
+log_level = int(os.environ.get('KODI_STUB_LOG_LEVEL', 4))
+
+
+def translate_path(path):
+    for special, real in SPECIAL_PATHS.items():
+        if path.startswith(special):
+            return real + path[len(special):]
+    return path
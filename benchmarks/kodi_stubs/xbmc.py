@@ -0,0 +1,274 @@
+# -*- coding: utf-8 -*-
+"""Minimal stub of the Kodi xbmc module, for use by the benchmarks."""
+
+import json
+import sys
+import threading
+import time
+import weakref
+from queue import Queue
+
+import _stub_state
+
+LOGDEBUG = 0
+LOGINFO = 1
+LOGWARNING = 2
+LOGERROR = 3
+LOGFATAL = 4
+LOGNONE = 5
+
+ISO_639_1 = 0
+ISO_639_2 = 1
+ENGLISH_NAME = 2
+
+PLAYLIST_MUSIC = 0
+PLAYLIST_VIDEO = 1
+
+_abort = threading.Event()
+# Monitors receive notifications sent with JSONRPC.NotifyAll, which are
+# delivered in order from a separate thread, as in Kodi
+_monitors = weakref.WeakSet()
+_notifications = Queue()
+_dispatcher = None
+
+
+def log(msg, level=LOGDEBUG):
+    if level >= _stub_state.log_level:
+        sys.stderr.write('{0} {1}\n'.format(level, msg))
+
+
+def executebuiltin(function, wait=False):
+    pass
+
+
+def executeJSONRPC(request):
+    request = json.loads(request)
+    if isinstance(request, list):
+        return json.dumps([_jsonrpc(item) for item in request])
+    return json.dumps(_jsonrpc(request))
+
+
+def _jsonrpc(request):
+    method = request.get('method')
+    params = request.get('params') or {}
+    if method == 'Application.GetProperties':
+        result = {
+            'version': {
+                'major': _stub_state.KODI_VERSION[0],
+                'minor': _stub_state.KODI_VERSION[1],
+            },
+            'name': 'Kodi',
+        }
+    elif method == 'Settings.GetSettingValue':
+        result = {'value': _stub_state.kodi_settings.get(params.get('setting'))}
+    elif method == 'Addons.GetAddonDetails':
+        result = {'addon': {
+            'addonid': params.get('addonid'),
+            'enabled': True,
+            'version': _stub_state.ISA_VERSION,
+        }}
+    elif method == 'JSONRPC.NotifyAll':
+        _notify(params.get('sender'),
+                'Other.' + params.get('message', ''),
+                json.dumps(params.get('data')))
+        result = 'OK'
+    else:
+        result = 'OK'
+    return {'id': request.get('id'), 'jsonrpc': '2.0', 'result': result}
+
+
+def _notify(sender, method, data):
+    global _dispatcher
+
+    if not _dispatcher:
+        _dispatcher = threading.Thread(target=_dispatch)
+        _dispatcher.daemon = True
+        _dispatcher.start()
+    _notifications.put((sender, method, data))
+
+
+def _dispatch():
+    while True:
+        sender, method, data = _notifications.get()
+        for monitor in tuple(_monitors):
+            try:
+                monitor.onNotification(sender, method, data)
+            except Exception as exc:
+                log('Monitor.onNotification - {0!r}'.format(exc), LOGERROR)
+
+
+def getLocalizedString(string_id):
+    return 'String #{0}'.format(string_id)
+
+
+def getInfoLabel(label):
+    return _stub_state.info_labels.get(label, '')
+
+
+def getCondVisibility(condition):
+    return _stub_state.info_bools.get(condition, False)
+
+
+def getIPAddress():
+    return '127.0.0.1'
+
+
+def getLanguage(format=ENGLISH_NAME, region=False):
+    if format == ISO_639_1:
+        return 'en-gb' if region else 'en'
+    if format == ISO_639_2:
+        return 'eng'
+    return 'English'
+
+
+def getRegion(setting):
+    return {
+        'dateshort': '%d/%m/%Y',
+        'datelong': '%A, %d %B %Y',
+        'time': '%H:%M:%S',
+        'meridiem': '',
+        'speedunit': 'kmh',
+        'tempunit': 'C',
+    }.get(setting, '')
+
+
+def convertLanguage(language, format):
+    if format == ISO_639_2:
+        return {'en': 'eng', 'de': 'ger', 'fr': 'fre', 'es': 'spa'}.get(
+            language[:2], language
+        )
+    if format == ENGLISH_NAME:
+        return {'en': 'English', 'de': 'German', 'fr': 'French'}.get(
+            language[:2], language
+        )
+    return language[:2]
+
+
+def getGlobalIdleTime():
+    return 0
+
+
+def sleep(time_ms):
+    time.sleep(time_ms / 1000.0)
+
+
+def translatePath(path):
+    return _stub_state.translate_path(path)
+
+
+class Monitor(object):
+    def __init__(self):
+        _monitors.add(self)
+
+    def abortRequested(self):
+        return _abort.is_set()
+
+    def waitForAbort(self, timeout=None):
+        return _abort.wait(timeout)
+
+    def onNotification(self, sender, method, data):
+        pass
+
+    def onSettingsChanged(self):
+        pass
+
+
+class Player(object):
+    def isPlaying(self):
+        return False
+
+    def isPlayingVideo(self):
+        return False
+
+    def isPlayingAudio(self):
+        return False
+
+    def getPlayingFile(self):
+        raise RuntimeError('Kodi is not playing any media file')
+
+    def getTime(self):
+        return 0.0
+
+    def getTotalTime(self):
+        return 0.0
+
+    def play(self, item='', listitem=None, windowed=False, startpos=-1):
+        pass
+
+    def stop(self):
+        pass
+
+
+class PlayList(object):
+    def __init__(self, playlist):
+        self._id = playlist
+        self._items = []
+
+    def getPlayListId(self):
+        return self._id
+
+    def add(self, url, listitem=None, index=-1):
+        self._items.append((url, listitem))
+
+    def clear(self):
+        del self._items[:]
+
+    def size(self):
+        return len(self._items)
+
+    def __len__(self):
+        return len(self._items)
+
+    def getposition(self):
+        return -1
+
+    def shuffle(self):
+        pass
+
+    def unshuffle(self):
+        pass
+
+
+class Actor(object):
+    def __init__(self, name='', role='', order=-1, thumbnail=''):
+        self.name = name
+        self.role = role
+        self.order = order
+        self.thumbnail = thumbnail
+
+
+class VideoStreamDetail(object):
+    def __init__(self, width=0, height=0, aspect=0.0, duration=0, codec='',
+                 stereomode='', language='', hdrtype=''):
+        self.width = width
+        self.height = height
+        self.aspect = aspect
+        self.duration = duration
+        self.codec = codec
+        self.stereomode = stereomode
+        self.language = language
+        self.hdrtype = hdrtype
+
+
+class InfoTagVideo(object):
+    """
+    Setters store their values, so that the cost of building the info tag is
+    comparable to Kodi, without implementing each setter individually.
+    """
+
+    def __init__(self, offscreen=True):
+        self._values = {}
+
+    def __getattr__(self, name):
+        if not name.startswith(('set', 'add')):
+            raise AttributeError(name)
+        values = self._values
+
+        def _setter(*args):
+            values[name] = args
+
+        return _setter
+
+
+class InfoTagMusic(InfoTagVideo):
+    pass
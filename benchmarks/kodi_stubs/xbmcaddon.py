@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+"""
+Minimal stub of the Kodi xbmcaddon module, for use by the benchmarks.
+
+Settings of the plugin are read from the defaults in resources/settings.xml,
+and can be overridden using Addon.overrides.
+"""
+
+import os
+import re
+import xml.etree.ElementTree as ElementTree
+
+import _stub_state
+
+ADDON_ID = 'plugin.video.youtube'
+ADDON_PATH = os.path.abspath(os.path.join(
+    os.path.dirname(__file__), os.pardir, os.pardir,
+))
+
+
+def _load_defaults(path):
+    defaults = {}
+    try:
+        root = ElementTree.parse(path).getroot()
+    except (IOError, OSError, ElementTree.ParseError):
+        return defaults
+    for setting in root.iter('setting'):
+        setting_id = setting.get('id')
+        if not setting_id:
+            continue
+        setting_type = setting.get('type')
+        default = setting.findtext('default') or ''
+        if setting_type == 'boolean':
+            value = default.lower() == 'true'
+        elif setting_type == 'integer':
+            try:
+                value = int(default)
+            except ValueError:
+                value = 0
+        elif setting_type == 'list[string]':
+            value = [item for item in default.split(',') if item]
+        else:
+            value = default
+        defaults[setting_id] = value
+    return defaults
+
+
+def _load_strings(path):
+    strings = {}
+    try:
+        with open(path, encoding='utf-8') as po_file:
+            content = po_file.read()
+    except (IOError, OSError):
+        return strings
+    for match in re.finditer(r'^msgctxt "#(\d+)"\s*\nmsgid "(.*)"$',
+                             content,
+                             re.MULTILINE):
+        strings[int(match.group(1))] = (
+            match.group(2).replace('\\"', '"').replace('\\n', '\n')
+        )
+    return strings
+
+
+class Settings(object):
+    def __init__(self, values):
+        self._values = values
+
+    def getBool(self, setting_id):
+        return bool(self._values.get(setting_id, False))
+
+    def getInt(self, setting_id):
+        return int(self._values.get(setting_id, 0) or 0)
+
+    def getNumber(self, setting_id):
+        return float(self._values.get(setting_id, 0) or 0)
+
+    def getString(self, setting_id):
+        value = self._values.get(setting_id, '')
+        return value if isinstance(value, str) else str(value)
+
+    def getStringList(self, setting_id):
+        return list(self._values.get(setting_id) or ())
+
+    def setBool(self, setting_id, value):
+        self._values[setting_id] = bool(value)
+
+    def setInt(self, setting_id, value):
+        self._values[setting_id] = int(value)
+
+    def setNumber(self, setting_id, value):
+        self._values[setting_id] = float(value)
+
+    def setString(self, setting_id, value):
+        self._values[setting_id] = value
+
+    def setStringList(self, setting_id, value):
+        self._values[setting_id] = list(value)
+
+
+class Addon(object):
+    # Setting values that replace the defaults from settings.xml
+    overrides = {}
+
+    _settings = None
+    _strings = None
+    _other_addons = {
+        'inputstream.adaptive': {
+            'version': _stub_state.ISA_VERSION,
+            'settings': {'STREAMSELECTION': '0'},
+        },
+        'script.module.requests': {'version': '2.31.0', 'settings': {}},
+    }
+
+    def __init__(self, id=ADDON_ID):
+        self._id = id
+        if id == ADDON_ID:
+            if Addon._settings is None:
+                values = _load_defaults(os.path.join(
+                    ADDON_PATH, 'resources', 'settings.xml',
+                ))
+                values.update(self.overrides)
+                Addon._settings = values
+            self._values = Addon._settings
+            manifest = ElementTree.parse(
+                os.path.join(ADDON_PATH, 'addon.xml')
+            ).getroot()
+            self._info = {
+                'id': ADDON_ID,
+                'name': manifest.get('name'),
+                'version': manifest.get('version'),
+                'path': ADDON_PATH,
+                'profile': 'special://profile/addon_data/' + ADDON_ID,
+                'icon': os.path.join(ADDON_PATH, 'resources', 'media',
+                                     'icon.png'),
+                'fanart': os.path.join(ADDON_PATH, 'resources', 'media',
+                                       'fanart.jpg'),
+            }
+        elif id in self._other_addons:
+            details = self._other_addons[id]
+            self._values = details['settings']
+            self._info = {'id': id, 'name': id, 'version': details['version']}
+        else:
+            raise RuntimeError('Unknown addon id {0!r}'.format(id))
+
+    def getAddonInfo(self, info_id):
+        return self._info.get(info_id, '')
+
+    def getLocalizedString(self, string_id):
+        if self._id != ADDON_ID:
+            return ''
+        if Addon._strings is None:
+            Addon._strings = _load_strings(os.path.join(
+                ADDON_PATH,
+                'resources',
+                'language',
+                'resource.language.en_gb',
+                'strings.po',
+            ))
+        return Addon._strings.get(string_id, '')
+
+    def getSettings(self):
+        return Settings(self._values)
+
+    def getSetting(self, setting_id):
+        value = self._values.get(setting_id, '')
+        if isinstance(value, bool):
+            return 'true' if value else 'false'
+        if isinstance(value, list):
+            return ','.join(value)
+        return str(value)
+
+    def setSetting(self, setting_id, value):
+        self._values[setting_id] = value
+
+    def getSettingBool(self, setting_id):
+        return Settings(self._values).getBool(setting_id)
+
+    def getSettingInt(self, setting_id):
+        return Settings(self._values).getInt(setting_id)
+
+    def getSettingString(self, setting_id):
+        return Settings(self._values).getString(setting_id)
+
+    def openSettings(self):
+        pass
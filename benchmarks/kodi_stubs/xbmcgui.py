@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+"""Minimal stub of the Kodi xbmcgui module, for use by the benchmarks."""
+
+import xbmc
+import _stub_state
+
+INPUT_ALPHANUM = 0
+INPUT_NUMERIC = 1
+NOTIFICATION_INFO = 'info'
+NOTIFICATION_WARNING = 'warning'
+NOTIFICATION_ERROR = 'error'
+
+
+def getCurrentWindowId():
+    return 10025
+
+
+def getCurrentWindowDialogId():
+    return 9999
+
+
+class Window(object):
+    def __init__(self, existingWindowId=-1):
+        self._properties = _stub_state.properties.setdefault(
+            existingWindowId, {}
+        )
+
+    def getProperty(self, key):
+        return self._properties.get(key.lower(), '')
+
+    def setProperty(self, key, value):
+        self._properties[key.lower()] = value
+
+    def clearProperty(self, key):
+        self._properties.pop(key.lower(), None)
+
+    def clearProperties(self):
+        self._properties.clear()
+
+
+class Dialog(object):
+    def notification(self, heading, message, icon='', time=0, sound=True):
+        pass
+
+    def ok(self, heading, message):
+        return True
+
+    def yesno(self, heading, message, *args, **kwargs):
+        return False
+
+    def yesnocustom(self, heading, message, *args, **kwargs):
+        return -1
+
+    def select(self, heading, items, *args, **kwargs):
+        return -1
+
+    def multiselect(self, heading, options, *args, **kwargs):
+        return None
+
+    def contextmenu(self, items):
+        return -1
+
+    def input(self, heading, defaultt='', type=INPUT_ALPHANUM, *args,
+              **kwargs):
+        return ''
+
+    def numeric(self, type, heading, defaultt='', *args, **kwargs):
+        return ''
+
+    def textviewer(self, heading, text, usemono=False):
+        pass
+
+    def browse(self, type, heading, shares, *args, **kwargs):
+        return ''
+
+
+class DialogProgress(object):
+    def create(self, heading, message=''):
+        pass
+
+    def update(self, percent, message=''):
+        pass
+
+    def iscanceled(self):
+        return False
+
+    def close(self):
+        pass
+
+
+class DialogProgressBG(DialogProgress):
+    def update(self, percent=0, heading=None, message=None):
+        pass
+
+    def isFinished(self):
+        return False
+
+
+class ListItem(object):
+    def __init__(self, label='', label2='', path='', offscreen=False):
+        self._label = label
+        self._label2 = label2
+        self._path = path
+        self._art = {}
+        self._properties = {}
+        self._context_menu = []
+        self._info = {}
+        self._video_info_tag = None
+        self._music_info_tag = None
+
+    def getLabel(self):
+        return self._label
+
+    def setLabel(self, label):
+        self._label = label
+
+    def getLabel2(self):
+        return self._label2
+
+    def setLabel2(self, label):
+        self._label2 = label
+
+    def getPath(self):
+        return self._path
+
+    def setPath(self, path):
+        self._path = path
+
+    def getArt(self, key):
+        return self._art.get(key, '')
+
+    def setArt(self, dictionary):
+        self._art.update(dictionary)
+
+    def getProperty(self, key):
+        return self._properties.get(key.lower(), '')
+
+    def setProperty(self, key, value):
+        self._properties[key.lower()] = value
+
+    def setProperties(self, dictionary):
+        for key, value in dictionary.items():
+            self._properties[key.lower()] = value
+
+    def setInfo(self, type, infoLabels):
+        self._info.setdefault(type, {}).update(infoLabels)
+
+    def getVideoInfoTag(self):
+        if self._video_info_tag is None:
+            self._video_info_tag = xbmc.InfoTagVideo()
+        return self._video_info_tag
+
+    def getMusicInfoTag(self):
+        if self._music_info_tag is None:
+            self._music_info_tag = xbmc.InfoTagMusic()
+        return self._music_info_tag
+
+    def addContextMenuItems(self, items, replaceItems=False):
+        self._context_menu.extend(items)
+
+    def addStreamInfo(self, type, values):
+        self._info.setdefault('stream_' + type, {}).update(values)
+
+    def setContentLookup(self, enable):
+        pass
+
+    def setMimeType(self, mimetype):
+        self._properties['mimetype'] = mimetype
+
+    def setSubtitles(self, subtitleFiles):
+        self._properties['subtitles'] = subtitleFiles
+
+    def setDateTime(self, dateTime):
+        self._properties['datetime'] = dateTime
+
+    def setIsFolder(self, isFolder):
+        self._properties['isfolder'] = isFolder
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""Minimal stub of the Kodi xbmcvfs module, for use by the benchmarks."""
+
+import os
+import shutil
+
+import _stub_state
+
+
+def translatePath(path):
+    return _stub_state.translate_path(path)
+
+
+def exists(path):
+    return os.path.exists(translatePath(path))
+
+
+def delete(path):
+    try:
+        os.remove(translatePath(path))
+    except OSError:
+        return False
+    return True
+
+
+def mkdir(path):
+    try:
+        os.mkdir(translatePath(path))
+    except OSError:
+        return False
+    return True
+
+
+def mkdirs(path):
+    try:
+        os.makedirs(translatePath(path))
+    except OSError:
+        return os.path.isdir(translatePath(path))
+    return True
+
+
+def rmdir(path, force=False):
+    path = translatePath(path)
+    try:
+        if force:
+            shutil.rmtree(path)
+        else:
+            os.rmdir(path)
+    except OSError:
+        return False
+    return True
+
+
+def listdir(path):
+    path = translatePath(path)
+    dirs = []
+    files = []
+    for name in os.listdir(path):
+        if os.path.isdir(os.path.join(path, name)):
+            dirs.append(name)
+        else:
+            files.append(name)
+    return dirs, files
+
+
+def copy(source, destination):
+    try:
+        shutil.copy(translatePath(source), translatePath(destination))
+    except (IOError, OSError):
+        return False
+    return True
+
+
+def rename(file, newFile):
+    try:
+        os.rename(translatePath(file), translatePath(newFile))
+    except OSError:
+        return False
+    return True
+
+
+class File(object):
+    def __init__(self, filepath, mode=None):
+        self._file = open(translatePath(filepath),
+                          'wb' if mode == 'w' else 'rb')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def read(self, numBytes=-1):
+        return self._file.read(numBytes).decode('utf-8')
+
+    def readBytes(self, numBytes=-1):
+        return bytearray(self._file.read(numBytes))
+
+    def write(self, buffer):
+        if not isinstance(buffer, (bytes, bytearray)):
+            buffer = buffer.encode('utf-8')
+        self._file.write(buffer)
+        return True
+
+    def size(self):
+        return os.fstat(self._file.fileno()).st_size
+
+    def close(self):
+        self._file.close()
+
+
+class Stat(object):
+    def __init__(self, path):
+        self._stat = os.stat(translatePath(path))
+
+    def st_mtime(self):
+        return self._stat.st_mtime
+
+    def st_size(self):
+        return self._stat.st_size
@@ -29,7 +29,7 @@ from .constants import (
     WINDOW_REPLACE,
     WINDOW_RETURN,
 )
-from .debug import ExecTimeout
+from .debug import ExecTimeout, Tracer
 from .exceptions import KodionException
 from .items import (
     DirectoryItem,
@@ -186,6 +186,11 @@ class AbstractProvider(object):
             if not re_match:
                 continue
 
+            span = Tracer.span('Navigate',
+                               'routing',
+                               path=path,
+                               handler=getattr(handler, '__name__', None))
+
             exec_limit = context.get_settings().exec_limit()
             if exec_limit:
                 handler = ExecTimeout(
@@ -201,7 +206,10 @@ class AbstractProvider(object):
                 self.CACHE_TO_DISC: True,
                 self.UPDATE_LISTING: False,
             }
-            result = handler(provider=self, context=context, re_match=re_match)
+            with span:
+                result = handler(provider=self,
+                                 context=context,
+                                 re_match=re_match)
             if isinstance(result, tuple):
                 result, new_options = result
                 if new_options:
@@ -535,5 +543,9 @@ class AbstractProvider(object):
     def handle_exception(self, context, exception_to_handle):
         return True
 
+    def warm_cache(self, context, abort_check=None):
+        # can be overridden by the derived class
+        return None
+
     def tear_down(self):
         pass
@@ -142,18 +142,22 @@ FORCE_PLAY_PARAMS = frozenset((
 # Stored data
 PROPERTY = 'Window(home).Property(%s-%%s)' % ADDON_ID
 PROPERTY_AS_LABEL = '$INFO[Window(home).Property(%s-%%s)]' % ADDON_ID
+CONNECTIVITY_STATE = 'connectivity_state'
 CONTAINER_ID = 'container_id'
 CONTAINER_FOCUS = 'container_focus'
+CONTAINER_ITEMS = 'container_items'
 CONTAINER_POSITION = 'container_position'
 DEVELOPER_CONFIGS = 'configs'
 LICENSE_TOKEN = 'license_token'
 LICENSE_URL = 'license_url'
+LISTING_CACHE_TOKEN = 'listing_cache_token'
 MARK_AS_LABEL = 'mark_as_label'
 PLAYER_DATA = 'player_json'
 PLAYER_VIDEO_ID = 'player_video_id'
 PLAYLIST_PATH = 'playlist_path'
 PLAYLIST_POSITION = 'playlist_position'
 REROUTE_PATH = 'reroute_path'
+SERVICE_IPC_ADDRESS = 'service_ipc_address'
 
 # Routing parameters
 WINDOW_CACHE = 'window_cache'
@@ -303,18 +307,22 @@ __all__ = (
     # Stored data
     'PROPERTY',
     'PROPERTY_AS_LABEL',
+    'CONNECTIVITY_STATE',
     'CONTAINER_ID',
     'CONTAINER_FOCUS',
+    'CONTAINER_ITEMS',
     'CONTAINER_POSITION',
     'DEVELOPER_CONFIGS',
     'LICENSE_TOKEN',
     'LICENSE_URL',
+    'LISTING_CACHE_TOKEN',
     'MARK_AS_LABEL',
     'PLAYER_DATA',
     'PLAYER_VIDEO_ID',
     'PLAYLIST_PATH',
     'PLAYLIST_POSITION',
     'REROUTE_PATH',
+    'SERVICE_IPC_ADDRESS',
 
     # Routing parameters
     'WINDOW_CACHE',
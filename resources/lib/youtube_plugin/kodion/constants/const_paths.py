@@ -57,6 +57,7 @@ API = HTTP_SERVER + '/api'
 API_SUBMIT = HTTP_SERVER + '/api/submit'
 DRM = HTTP_SERVER + '/widevine'
 IP = HTTP_SERVER + '/client_ip'
+METRICS = HTTP_SERVER + '/metrics'
 MPD = HTTP_SERVER + '/manifest/dash'
 PING = HTTP_SERVER + '/ping'
 REDIRECT = HTTP_SERVER + '/redirect'
@@ -90,6 +90,8 @@ USE_REMOTE_HISTORY = 'kodion.history.remote'  # (bool)
 
 SEARCH_SIZE = 'kodion.search.size'  # (int)
 CACHE_SIZE = 'kodion.cache.size'  # (int)
+CACHE_PREFETCH = 'kodion.cache.prefetch'  # (int)
+CACHE_LISTINGS = 'kodion.cache.listings'  # (int)
 
 CHANNEL_NAME_ALIASES = 'youtube.view.channel_name.aliases'  # (list[str])
 DETAILED_DESCRIPTION = 'youtube.view.description.details'  # (bool)
@@ -137,4 +139,5 @@ HTTPD_IDLE_SLEEP = 'youtube.http.idle_sleep'  # (bool)
 HTTPD_STREAM_REDIRECT = 'youtube.http.stream_redirect'  # (bool)
 
 LOG_LEVEL = 'kodion.debug.log.level'  # (int)
+TRACE_ENABLED = 'kodion.debug.trace'  # (bool)
 EXEC_LIMIT = 'kodion.debug.exec.limit'  # (int)
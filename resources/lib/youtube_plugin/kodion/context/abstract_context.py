@@ -70,11 +70,13 @@ from ..constants import (
     WINDOW_REPLACE,
     WINDOW_RETURN,
 )
+from ..items.menu_items import MenuTemplates
 from ..sql_store import (
     BookmarksList,
     DataCache,
     FeedHistory,
     FunctionCache,
+    ListingCache,
     PlaybackHistory,
     RequestCache,
     SearchHistory,
@@ -193,11 +195,14 @@ class AbstractContext(object):
         self._data_cache = None
         self._feed_history = None
         self._function_cache = None
+        self._listing_cache = None
         self._playback_history = None
         self._requests_cache = None
         self._search_history = None
         self._watch_later_list = None
 
+        self._menu_templates = None
+
         self._plugin_handle = -1
         self._plugin_id = plugin_id
         self._plugin_name = None
@@ -283,6 +288,18 @@ class AbstractContext(object):
             self._function_cache = function_cache
         return function_cache
 
+    def get_listing_cache(self):
+        uuid = self.get_uuid()
+        listing_cache = self._listing_cache
+        if not listing_cache or listing_cache.uuid != uuid:
+            filepath = (self.get_data_path(), uuid, 'listings.sqlite')
+            listing_cache = ListingCache(
+                filepath,
+                max_file_size_mb=self.get_settings().cache_size() / 5,
+            )
+            self._listing_cache = listing_cache
+        return listing_cache
+
     def get_requests_cache(self):
         uuid = self.get_uuid()
         requests_cache = self._requests_cache
@@ -464,6 +481,14 @@ class AbstractContext(object):
             ))
         return uri
 
+    def get_menu_templates(self):
+        page = self.create_uri(self._path, self._params)
+        templates = self._menu_templates
+        if not templates or templates.page != page:
+            templates = MenuTemplates(self, page)
+            self._menu_templates = templates
+        return templates
+
     def get_parent_uri(self, **kwargs):
         return self.create_uri(self._path_parts[:-1], **kwargs)
 
@@ -709,7 +734,13 @@ class AbstractContext(object):
     def tear_down(self):
         pass
 
-    def ipc_exec(self, target, timeout=None, payload=None, raise_exc=False):
+    def ipc_exec(self,
+                 target,
+                 timeout=None,
+                 payload=None,
+                 raise_exc=False,
+                 content=None,
+                 return_content=False):
         raise NotImplementedError()
 
     def is_plugin_folder(self, folder_name=None):
@@ -35,6 +35,7 @@ from ...constants import (
     PLAYLIST_ID,
     PLAY_FORCE_AUDIO,
     SERVICE_IPC,
+    SERVICE_IPC_ADDRESS,
     SERVICE_RUNNING_FLAG,
     SORT,
     URI,
@@ -46,6 +47,7 @@ from ...settings import XbmcPluginSettings
 from ...ui import XbmcContextUI
 from ...utils.convert_format import to_unicode
 from ...utils.file_system import make_dirs
+from ...utils.ipc import IPCClient
 from ...utils.methods import (
     get_kodi_setting_bool,
     get_kodi_setting_value,
@@ -821,6 +823,7 @@ class XbmcContext(AbstractContext):
         new_context._data_cache = self._data_cache
         new_context._feed_history = self._feed_history
         new_context._function_cache = self._function_cache
+        new_context._listing_cache = self._listing_cache
         new_context._playback_history = self._playback_history
         new_context._requests_cache = self._requests_cache
         new_context._search_history = self._search_history
@@ -1025,47 +1028,107 @@ class XbmcContext(AbstractContext):
             except AttributeError:
                 pass
 
-    def ipc_exec(self, target, timeout=None, payload=None, raise_exc=False):
+    def ipc_exec(self,
+                 target,
+                 timeout=None,
+                 payload=None,
+                 raise_exc=False,
+                 content=None,
+                 return_content=False):
         if not XbmcContextUI.get_property(SERVICE_RUNNING_FLAG, as_bool=True):
             msg = 'Service IPC - Monitor has not started'
             XbmcContextUI.set_property(SERVICE_RUNNING_FLAG, BUSY_FLAG)
             if raise_exc:
                 raise RuntimeError(msg)
             self.log.warning_trace(msg)
-            return None
+            return (None, None) if return_content else None
+
+        if timeout and timeout < 0:
+            timeout = None
+            response_required = True
+        else:
+            response_required = bool(timeout)
+
+        address = XbmcContextUI.get_property(SERVICE_IPC_ADDRESS,
+                                             log_value='<redacted>')
+        if address and response_required:
+            start = default_timer()
+            try:
+                value, _content = IPCClient.get(address).request(
+                    target,
+                    data=payload,
+                    content=(content
+                             if content is None
+                             or isinstance(content, bytes) else
+                             content.encode('utf-8')),
+                    timeout=timeout,
+                )
+                _content = to_unicode(_content)
+                return self._ipc_result(
+                    target,
+                    value,
+                    _content,
+                    latency=1000 * (default_timer() - start),
+                    return_content=return_content,
+                )
+            except EnvironmentError as exc:
+                self.log.warning(('Service IPC - Socket request failed',
+                                  'Procedure: {target!r}',
+                                  'Error:     {exc!r}'),
+                                 target=target,
+                                 exc=exc)
 
-        data = {'target': target, 'response_required': bool(timeout)}
+        # Fallback to notifications, with any content passed in a property
+        data = {'target': target, 'response_required': response_required}
         if payload:
             data.update(payload)
+        content_id = '-'.join((target, data.get('filepath') or ''))
+        if content is not None:
+            XbmcContextUI.set_property(content_id,
+                                       to_unicode(content),
+                                       log_value='<redacted>')
         self.send_notification(SERVICE_IPC, data)
 
-        if not timeout:
-            return None
-        if timeout < 0:
-            timeout = None
+        if not response_required:
+            return (None, None) if return_content else None
 
         response = IPCMonitor(target, timeout)
-        if response.received:
-            value = response.value
-            if value:
-                self.log.debug(('Service IPC - Responded',
-                                'Procedure: {target!r}',
-                                'Latency:   {latency:.2f}ms'),
-                               target=target,
-                               latency=response.latency)
-            elif value is False:
-                self.log.error_trace(('Service IPC - Failed',
-                                      'Procedure: {target!r}',
-                                      'Latency:   {latency:.2f}ms'),
-                                     target=target,
-                                     latency=response.latency)
-        else:
-            value = None
+        if not response.received:
             self.log.error_trace(('Service IPC - Timed out',
                                   'Procedure: {target!r}',
-                                  'Timeout:   {timeout:.2f}s'),
+                                  'Timeout:   {timeout!r}s'),
                                  target=target,
                                  timeout=timeout)
+            return (None, None) if return_content else None
+
+        if return_content and response.value:
+            _content = XbmcContextUI.get_property(content_id,
+                                                  log_value='<redacted>')
+        else:
+            _content = None
+        return self._ipc_result(
+            target,
+            response.value,
+            _content,
+            latency=response.latency,
+            return_content=return_content,
+        )
+
+    def _ipc_result(self, target, value, content, latency, return_content):
+        if value:
+            self.log.debug(('Service IPC - Responded',
+                            'Procedure: {target!r}',
+                            'Latency:   {latency:.2f}ms'),
+                           target=target,
+                           latency=latency)
+        elif value is False:
+            self.log.error_trace(('Service IPC - Failed',
+                                  'Procedure: {target!r}',
+                                  'Latency:   {latency:.2f}ms'),
+                                 target=target,
+                                 latency=latency)
+        if return_content:
+            return value, content
         return value
 
     def is_plugin_folder(self, folder_name=None):
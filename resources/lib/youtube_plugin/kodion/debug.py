@@ -10,6 +10,8 @@
 
 from __future__ import absolute_import, division, unicode_literals
 
+import json
+import os
 import sys
 import threading
 import time
@@ -17,6 +19,7 @@ from atexit import register as atexit_register
 from cProfile import Profile
 from functools import wraps
 from inspect import getargvalues
+from io import open
 from os.path import normpath
 import pstats
 from traceback import extract_stack, format_list
@@ -327,6 +330,369 @@ class Stats(pstats.Stats):
         return self
 
 
+class Timings(object):
+    """
+    Class used to record the elapsed time of each stage of a block of code,
+    and the change in the number of allocated memory blocks, without the
+    overhead of profiling every function call. Block counts are process wide,
+    and include allocations made by any concurrently running threads.
+
+    Stages are also recorded, as Tracer spans, if tracing is enabled, but are
+    only logged if enabled is True. Set trace to False to exclude the timings
+    from tracing, e.g. if a stage includes waiting for user input.
+
+    Usage:
+        timings = Timings('Task', enabled=log.debugging)
+        with timings('Stage'):
+            ...
+        timings.mark('Stage since last mark')
+        timings.log_stats(count=num_items)
+    """
+
+    __slots__ = (
+        '_blocks',
+        '_enabled',
+        '_last_mark',
+        '_logged',
+        '_name',
+        '_stages',
+        '_start',
+    )
+
+    log = logging.getLogger(__name__)
+
+    elapsed_timer = Profiler.elapsed_timer
+    allocated_blocks = getattr(sys, 'getallocatedblocks', None)
+
+    def __init__(self, name, enabled=True, trace=True):
+        self._logged = enabled
+        enabled = enabled or (trace and Tracer.enabled)
+        self._enabled = enabled
+        self._name = name
+        self._stages = []
+        if enabled:
+            allocated_blocks = self.allocated_blocks
+            self._blocks = allocated_blocks() if allocated_blocks else None
+            self._start = self.elapsed_timer()
+        else:
+            self._blocks = None
+            self._start = None
+        self._last_mark = (self._start, self._blocks)
+
+    def __bool__(self):
+        return self._enabled
+
+    __nonzero__ = __bool__
+
+    def __call__(self, name):
+        return _TimedStage(self if self._enabled else None, name)
+
+    @property
+    def name(self):
+        return self._name
+
+    def add(self, name, elapsed, blocks=None, start=None):
+        if not self._enabled:
+            return
+        self._stages.append((name, elapsed, blocks))
+        if start is not None and Tracer.enabled:
+            Tracer.add(name,
+                       start,
+                       elapsed,
+                       category=self._name,
+                       args=None if blocks is None else {'blocks': blocks})
+
+    def mark(self, name):
+        """Records a stage that started at the previous mark, or on creation"""
+        if not self._enabled:
+            return
+        start, blocks = self._last_mark
+        now = self.elapsed_timer()
+        if blocks is not None:
+            current_blocks = self.allocated_blocks()
+            self.add(name, now - start, current_blocks - blocks, start)
+        else:
+            current_blocks = None
+            self.add(name, now - start, start=start)
+        self._last_mark = (now, current_blocks)
+
+    def elapsed(self):
+        if not self._enabled:
+            return None
+        return self.elapsed_timer() - self._start
+
+    def get_stats(self, count=None):
+        if not self._enabled:
+            return None
+        elapsed = self.elapsed()
+        if self._blocks is None:
+            out = ['{0}: {1:.1f} ms'.format(self._name, elapsed * 1000)]
+        else:
+            out = ['{0}: {1:.1f} ms, {2:+d} blocks'.format(
+                self._name,
+                elapsed * 1000,
+                self.allocated_blocks() - self._blocks,
+            )]
+        if count is not None:
+            out.append('Throughput: {0} items, {1:.0f} items/s'.format(
+                count, count / elapsed if elapsed else 0
+            ))
+        for name, elapsed, blocks in self._stages:
+            if blocks is None:
+                out.append('{0}: {1:.1f} ms'.format(name, elapsed * 1000))
+            else:
+                out.append('{0}: {1:.1f} ms, {2:+d} blocks'.format(
+                    name, elapsed * 1000, blocks
+                ))
+        return out
+
+    def log_stats(self, budget=None, exclude=(), count=None):
+        """
+        Logs the recorded stage timings. If a budget, in seconds, is provided
+        then a warning is logged if the total time of all recorded stages,
+        other than those with names starting with an excluded prefix, exceeds
+        the budget. If a count of processed items is provided then the item
+        throughput is also logged.
+        """
+        if not self._logged:
+            return
+        stats = self.get_stats(count)
+        if not stats:
+            return
+        self.log.debug(stats, stacklevel=2)
+        if budget is None:
+            return
+        elapsed = sum(stage[1] for stage in self._stages
+                      if not stage[0].startswith(exclude))
+        if elapsed > budget:
+            self.log.warning(('Slow processing',
+                              'Task:    %s',
+                              'Elapsed: %.1f ms',
+                              'Budget:  %.1f ms'),
+                             self._name,
+                             elapsed * 1000,
+                             budget * 1000,
+                             stacklevel=2)
+
+
+class _TimedStage(object):
+    __slots__ = (
+        '_blocks',
+        '_name',
+        '_start',
+        '_timings',
+    )
+
+    def __init__(self, timings, name):
+        self._timings = timings
+        self._name = name
+        self._blocks = None
+        self._start = None
+
+    def __enter__(self):
+        timings = self._timings
+        if timings:
+            allocated_blocks = timings.allocated_blocks
+            if allocated_blocks:
+                self._blocks = allocated_blocks()
+            self._start = timings.elapsed_timer()
+        return self
+
+    def __exit__(self, exc_type=None, exc_val=None, exc_tb=None):
+        timings = self._timings
+        if not timings:
+            return
+        start = self._start
+        elapsed = timings.elapsed_timer() - start
+        blocks = self._blocks
+        if blocks is not None:
+            blocks = timings.allocated_blocks() - blocks
+        timings.add(self._name, elapsed, blocks, start)
+
+
+class Tracer(object):
+    """
+    Records timing spans of each phase of a plugin invocation, with much less
+    overhead than profiling. Recorded spans can be summarised in the log, and
+    exported in the Chrome trace event format, for viewing with
+    chrome://tracing or https://ui.perfetto.dev
+
+    Tracing is disabled by default, in which case a shared no-op span is used.
+    It is enabled by its own setting, independently of logging and profiling.
+
+    Usage:
+        with Tracer.span('Name', 'category', arg=value) as span:
+            ...
+            span.set(result='value')
+    or
+        span = Tracer.span('Name', 'category', arg=value)
+        ...
+        span.end(result='value')
+
+    Spans are grouped in the summary by name, and by result if set.
+    """
+
+    log = logging.getLogger(__name__)
+
+    elapsed_timer = Profiler.elapsed_timer
+
+    MAX_TRACES = 20
+
+    enabled = False
+    _events = []
+    _start = None
+
+    @classmethod
+    def enable(cls, enabled=True):
+        cls.enabled = enabled
+        cls._events = []
+        cls._start = cls.elapsed_timer() if enabled else None
+
+    @classmethod
+    def span(cls, name, category=None, **args):
+        if not cls.enabled:
+            return _NULL_SPAN
+        return Span(name, category, args)
+
+    @classmethod
+    def add(cls, name, start, elapsed, category=None, args=None):
+        if not cls.enabled:
+            return
+        # list.append is atomic, so spans can be added from any thread
+        cls._events.append({
+            'name': name,
+            'cat': category or 'default',
+            'ph': 'X',
+            'ts': round((start - cls._start) * 1000000, 1),
+            'dur': round(elapsed * 1000000, 1),
+            'pid': os.getpid(),
+            'tid': threading.current_thread().ident,
+            'args': args or {},
+        })
+
+    @classmethod
+    def get_stats(cls):
+        if not cls.enabled:
+            return None
+        totals = {}
+        for event in cls._events:
+            result = event['args'].get('result')
+            if result is None:
+                key = event['name']
+            else:
+                key = '{0} [{1}]'.format(event['name'], result)
+            count, duration = totals.get(key, (0, 0))
+            totals[key] = (count + 1, duration + event['dur'])
+        out = ['Trace: {0:.1f} ms, {1} spans'.format(
+            (cls.elapsed_timer() - cls._start) * 1000,
+            len(cls._events),
+        )]
+        out.extend(
+            '{0}: {1} x {2:.1f} ms'.format(key, count, duration / 1000)
+            for key, (count, duration) in sorted(
+                totals.items(),
+                key=lambda item: item[1][1],
+                reverse=True,
+            )
+        )
+        return out
+
+    @classmethod
+    def log_stats(cls):
+        stats = cls.get_stats()
+        if stats:
+            cls.log.info(stats, stacklevel=2)
+
+    @classmethod
+    def export(cls, path):
+        """
+        Writes the recorded spans, as a Chrome trace JSON file, to the path
+        directory. Only the most recent MAX_TRACES traces are kept.
+        :return: filepath of the exported trace, or None if not exported
+        """
+        if not cls.enabled or not cls._events or not path:
+            return None
+        filename = 'trace_{0}_{1}.json'.format(int(time.time() * 1000),
+                                               os.getpid())
+        filepath = os.path.join(path, filename)
+        try:
+            with open(filepath, mode='w', encoding='utf-8') as file:
+                file.write(json.dumps({
+                    'traceEvents': cls._events,
+                    'displayTimeUnit': 'ms',
+                }, ensure_ascii=False))
+            traces = sorted(
+                name for name in os.listdir(path)
+                if name.startswith('trace_') and name.endswith('.json')
+            )
+            for name in traces[:-cls.MAX_TRACES]:
+                os.remove(os.path.join(path, name))
+        except (IOError, OSError, TypeError, ValueError):
+            cls.log.exception(('Export failed', 'File: %s'), filepath)
+            return None
+        cls.log.debug(('Trace exported', 'File: %s'), filepath)
+        return filepath
+
+
+class Span(object):
+    __slots__ = (
+        '_args',
+        '_category',
+        '_name',
+        '_start',
+    )
+
+    def __init__(self, name, category=None, args=None):
+        self._name = name
+        self._category = category
+        self._args = args
+        self._start = Tracer.elapsed_timer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type=None, exc_val=None, exc_tb=None):
+        if exc_type:
+            self.end(error=exc_type.__name__)
+        else:
+            self.end()
+
+    def set(self, **args):
+        self._args.update(args)
+
+    def end(self, **args):
+        start = self._start
+        if start is None:
+            return
+        self._start = None
+        if args:
+            self._args.update(args)
+        Tracer.add(self._name,
+                   start,
+                   Tracer.elapsed_timer() - start,
+                   category=self._category,
+                   args=self._args)
+
+
+class _NullSpan(object):
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type=None, exc_val=None, exc_tb=None):
+        pass
+
+    def set(self, **args):
+        pass
+
+    def end(self, **args):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
 class ExecTimeout(object):
     log = logging.getLogger('__name__')
     src_file = None
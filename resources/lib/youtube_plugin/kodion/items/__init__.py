@@ -25,6 +25,7 @@ from .watch_later_item import WatchLaterItem
 from .xbmc.xbmc_items import (
     directory_listitem,
     image_listitem,
+    listitems,
     media_listitem,
     playback_item,
     uri_listitem,
@@ -50,6 +51,7 @@ __all__ = (
     'menu_items',
     'directory_listitem',
     'image_listitem',
+    'listitems',
     'media_listitem',
     'playback_item',
     'uri_listitem',
@@ -25,11 +25,51 @@ from ..utils.methods import generate_hash
 
 
 class BaseItem(object):
+    # Items are created in bulk for every listing, so attributes are stored in
+    # slots rather than a per-instance __dict__. Subclasses must also declare
+    # __slots__, even if empty, to avoid re-introducing the instance __dict__.
+    __slots__ = (
+        '_name',
+        '_uri',
+        '_available',
+        '_callback',
+        '_filter_reason',
+        '_special_sort',
+        '_image',
+        '_fanart',
+        '_bookmark_id',
+        '_bookmark_timestamp',
+        '_context_menu',
+        '_added_utc',
+        '_count',
+        '_date',
+        '_dateadded',
+        '_short_details',
+        '_production_code',
+        '_track_number',
+        '_cast',
+        '_artists',
+        '_studios',
+        '_playable',
+        # Attributes common to DirectoryItem and MediaItem. These are declared
+        # here as BookmarkItem derives from both, and only one of its bases can
+        # extend the slot layout of BaseItem.
+        '_plot',
+        '_channel_id',
+        '_playlist_id',
+        '_subscription_id',
+        '_category_label',
+        '_is_action',
+        '_next_page',
+    )
+
     _version = 3
-    _playable = False
+    _PLAYABLE = False
 
     def __init__(self, name, uri, image=None, fanart=None, **_kwargs):
         super(BaseItem, self).__init__()
+        self._playable = self._PLAYABLE
+
         self._name = None
         self.set_name(name)
 
@@ -87,15 +127,65 @@ class BaseItem(object):
         return ''.join(out).format(**kwargs)
 
     def __repr_data__(self):
-        return {'type': self.__class__.__name__, 'data': self.__dict__}
+        return {'type': self.__class__.__name__, 'data': self.get_fields()}
 
     def __repr__(self):
         return json.dumps(
             self.__repr_data__(),
             ensure_ascii=False,
+            separators=(',', ':'),
             cls=_Encoder
         )
 
+    @classmethod
+    def field_names(cls):
+        """
+        Returns the names of all attributes of the item, in slot order.
+        :return: tuple of attribute names.
+        """
+        names = cls.__dict__.get('_field_names')
+        if names is None:
+            names = []
+            for _cls in reversed(cls.__mro__):
+                for name in _cls.__dict__.get('__slots__', ()):
+                    if name not in names:
+                        names.append(name)
+            names = tuple(names)
+            cls._field_names = names
+        return names
+
+    def get_fields(self, skip_keys=(), skip_vals=()):
+        """
+        Returns the attributes of the item, in slot order, as a new dict.
+        Attributes that have not been set are omitted.
+        :param skip_keys: attribute names to exclude
+        :param skip_vals: attribute values to exclude
+        :return: dict of attribute name: value
+        """
+        fields = {}
+        for name in self.field_names():
+            if name in skip_keys:
+                continue
+            try:
+                value = getattr(self, name)
+            except AttributeError:
+                continue
+            if value in skip_vals:
+                continue
+            fields[name] = value
+        return fields
+
+    def set_fields(self, fields):
+        """
+        Sets the attributes of the item from a dict of attribute name: value.
+        Names that are not attributes of this type of item are ignored.
+        :param fields: dict of attribute name: value
+        """
+        names = self.field_names()
+        for name, value in fields.items():
+            if name in names:
+                setattr(self, name, value)
+
     @staticmethod
     def generate_id(*args, **kwargs):
         prefix = kwargs.get('prefix')
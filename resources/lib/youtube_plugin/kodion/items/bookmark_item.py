@@ -15,6 +15,8 @@ from .media_item import VideoItem
 
 
 class BookmarkItem(VideoItem, DirectoryItem):
+    __slots__ = ()
+
     def __init__(self,
                  name,
                  uri,
@@ -16,6 +16,8 @@ from ..constants import PATHS
 
 
 class CommandItem(DirectoryItem):
+    __slots__ = ()
+
     def __init__(self,
                  name,
                  command,
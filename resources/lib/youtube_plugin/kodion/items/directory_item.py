@@ -15,6 +15,8 @@ from ..compatibility import parse_qsl, unescape, urlencode, urlsplit
 
 
 class DirectoryItem(BaseItem):
+    __slots__ = ()
+
     def __init__(self,
                  name,
                  uri,
@@ -20,10 +20,38 @@ from ..utils.convert_format import duration_to_seconds, seconds_to_duration
 
 
 class MediaItem(BaseItem):
+    __slots__ = (
+        '_aired',
+        '_premiered',
+        '_scheduled_start_utc',
+        '_year',
+        '_season',
+        '_episode',
+        '_genres',
+        '_duration',
+        '_play_count',
+        '_last_played',
+        '_start_percent',
+        '_start_time',
+        '_mediatype',
+        '_rating',
+        '_headers',
+        '_license_key',
+        '_uses_isa',
+        'subtitles',
+        '_completed',
+        '_live',
+        '_short',
+        '_upcoming',
+        '_vod',
+        '_video_id',
+        '_playlist_item_id',
+    )
+
     _ALLOWABLE_MEDIATYPES = frozenset()
     _DEFAULT_MEDIATYPE = ''
 
-    _playable = True
+    _PLAYABLE = True
 
     def __init__(self,
                  name,
@@ -387,6 +415,10 @@ class MediaItem(BaseItem):
 
 
 class AudioItem(MediaItem):
+    __slots__ = (
+        '_album',
+    )
+
     _ALLOWABLE_MEDIATYPES = {CONTENT.AUDIO_TYPE, 'song', 'album', 'artist'}
     _DEFAULT_MEDIATYPE = CONTENT.AUDIO_TYPE
 
@@ -423,6 +455,14 @@ class AudioItem(MediaItem):
 
 
 class VideoItem(MediaItem):
+    __slots__ = (
+        '_directors',
+        '_imdb_id',
+        '_video_aspect',
+        '_video_height',
+        '_video_width',
+    )
+
     _ALLOWABLE_MEDIATYPES = {CONTENT.VIDEO_TYPE,
                              'movie',
                              'tvshow', 'season', 'episode',
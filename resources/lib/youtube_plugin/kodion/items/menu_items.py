@@ -46,6 +46,32 @@ URI_INFOLABEL = PROPERTY_AS_LABEL % URI
 VIDEO_ID_INFOLABEL = PROPERTY_AS_LABEL % VIDEO_ID
 
 
+class MenuTemplates(object):
+    """
+    Store of context menu entries that do not depend on the listed item, so
+    that each entry is only created once for the page and then shared by
+    all the items listed in the page. Use AbstractContext.get_menu_templates
+    to get the store for the current page.
+    """
+
+    def __init__(self, context, page):
+        self._context = context
+        self._entries = {}
+        self.page = page
+
+    def get(self, menu_item, *args, **kwargs):
+        try:
+            key = (menu_item, args, frozenset(kwargs.items()))
+            return self._entries[key]
+        except KeyError:
+            entry = menu_item(self._context, *args, **kwargs)
+            self._entries[key] = entry
+            return entry
+        except TypeError:
+            # Arguments are not hashable, so the entry can't be shared
+            return menu_item(self._context, *args, **kwargs)
+
+
 def context_menu_uri(context, path, params=None, run=True, play=False):
     if params is None:
         params = {CONTEXT_MENU: True}
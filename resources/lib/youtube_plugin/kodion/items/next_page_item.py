@@ -16,6 +16,10 @@ from ..constants import ITEMS_PER_PAGE, PAGE, PATHS
 
 
 class NextPageItem(DirectoryItem):
+    __slots__ = (
+        'items_per_page',
+    )
+
     NEXT_PAGE_PARAM_EXCLUSIONS = (
         'refresh',
     )
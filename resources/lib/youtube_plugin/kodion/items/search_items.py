@@ -16,6 +16,8 @@ from ..constants import CHANNEL_ID, INCOGNITO, PATHS
 
 
 class SearchItem(DirectoryItem):
+    __slots__ = ()
+
     def __init__(self,
                  context,
                  name=None,
@@ -50,6 +52,8 @@ class SearchItem(DirectoryItem):
 
 
 class SearchHistoryItem(DirectoryItem):
+    __slots__ = ()
+
     def __init__(self, context, query, image=None, fanart=None, location=False):
         if image is None:
             image = '{media}/search.png'
@@ -85,6 +89,8 @@ class SearchHistoryItem(DirectoryItem):
 
 
 class NewSearchItem(DirectoryItem):
+    __slots__ = ()
+
     def __init__(self,
                  context,
                  name=None,
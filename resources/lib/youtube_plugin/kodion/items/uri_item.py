@@ -14,6 +14,8 @@ from .base_item import BaseItem
 
 
 class UriItem(BaseItem):
+    __slots__ = ()
+
     def __init__(self, uri, playable=None):
         super(UriItem, self).__init__(name=uri, uri=uri)
         if playable is not None:
@@ -79,7 +79,7 @@ def from_json(json_data, *args):
         return None
 
     item = _ITEM_TYPES[item_type](name='', uri='')
-    item.__dict__.update(item_data)
+    item.set_fields(item_data)
 
     if bookmark_id:
         item.bookmark_id = bookmark_id
@@ -15,6 +15,8 @@ from ..constants import PATHS
 
 
 class WatchLaterItem(DirectoryItem):
+    __slots__ = ()
+
     def __init__(self, context, name=None, image=None, fanart=None):
         if not name:
             name = context.localize('watch_later')
@@ -23,6 +23,7 @@ from ... import logging
 from ...compatibility import to_str, xbmc, xbmcgui
 from ...constants import (
     ACTION,
+    ARTIST,
     BOOKMARK_ID,
     CHANNEL_ID,
     PATHS,
@@ -33,10 +34,16 @@ from ...constants import (
     PLAY_TIMESHIFT,
     PLAY_USING,
     SUBSCRIPTION_ID,
+    TITLE,
+    URI,
     VALUE_TO_STR,
     VIDEO_ID,
 )
-from ...utils.datetime import datetime_to_since, utc_to_local
+from ...utils.datetime import (
+    current_datetime,
+    datetime_to_since,
+    utc_to_local,
+)
 from ...utils.redact import redact_ip_in_uri
 from ...utils.system_version import current_system_version
 
@@ -555,16 +562,20 @@ def playback_item(context, media_item, show_fanart=None, **_kwargs):
     return list_item
 
 
-def directory_listitem(context, directory_item, show_fanart=None, **_kwargs):
+def directory_listitem(context,
+                       directory_item,
+                       show_fanart=None,
+                       debugging=True,
+                       **_kwargs):
     uri = directory_item.get_uri()
     is_action = directory_item.is_action()
     if not is_action:
         path, params = context.parse_uri(uri)
         if path.rstrip('/') == PATHS.PLAY and params.get(ACTION) != 'list':
             is_action = True
-    if is_action:
+    if debugging and is_action:
         logging.debug('Converting DirectoryItem action: %r', uri)
-    else:
+    elif debugging:
         logging.debug('Converting DirectoryItem: %r', uri)
 
     kwargs = {
@@ -638,9 +649,14 @@ def directory_listitem(context, directory_item, show_fanart=None, **_kwargs):
     return uri, list_item, not is_action
 
 
-def image_listitem(context, image_item, show_fanart=None, **_kwargs):
+def image_listitem(context,
+                   image_item,
+                   show_fanart=None,
+                   debugging=True,
+                   **_kwargs):
     uri = image_item.get_uri()
-    logging.debug('Converting ImageItem: %r', uri)
+    if debugging:
+        logging.debug('Converting ImageItem: %r', uri)
 
     kwargs = {
         'label': image_item.get_name(),
@@ -673,9 +689,10 @@ def image_listitem(context, image_item, show_fanart=None, **_kwargs):
     return uri, list_item, False
 
 
-def uri_listitem(_context, uri_item, **_kwargs):
+def uri_listitem(_context, uri_item, debugging=True, **_kwargs):
     uri = uri_item.get_uri()
-    logging.debug('Converting UriItem: %r', uri)
+    if debugging:
+        logging.debug('Converting UriItem: %r', uri)
 
     kwargs = {
         'label': uri_item.get_name(),
@@ -696,9 +713,13 @@ def media_listitem(context,
                    media_item,
                    show_fanart=None,
                    to_sync=None,
+                   debugging=True,
+                   current_dt=None,
+                   live_label=None,
                    **_kwargs):
     uri = media_item.get_uri()
-    logging.debug('Converting %s: %r', media_item.__class__.__name__, uri)
+    if debugging:
+        logging.debug('Converting %s: %r', media_item.__class__.__name__, uri)
 
     kwargs = {
         'label': media_item.get_name(),
@@ -724,10 +745,10 @@ def media_listitem(context,
         local_datetime = utc_to_local(datetime)
         props['PublishedLocal'] = to_str(local_datetime)
     if media_item.live:
-        props['PublishedSince'] = context.localize('live')
+        props['PublishedSince'] = live_label or context.localize('live')
     elif local_datetime:
         props['PublishedSince'] = to_str(datetime_to_since(
-            context, local_datetime
+            context, local_datetime, current=current_dt
         ))
 
     set_play_count = True
@@ -790,3 +811,77 @@ def media_listitem(context,
         list_item.addContextMenuItems(context_menu)
 
     return uri, list_item, False
+
+
+def _listitem_details(uri,
+                     list_item,
+                     item,
+                     _id_properties=(
+                             VIDEO_ID,
+                             BOOKMARK_ID,
+                             CHANNEL_ID,
+                             PLAYLIST_ID,
+                             PLAYLIST_ITEM_ID,
+                             SUBSCRIPTION_ID,
+                     )):
+    """
+    Returns the details of a converted item that the service exposes as
+    window properties when the item is focused, keyed by the same names used
+    by the service to read them from the focused ListItem.
+    Only non-empty values are included, and the title and artist are only
+    included for items that have an id property.
+    """
+    details = {URI: uri}
+    for name in _id_properties:
+        value = list_item.getProperty(name)
+        if value:
+            details[name] = value
+    if len(details) > 1:
+        value = item.get_name()
+        if value:
+            details[TITLE] = value
+        value = item.get_artists()
+        if value:
+            details[ARTIST] = ' / '.join(value)
+    return details
+
+
+def listitems(context,
+              items,
+              listitem_map,
+              show_fanart=None,
+              to_sync=None,
+              item_details=None):
+    """
+    Converts a page of items to ListItems, using listitem_map to look up the
+    conversion function for each item type. Values that are the same for all
+    items are determined once for the page, rather than for each item.
+
+    :param item_details: optional list that is extended with the
+                         _listitem_details of each converted item, in order
+    :return: list of (uri, ListItem, is_folder) tuples
+    """
+    if show_fanart is None:
+        show_fanart = context.get_settings().fanart_selection()
+    shared_kwargs = {
+        'show_fanart': show_fanart,
+        'to_sync': to_sync,
+        'debugging': logging.debugging,
+        'current_dt': current_datetime(),
+        'live_label': context.localize('live'),
+    }
+
+    converted = []
+    for item in items:
+        listitem_type = listitem_map.get(item.__class__.__name__)
+        if (not listitem_type
+                or (listitem_type is directory_listitem
+                    and not item.available)):
+            continue
+        converted_item = listitem_type(context, item, **shared_kwargs)
+        converted.append(converted_item)
+        if item_details is not None:
+            item_details.append(_listitem_details(converted_item[0],
+                                                  converted_item[1],
+                                                  item))
+    return converted
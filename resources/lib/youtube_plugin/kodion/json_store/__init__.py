@@ -11,6 +11,7 @@ from __future__ import absolute_import, division, unicode_literals
 
 from .access_manager import AccessManager
 from .api_keys import APIKeyStore
+from .json_file import JSONFile
 
 
-__all__ = ('AccessManager', 'APIKeyStore',)
+__all__ = ('AccessManager', 'APIKeyStore', 'JSONFile',)
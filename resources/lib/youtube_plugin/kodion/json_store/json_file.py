@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+"""
+
+    Copyright (C) 2025 plugin.video.youtube
+
+    SPDX-License-Identifier: GPL-2.0-only
+    See LICENSES/GPL-2.0-only for more information.
+"""
+
+from __future__ import absolute_import, division, unicode_literals
+
+import errno
+import json
+import os
+from io import open
+from threading import Lock, Timer
+from time import time
+
+from .. import logging
+from ..utils.convert_format import to_unicode
+from ..utils.methods import merge_dicts
+
+
+_DELETED = '__deleted__'
+
+
+def _encode_deleted(obj):
+    if obj is KeyError:
+        return {_DELETED: True}
+    raise TypeError('Object of type %s is not JSON serializable'
+                    % obj.__class__.__name__)
+
+
+def _decode_deleted(obj):
+    if len(obj) == 1 and obj.get(_DELETED) is True:
+        return KeyError
+    return obj
+
+
+def dump_data(data):
+    """
+    Serialises data, or a patch for use with merge_dicts, as compact JSON.
+    KeyError values, used to remove keys when merged, are preserved.
+    """
+    return json.dumps(data,
+                      ensure_ascii=False,
+                      separators=(',', ':'),
+                      sort_keys=True,
+                      default=_encode_deleted)
+
+
+def load_patch(content):
+    return json.loads(to_unicode(content), object_hook=_decode_deleted)
+
+
+class JSONFile(object):
+    """
+    Authoritative in-memory copy of a JSON file, held by the service.
+
+    Plugin invocations read and update the data using FILE_READ and
+    FILE_WRITE requests. Updates are merged into the in-memory copy and
+    increment its version, which readers use to check whether the copy they
+    hold is current. Changes are written to disk after a short delay, so that
+    a burst of updates results in a single write. Each write is made to a
+    temporary file which then replaces the original.
+
+    The modification time and size of the file are checked on each read and
+    write, and the data is reloaded if the file was changed or removed by
+    anything other than the service, discarding any pending changes.
+    """
+    log = logging.getLogger(__name__)
+
+    WRITE_DELAY = 2
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self._lock = Lock()
+        self._data = None
+        self._content = None
+        self._version = None
+        self._modified = False
+        self._timer = None
+        self._file_state = None
+
+    def _get_file_state(self):
+        try:
+            stat = os.stat(self.filepath)
+        except (IOError, OSError):
+            return None
+        return stat.st_mtime, stat.st_size
+
+    def _load(self):
+        file_state = self._get_file_state()
+        if self._data is not None:
+            if file_state == self._file_state:
+                return True
+            self.log.debug(('File changed - reloading', 'File: %s'),
+                           self.filepath)
+            timer = self._timer
+            if timer:
+                timer.cancel()
+                self._timer = None
+            self._modified = False
+        try:
+            with open(self.filepath, mode='rb') as file:
+                content = file.read()
+            data = json.loads(to_unicode(content)) if content else {}
+        except (IOError, OSError) as exc:
+            if exc.errno != errno.ENOENT:
+                self.log.exception(('Access error', 'File: %s'),
+                                   self.filepath)
+                return False
+            content = None
+            data = {}
+        except (TypeError, ValueError):
+            self.log.exception(('Invalid data', 'File: %s'), self.filepath)
+            content = None
+            data = {}
+        self._data = data
+        self._content = content
+        self._file_state = file_state
+        # Versions are based on the load time so that a version held by a
+        # reader is not reused after the service restarts or the file reloads
+        self._version = max(int(time() * 1000), (self._version or 0) + 1)
+        return True
+
+    def read(self, version=None):
+        """
+        :param version: version of the data already held by the reader
+        :return: tuple of (version, content), where content is None if the
+                 reader already holds the current version, or empty if the
+                 file does not exist or is empty, or (False, None) if the
+                 file could not be read
+        """
+        with self._lock:
+            if not self._load():
+                return False, None
+            if version == self._version:
+                return version, None
+            content = self._content
+            if content is None:
+                data = self._data
+                content = dump_data(data).encode('utf-8') if data else b''
+                self._content = content
+            return self._version, content
+
+    def write(self, content, update=False):
+        """
+        :param content: JSON data to store, or a patch to merge into the
+                        stored data if update is True
+        :return: the new version of the data, None if the data is unchanged,
+                 or False if the data could not be updated
+        """
+        if not content:
+            return None
+        try:
+            data = load_patch(content)
+        except (TypeError, ValueError):
+            self.log.exception(('Invalid data', 'File: %s'), self.filepath)
+            return False
+
+        with self._lock:
+            if not self._load():
+                return False
+            if update:
+                data = merge_dicts(self._data, data)
+                if data is Ellipsis:
+                    data = {}
+            if not data:
+                return False
+            if data == self._data:
+                return None
+
+            self._data = data
+            self._content = None
+            self._version += 1
+            self._modified = True
+            if not self._timer:
+                timer = Timer(self.WRITE_DELAY, self.flush)
+                timer.daemon = True
+                timer.start()
+                self._timer = timer
+            return self._version
+
+    def flush(self):
+        with self._lock:
+            timer = self._timer
+            if timer:
+                timer.cancel()
+                self._timer = None
+            if not self._modified:
+                return True
+
+            content = self._content
+            if content is None:
+                content = dump_data(self._data).encode('utf-8')
+                self._content = content
+
+            filepath = self.filepath
+            temp_filepath = filepath + '.tmp'
+            try:
+                with open(temp_filepath, mode='wb') as file:
+                    file.write(content)
+                os.replace(temp_filepath, filepath)
+            except (IOError, OSError):
+                self.log.exception(('Access error', 'File: %s'), filepath)
+                return False
+            self._modified = False
+            self._file_state = self._get_file_state()
+            self.log.debug(('Saved', 'File:    %s', 'Version: %d'),
+                           filepath,
+                           self._version)
+            return True
@@ -15,7 +15,8 @@ import errno
 from io import open
 
 from .. import logging
-from ..constants import DATA_PATH, FILE_READ, FILE_WRITE
+from .json_file import dump_data
+from ..constants import DATA_PATH, FILE_READ, FILE_WRITE, SERVICE_RUNNING_FLAG
 from ..utils.convert_format import to_unicode
 from ..utils.file_system import make_dirs
 from ..utils.methods import merge_dicts
@@ -42,10 +43,11 @@ class JSONStore(object):
         self._context = context
         self._loaded = False
         self._data = {}
+        self._version = None
         self.init()
 
     def init(self):
-        loaded = self.load(stacklevel=4, ipc=False)
+        loaded = self.load(stacklevel=4, ipc=None)
         self.set_defaults(reset=(not loaded))
         return loaded
 
@@ -77,8 +79,13 @@ class JSONStore(object):
                                      stacklevel=stacklevel)
                     return None
 
+            # Only the changes are sent to the service, which merges them into
+            # its copy of the data, rather than the whole document
+            patch = data
             if update and _data:
                 data = merge_dicts(_data, data)
+            else:
+                update = False
             if not data:
                 raise ValueError
 
@@ -88,13 +95,8 @@ class JSONStore(object):
                                stacklevel=stacklevel)
                 return None
 
-            _data = json.dumps(
-                data, ensure_ascii=False, indent=4, sort_keys=True
-            )
-            self._data = json.loads(
-                _data,
-                object_pairs_hook=(self._process_data if process else None),
-            )
+            content = dump_data(patch if update else data)
+            self._data = data
 
             if loaded is False:
                 self.log.debug(('File write deferred', 'File: %s'),
@@ -103,27 +105,31 @@ class JSONStore(object):
                 return None
 
             if ipc:
-                self._context.get_ui().set_property(
-                    '-'.join((FILE_WRITE, filepath)),
-                    to_unicode(_data),
-                    log_value='<redacted>',
-                )
-                response = self._context.ipc_exec(
+                version = self._context.ipc_exec(
                     FILE_WRITE,
                     timeout=5,
-                    payload={'filepath': filepath},
+                    payload={'filepath': filepath, 'update': update},
                     raise_exc=True,
+                    content=content,
                 )
-                if response is False:
+                if version is False:
                     raise IOError
-                if response is None:
+                if version is None:
                     self.log.debug(('Data unchanged', 'File: %s'),
                                    filepath,
                                    stacklevel=stacklevel)
                     return None
+                if self._version and version != self._version + 1:
+                    # Data was also updated by another process, use the
+                    # merged data held by the service
+                    self.load(process=process, stacklevel=stacklevel + 1)
+                else:
+                    self._version = version
             else:
-                with open(filepath, mode='w', encoding='utf-8') as file:
-                    file.write(to_unicode(_data))
+                temp_filepath = filepath + '.tmp'
+                with open(temp_filepath, mode='w', encoding='utf-8') as file:
+                    file.write(to_unicode(content))
+                os.replace(temp_filepath, filepath)
         except (RuntimeError, IOError, OSError):
             self.log.exception(('Access error', 'File: %s'),
                                filepath or self._filename,
@@ -138,6 +144,11 @@ class JSONStore(object):
         return True
 
     def load(self, process=True, ipc=True, stacklevel=2):
+        """
+        Loads the data from the service, or directly from the file if ipc is
+        False. If ipc is None, the service is only used if it is running.
+        Data is only parsed if it has changed since it was last loaded.
+        """
         loaded = False
         filepath = self.filepath
         data = ''
@@ -149,22 +160,43 @@ class JSONStore(object):
                            filepath,
                            stacklevel=stacklevel)
 
+            if ipc is None:
+                ipc = self._context.get_ui().get_property(
+                    SERVICE_RUNNING_FLAG,
+                    as_bool=True,
+                )
             if ipc:
-                if self._context.ipc_exec(
-                        FILE_READ,
-                        timeout=5,
-                        payload={'filepath': filepath},
-                        raise_exc=True,
-                ) is not False:
-                    data = self._context.get_ui().get_property(
-                        '-'.join((FILE_READ, filepath)),
-                        log_value='<redacted>',
-                    )
-                else:
+                version, data = self._context.ipc_exec(
+                    FILE_READ,
+                    timeout=5,
+                    payload={'filepath': filepath, 'version': self._version},
+                    raise_exc=True,
+                    return_content=True,
+                )
+                if version is False:
                     raise IOError
+                # Data of the current version is already held, either as
+                # loaded or as last saved by this store
+                if (version and version == self._version
+                        and (self._loaded or self._data)):
+                    self.log.debug(('Data unchanged', 'File: %s'),
+                                   filepath,
+                                   stacklevel=stacklevel)
+                    self._loaded = True
+                    return True
+                self._version = version or None
+                if not data:
+                    # No data is held for a file that does not exist or is
+                    # empty, in which case the defaults are used instead
+                    self.log.debug(('No data', 'File: %s'),
+                                   filepath,
+                                   stacklevel=stacklevel)
+                    self._loaded = None
+                    return None
             else:
                 with open(filepath, mode='r', encoding='utf-8') as file:
                     data = file.read()
+                self._version = None
             if not data:
                 raise ValueError
             self._data = json.loads(
@@ -176,7 +208,7 @@ class JSONStore(object):
             self.log.exception(('Access error', 'File: %s'),
                                filepath or self._filename,
                                stacklevel=stacklevel)
-            if exc.errno == errno.ENOENT:
+            if getattr(exc, 'errno', None) == errno.ENOENT:
                 loaded = None
         except (TypeError, ValueError):
             self.log.exception(('Invalid data', 'Data: {data!r}'),
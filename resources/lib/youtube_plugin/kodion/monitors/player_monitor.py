@@ -13,7 +13,7 @@ import json
 import threading
 
 from .. import logging
-from ..compatibility import xbmc
+from ..compatibility import xbmc, xbmcvfs
 from ..constants import (
     BUSY_FLAG,
     CHANNEL_ID,
@@ -26,6 +26,7 @@ from ..constants import (
     TRAKT_PAUSE_FLAG,
     VIDEO_ID,
 )
+from ..utils.methods import jsonrpc
 from ..utils.redact import redact_params
 
 
@@ -119,6 +120,25 @@ class PlayerMonitorThread(object):
         settings = context.get_settings()
         playlist_player = context.get_playlist_player()
 
+        if settings.subtitle_download() and playlist_player.size() > 1:
+            prefetch_thread = threading.Thread(
+                name='%s.prefetch_subtitles' % self.name,
+                target=self.prefetch_subtitles,
+                args=(client, playlist_player),
+            )
+            prefetch_thread.daemon = True
+            prefetch_thread.start()
+
+        pending_subtitles = self.player_data.get('pending_subtitles')
+        if pending_subtitles:
+            subtitles_thread = threading.Thread(
+                name='%s.attach_subtitles' % self.name,
+                target=self.attach_subtitles,
+                args=(pending_subtitles, playlist_player),
+            )
+            subtitles_thread.daemon = True
+            subtitles_thread.start()
+
         video_id_param = 'video_id=%s' % video_id
         report_url = use_remote_history and playback_stats.get('watchtime_url')
 
@@ -322,6 +342,87 @@ class PlayerMonitorThread(object):
 
         self.end()
 
+    def prefetch_subtitles(self, client, playlist_player, num_items=2):
+        """
+        Downloads the subtitles of the next items in the active playlist, so
+        that playback of these items is not delayed by the download
+        """
+        context = self._context
+        position, remaining = playlist_player.get_position(offset=1)
+        if not position:
+            return
+
+        for position in range(position, position + min(num_items,
+                                                        remaining + 1)):
+            if self.abort_now():
+                break
+            item_uri = playlist_player.get_item_path(position - 1)
+            if not context.is_plugin_path(item_uri, PATHS.PLAY):
+                continue
+            _, params = context.parse_uri(item_uri)
+            video_id = params.get(VIDEO_ID)
+            if not video_id or video_id == self.video_id:
+                continue
+            try:
+                if client.prefetch_subtitles(video_id):
+                    self.log.debug('Prefetched subtitles for: %r', video_id)
+            except Exception:
+                self.log.exception('Subtitle prefetch failed for: %r',
+                                   video_id)
+
+    def attach_subtitles(self,
+                         file_paths,
+                         playlist_player,
+                         timeout=60,
+                         wait_interval=0.5):
+        """
+        Adds the subtitle files that were still being downloaded when playback
+        was resolved, as each download is completed. Kodi selects and enables
+        each added subtitle, so the previously selected subtitle is restored.
+        """
+        monitor = self._monitor
+        player = self._player
+        pending = list(file_paths)
+        waited = 0
+        while pending and waited < timeout and not self.abort_now():
+            for file_path in tuple(pending):
+                if not xbmcvfs.exists(file_path):
+                    continue
+                pending.remove(file_path)
+
+                player_id = playlist_player.get_player_id()
+                result = jsonrpc(method='Player.GetProperties',
+                                 params={'playerid': player_id,
+                                         'properties': ['currentsubtitle',
+                                                        'subtitleenabled']})
+                try:
+                    result = result['result']
+                    selected = result['currentsubtitle']['index']
+                    enabled = result['subtitleenabled']
+                except (KeyError, TypeError):
+                    selected = None
+                    enabled = False
+
+                if selected is None:
+                    params = {'playerid': player_id,
+                              'subtitle': 'off'}
+                else:
+                    params = {'playerid': player_id,
+                              'subtitle': selected,
+                              'enable': enabled}
+
+                self.log.debug('Adding subtitle: %r', file_path)
+                player.setSubtitles(file_path)
+                jsonrpc(method='Player.SetSubtitle',
+                        params=params,
+                        no_response=True)
+            if pending:
+                monitor.waitForAbort(wait_interval)
+                waited += wait_interval
+
+        if pending:
+            self.log.debug('Subtitles not added: %r', pending)
+
     def stop(self):
         self.log.debug('Stop event set')
         self._stopped.set()
@@ -10,8 +10,7 @@
 from __future__ import absolute_import, division, unicode_literals
 
 import json
-from io import open
-from threading import Event, Lock, Thread
+from threading import Lock, Thread
 
 from .. import logging
 from ..compatibility import urlsplit, xbmc, xbmcgui
@@ -39,10 +38,13 @@ from ..constants import (
     RESUMABLE,
     SERVER_WAKEUP,
     SERVICE_IPC,
+    SERVICE_IPC_ADDRESS,
     SYNC_LISTITEM,
     VIDEO_ID,
 )
+from ..json_store import JSONFile
 from ..network import get_connect_address, get_http_server, httpd_status
+from ..utils.ipc import IPCServer
 from ..utils.methods import jsonrpc
 
 
@@ -73,7 +75,17 @@ class ServiceMonitor(xbmc.Monitor):
         self.refresh = False
         self.interrupt = False
 
-        self.file_access = {}
+        self.json_files = {}
+        self._file_lock = Lock()
+        self.ipc_server = None
+        self._ipc_lock = Lock()
+        self._ipc_targets = frozenset((
+            CHECK_SETTINGS,
+            FILE_READ,
+            FILE_WRITE,
+            PLUGIN_WAKEUP,
+            SERVER_WAKEUP,
+        ))
 
         self.onSettingsChanged(force=True)
 
@@ -193,77 +205,27 @@ class ServiceMonitor(xbmc.Monitor):
                 return
 
             target = data.get('target')
+            if target not in self._ipc_targets:
+                return
 
-            if target == PLUGIN_WAKEUP:
-                self.system_idle = False
-                self.system_sleep = False
-                self.interrupt = True
-                response = True
-
-            elif target == SERVER_WAKEUP:
-                if not self.httpd and self.httpd_required():
-                    response = self.start_httpd()
-                else:
-                    response = bool(self.httpd)
-                if self.httpd_sleep_allowed:
-                    self.httpd_sleep_allowed = None
+            if target == FILE_WRITE and data.get('filepath'):
+                content = self._context.get_ui().pop_property(
+                    '-'.join((FILE_WRITE, data['filepath'])),
+                    log_value='<redacted>',
+                )
+                if content:
+                    content = content.encode('utf-8')
+            else:
+                content = None
 
-            elif target == CHECK_SETTINGS:
-                state = data.get('state')
-                if state == 'defer':
-                    self._settings_collect = True
-                elif state == 'process':
-                    self.onSettingsChanged(force=True)
-                elif state == 'ignore':
-                    self._settings_collect = -1
-                response = True
-
-            elif target in {FILE_READ, FILE_WRITE}:
-                response = None
-                filepath = data.get('filepath')
-                if filepath:
-                    if filepath not in self.file_access:
-                        read_access = Event()
-                        read_access.set()
-                        write_access = Lock()
-                        self.file_access[filepath] = (read_access, write_access)
-                    else:
-                        read_access, write_access = self.file_access[filepath]
-
-                    if target == FILE_READ:
-                        try:
-                            with open(filepath, mode='r',
-                                      encoding='utf-8') as file:
-                                read_access.wait()
-                                self.set_property(
-                                    '-'.join((FILE_READ, filepath)),
-                                    file.read(),
-                                    log_value='<redacted>',
-                                )
-                                response = True
-                        except (IOError, OSError):
-                            response = False
-                    else:
-                        with write_access:
-                            content = self._context.get_ui().pop_property(
-                                '-'.join((FILE_WRITE, filepath)),
-                                log_value='<redacted>',
-                            )
-                            response = None
-                            if content:
-                                read_access.clear()
-                                try:
-                                    with open(filepath, mode='w',
-                                              encoding='utf-8') as file:
-                                        file.write(content)
-                                    response = True
-                                except (IOError, OSError):
-                                    response = False
-                                finally:
-                                    read_access.set()
+            response, content = self.ipc_handler(target, data, content)
 
-            else:
-                return
+            if target == FILE_READ and content is not None:
+                self.set_property(
+                    '-'.join((FILE_READ, data['filepath'])),
+                    content.decode('utf-8'),
+                    log_value='<redacted>',
+                )
 
             if data.get('response_required'):
                 data['response'] = response
@@ -333,6 +295,87 @@ class ServiceMonitor(xbmc.Monitor):
                         'play_count': int(play_count) if play_count else 0,
                     })
 
+    def ipc_handler(self, target, data, content=None):
+        """
+        Processes a request from a plugin or script invocation, received
+        either as a notification or through the IPC socket server.
+
+        :param target: name of the requested procedure
+        :param data: dict of request parameters
+        :param content: bytes sent with the request, if any
+        :return: tuple of (response, content), where content is bytes to be
+                 returned to the caller, or None
+        """
+        with self._ipc_lock:
+            if target == PLUGIN_WAKEUP:
+                self.system_idle = False
+                self.system_sleep = False
+                self.interrupt = True
+                return True, None
+
+            if target == SERVER_WAKEUP:
+                if not self.httpd and self.httpd_required():
+                    response = self.start_httpd()
+                else:
+                    response = bool(self.httpd)
+                if self.httpd_sleep_allowed:
+                    self.httpd_sleep_allowed = None
+                return response, None
+
+            if target == CHECK_SETTINGS:
+                state = data.get('state')
+                if state == 'defer':
+                    self._settings_collect = True
+                elif state == 'process':
+                    self.onSettingsChanged(force=True)
+                elif state == 'ignore':
+                    self._settings_collect = -1
+                return True, None
+
+            if target not in {FILE_READ, FILE_WRITE}:
+                return None, None
+
+        filepath = data.get('filepath')
+        if not filepath:
+            return None, None
+
+        with self._file_lock:
+            json_file = self.json_files.get(filepath)
+            if json_file is None:
+                json_file = JSONFile(filepath)
+                self.json_files[filepath] = json_file
+
+        if target == FILE_READ:
+            return json_file.read(data.get('version'))
+        return json_file.write(content, update=data.get('update')), None
+
+    def flush_json_files(self):
+        with self._file_lock:
+            json_files = tuple(self.json_files.values())
+        for json_file in json_files:
+            json_file.flush()
+
+    def start_ipc_server(self):
+        if self.ipc_server:
+            return True
+        ipc_server = IPCServer(self.ipc_handler)
+        if not ipc_server.start():
+            return False
+        self.ipc_server = ipc_server
+        self._context.get_ui().set_property(
+            SERVICE_IPC_ADDRESS,
+            ipc_server.address,
+            log_value='<redacted>',
+        )
+        return True
+
+    def shutdown_ipc_server(self):
+        if not self.ipc_server:
+            return
+        self._context.get_ui().clear_property(SERVICE_IPC_ADDRESS)
+        self.ipc_server.stop()
+        self.ipc_server = None
+
     def onSettingsChanged(self, force=False):
         context = self._context
 
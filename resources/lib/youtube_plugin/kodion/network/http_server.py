@@ -12,7 +12,7 @@ from __future__ import absolute_import, division, unicode_literals
 import os
 import re
 import socket
-from collections import deque
+from collections import OrderedDict, deque
 from errno import (
     ECONNABORTED,
     ECONNREFUSED,
@@ -26,6 +26,8 @@ from io import open
 from json import dumps as json_dumps, loads as json_loads
 from select import select
 from textwrap import dedent
+from threading import BoundedSemaphore, Event, Lock
+from time import time
 
 from urllib3.exceptions import HTTPError
 
@@ -54,47 +56,218 @@ from ..utils.methods import wait
 from ..utils.redact import parse_and_redact_uri
 
 
+class ServerMetrics(object):
+    """
+    Thread safe record of connection usage and per route request latency.
+    Latencies are counted in histogram buckets of LATENCY_BUCKETS ms.
+    """
+
+    LATENCY_BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+    def __init__(self):
+        self._lock = Lock()
+        self._connections = {
+            'active': 0,
+            'total': 0,
+            'reused': 0,
+        }
+        self._routes = {}
+
+    def connection(self, opened):
+        with self._lock:
+            connections = self._connections
+            if opened:
+                connections['active'] += 1
+                connections['total'] += 1
+            else:
+                connections['active'] -= 1
+
+    def request(self, route, elapsed, reused=False):
+        elapsed_ms = elapsed * 1000
+        for bucket in self.LATENCY_BUCKETS:
+            if elapsed_ms <= bucket:
+                break
+        else:
+            bucket = 'inf'
+        with self._lock:
+            if reused:
+                self._connections['reused'] += 1
+            metrics = self._routes.get(route)
+            if metrics is None:
+                metrics = self._routes[route] = {
+                    'requests': 0,
+                    'latency_total': 0.0,
+                    'latency_max': 0.0,
+                    'histogram': {},
+                }
+            metrics['requests'] += 1
+            metrics['latency_total'] += elapsed
+            if elapsed > metrics['latency_max']:
+                metrics['latency_max'] = elapsed
+            histogram = metrics['histogram']
+            histogram[bucket] = histogram.get(bucket, 0) + 1
+
+    def get(self):
+        with self._lock:
+            routes = {
+                route: {
+                    'requests': metrics['requests'],
+                    'latency_total': round(metrics['latency_total'], 6),
+                    'latency_max': round(metrics['latency_max'], 6),
+                    'histogram': {
+                        str(bucket): metrics['histogram'][bucket]
+                        for bucket in self.LATENCY_BUCKETS + ('inf',)
+                        if bucket in metrics['histogram']
+                    },
+                }
+                for route, metrics in self._routes.items()
+            }
+            return {
+                'connections': self._connections.copy(),
+                'routes': routes,
+            }
+
+
 class HTTPServer(ThreadingMixIn, TCPServer):
+    log = logging.getLogger(__name__)
+
     address_family = socket.AF_INET
     socket_type = socket.SOCK_STREAM
-    request_queue_size = 5
+    request_queue_size = 32
     allow_reuse_address = True
     allow_reuse_port = True
 
     daemon_threads = False
     block_on_close = True
 
-    _handlers = []
+    # Maximum number of connections handled at the same time. New connections
+    # are rejected with a 503 response while all connections are in use.
+    max_connections = 32
+    # Time, in seconds, that a connection can remain idle between requests
+    # before it is closed, freeing the connection for use by other clients.
+    idle_timeout = 15
+    overload_response = (b'HTTP/1.1 503 Service Unavailable\r\n'
+                         b'Connection: close\r\n'
+                         b'Content-Length: 0\r\n'
+                         b'Retry-After: 1\r\n'
+                         b'\r\n')
+
+    def __init__(self, *args, **kwargs):
+        # Handlers of active connections, removed once a connection completes
+        self._handlers = set()
+        self._handlers_lock = Lock()
+        self.metrics = ServerMetrics()
+        # Data written to this socket pair wakes up all threads waiting in
+        # HTTPServer.wait_ready, so that threads can block without a timeout
+        # rather than polling to check whether the server is shutting down
+        self._wakeup_read, self._wakeup_write = socket.socketpair()
+        self._shutdown_request = False
+        self._is_shut_down = Event()
+        self._is_shut_down.set()
+        self._connections = BoundedSemaphore(self.max_connections)
+        super(HTTPServer, self).__init__(*args, **kwargs)
+
+    def wakeup(self):
+        try:
+            self._wakeup_write.send(b'\0')
+        except (OSError, socket.error):
+            pass
+
+    def wait_ready(self, readable=(), writable=(), timeout=None):
+        """
+        Blocks until one of the readable or writable files is ready, or until
+        the optional timeout, in seconds, has expired.
+        Returns False if the server is shutting down or the timeout expired,
+        True otherwise
+        """
+        wakeup = self._wakeup_read
+        try:
+            ready_read, ready_write, _ = select(readable + (wakeup,),
+                                                writable,
+                                                (),
+                                                timeout)
+        except (OSError, ValueError, socket.error):
+            return False
+        if wakeup in ready_read:
+            return False
+        return bool(ready_read or ready_write)
+
+    def serve_forever(self, poll_interval=None):
+        self._is_shut_down.clear()
+        try:
+            while not self._shutdown_request:
+                if self.wait_ready((self.socket,)):
+                    self._handle_request_noblock()
+        finally:
+            self._shutdown_request = False
+            self._is_shut_down.set()
+
+    def shutdown(self):
+        self._shutdown_request = True
+        self.wakeup()
+        self._is_shut_down.wait()
+
+    def process_request(self, request, client_address):
+        # Never block the serve thread waiting for a connection to complete
+        if not self._connections.acquire(False):
+            self.log.warning(('Too many connections',
+                              'Client: %s',
+                              'Max:    %d'),
+                             client_address[0],
+                             self.max_connections)
+            try:
+                request.sendall(self.overload_response)
+            except (OSError, socket.error):
+                pass
+            self.shutdown_request(request)
+            return
+        try:
+            super(HTTPServer, self).process_request(request, client_address)
+        except Exception:
+            self._connections.release()
+            raise
+
+    def process_request_thread(self, request, client_address):
+        try:
+            super(HTTPServer, self).process_request_thread(request,
+                                                           client_address)
+        finally:
+            self._connections.release()
 
     def finish_request(self, request, client_address):
         handler = self.RequestHandlerClass(request, client_address, self)
-        HTTPServer._handlers.append(handler)
+        with self._handlers_lock:
+            self._handlers.add(handler)
+        self.metrics.connection(opened=True)
 
         try:
             handler.handle()
         finally:
+            with self._handlers_lock:
+                self._handlers.discard(handler)
+            self.metrics.connection(opened=False)
             wfile = handler.wfile
-            while (not handler._close_all
-                   and not wfile.closed
-                   and not select((), (wfile,), (), 0.1)[1]):
-                pass
-            if handler._close_all or wfile.closed:
-                return
-            handler.finish()
+            if (not handler._close_all
+                    and not wfile.closed
+                    and self.wait_ready(writable=(wfile,))):
+                handler.finish()
 
     def server_close(self):
         request_handler = self.RequestHandlerClass
         request_handler._close_all = True
         request_handler.timeout = 0
+        self.wakeup()
 
-        for handler in HTTPServer._handlers:
+        with self._handlers_lock:
+            handlers = tuple(self._handlers)
+            self._handlers.clear()
+        for handler in handlers:
             handler.finish()
-        HTTPServer._handlers = []
 
         try:
             threads = self._threads.pop_all()
         except AttributeError:
-            return
+            threads = ()
         for thread in threads:
             if not thread.is_alive():
                 continue
@@ -111,6 +284,10 @@ class HTTPServer(ThreadingMixIn, TCPServer):
             except RuntimeError:
                 pass
 
+        super(HTTPServer, self).server_close()
+        self._wakeup_read.close()
+        self._wakeup_write.close()
+
 
 class RequestHandler(BaseHTTPRequestHandler, object):
     log = logging.getLogger(__name__)
@@ -130,6 +307,12 @@ class RequestHandler(BaseHTTPRequestHandler, object):
         'server_lists': {},
     }
 
+    # Manifest files are named by their content and are not modified once
+    # written, so the most recently served manifests are kept in memory
+    manifests = OrderedDict()
+    manifests_lock = Lock()
+    max_manifests = 10
+
     SWALLOWED_ERRORS = {
         ECONNABORTED,
         ECONNREFUSED,
@@ -155,6 +338,7 @@ class RequestHandler(BaseHTTPRequestHandler, object):
         self.request = request
         self.client_address = client_address
         self.server = server
+        self.num_requests = 0
         self.setup()
 
         # try/finally block implemented separately in HTTPServer.finish_request
@@ -168,14 +352,17 @@ class RequestHandler(BaseHTTPRequestHandler, object):
         # Allow self.rfile.readline call to be interrupted by
         # HTTPServer.server_close when connection is kept open by keep-alive
         rfile = self.rfile
-        while (not self._close_all
-               and not rfile.closed
-               and not select((rfile,), (), (), 0.1)[0]):
-            pass
-        if self._close_all or rfile.closed:
+        if (self._close_all
+                or rfile.closed
+                or not self.server.wait_ready(
+                    (rfile,),
+                    timeout=self.server.idle_timeout,
+                )):
             self.close_connection = True
             return
 
+        self.path = None
+        start = time()
         try:
             super(RequestHandler, self).handle_one_request()
             return
@@ -186,6 +373,22 @@ class RequestHandler(BaseHTTPRequestHandler, object):
                     or getattr(exc, 'errno', None) in self.SWALLOWED_ERRORS):
                 return
             raise exc
+        finally:
+            if self.path:
+                self.server.metrics.request(
+                    self.get_route(self.path),
+                    time() - start,
+                    reused=self.num_requests > 0,
+                )
+                self.num_requests += 1
+
+    @staticmethod
+    def get_route(path):
+        path = urlsplit(path).path
+        for route in _ROUTES:
+            if path.startswith(route):
+                return route
+        return 'other'
 
     def ip_address_status(self, ip_address):
         is_whitelisted = ip_address in self.whitelist_ips
@@ -248,6 +451,25 @@ class RequestHandler(BaseHTTPRequestHandler, object):
                                      is_local))
         return ip_allowed, path
 
+    @classmethod
+    def _get_manifest(cls, file):
+        if not file:
+            return None
+        manifests = cls.manifests
+        with cls.manifests_lock:
+            content = manifests.pop(file, None)
+            if content is None:
+                file_path = os.path.join(cls.BASE_PATH, file)
+                try:
+                    with open(file_path, mode='rb') as mpd_file:
+                        content = mpd_file.read()
+                except IOError:
+                    return None
+                while len(manifests) >= cls.max_manifests:
+                    manifests.popitem(last=False)
+            manifests[file] = content
+        return content
+
     # noinspection PyPep8Naming
     def do_GET(self):
         allowed, path = self.connection_allowed('GET')
@@ -272,30 +494,18 @@ class RequestHandler(BaseHTTPRequestHandler, object):
             self.wfile.write(client_json.encode('utf-8'))
 
         elif path['path'].startswith(PATHS.MPD):
-            try:
-                file = path['params'].get('file', empty)[0]
-                if file:
-                    file_path = os.path.join(self.BASE_PATH, file)
-                else:
-                    file_path = None
-                    raise IOError
-
-                file_size = os.path.getsize(file_path)
+            file = path['params'].get('file', empty)[0]
+            content = self._get_manifest(file)
+            if content is None:
+                response = ('File Not Found: {uri!r} -> {file!r}'
+                            .format(uri=path['log_uri'], file=file))
+                self.send_error(404, response)
+            else:
                 self.send_response(200)
                 self.send_header('Content-Type', 'application/dash+xml')
-                self.send_header('Content-Length', str(file_size))
+                self.send_header('Content-Length', str(len(content)))
                 self.end_headers()
-
-                with open(file_path, mode='rb', buffering=self.chunk_size) as f:
-                    while 1:
-                        file_chunk = f.read()
-                        if not file_chunk:
-                            break
-                        self.wfile.write(file_chunk)
-            except IOError:
-                response = ('File Not Found: {uri!r} -> {file_path!r}'
-                            .format(uri=path['log_uri'], file_path=file_path))
-                self.send_error(404, response)
+                self.wfile.write(content)
 
         elif api_config_enabled and path['path'] == PATHS.API:
             html = self.api_config_page()
@@ -370,6 +580,19 @@ class RequestHandler(BaseHTTPRequestHandler, object):
         elif path['path'] == PATHS.PING:
             self.send_error(204)
 
+        elif path['path'] == PATHS.METRICS:
+            metrics = self.server.metrics.get()
+            requests = self.requests
+            if requests:
+                metrics['pools'] = requests.get_pool_metrics()
+                metrics['hosts'] = requests.get_connection_metrics()
+            metrics_json = json_dumps(metrics).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(metrics_json)))
+            self.end_headers()
+            self.wfile.write(metrics_json)
+
         elif path['path'].startswith(PATHS.REDIRECT):
             url = path['params'].get('url', empty)[0]
             if url:
@@ -621,22 +844,23 @@ class RequestHandler(BaseHTTPRequestHandler, object):
                     self.end_headers()
 
                     wfile = self.wfile
-                    while (not self._close_all
-                           and not wfile.closed
-                           and not select((), (wfile,), (), 0.1)[1]):
-                        pass
-                    if self._close_all or wfile.closed:
-                        break
                     if content:
-                        wfile.write(content)
+                        chunks = (content,)
                     else:
-                        wfile.write(
-                            response.raw.read(
-                                amt=None,
-                                decode_content=False,
-                                cache_content=False,
-                            )
+                        # Relay the response as it is received rather than
+                        # reading the entire response before writing
+                        chunks = response.raw.stream(
+                            amt=self.chunk_size,
+                            decode_content=False,
                         )
+                    for chunk in chunks:
+                        if (self._close_all
+                                or wfile.closed
+                                or not self.server.wait_ready(
+                                    writable=(wfile,)
+                                )):
+                            break
+                        wfile.write(chunk)
                 break
 
         else:
@@ -652,23 +876,17 @@ class RequestHandler(BaseHTTPRequestHandler, object):
         empty = [None]
 
         if path['path'].startswith(PATHS.MPD):
-            try:
-                file = path['params'].get('file', empty)[0]
-                if file:
-                    file_path = os.path.join(self.BASE_PATH, file)
-                else:
-                    file_path = None
-                    raise IOError
-
-                file_size = os.path.getsize(file_path)
+            file = path['params'].get('file', empty)[0]
+            content = self._get_manifest(file)
+            if content is None:
+                response = ('File Not Found: {uri!r} -> {file!r}'
+                            .format(uri=path['log_uri'], file=file))
+                self.send_error(404, response)
+            else:
                 self.send_response(200)
                 self.send_header('Content-Type', 'application/dash+xml')
-                self.send_header('Content-Length', str(file_size))
+                self.send_header('Content-Length', str(len(content)))
                 self.end_headers()
-            except IOError:
-                response = ('File Not Found: {uri!r} -> {file_path!r}'
-                            .format(uri=path['log_uri'], file_path=file_path))
-                self.send_error(404, response)
 
         elif path['path'].startswith(PATHS.REDIRECT):
             self.send_error(404)
@@ -1225,3 +1443,16 @@ _LOCAL_RANGES = (
     (ipv6_octets('fe80::'), ipv6_octets('fe80::ffff:ffff:ffff:ffff')),
     '::1',
 )
+
+# Route prefixes used to group request metrics, with longer prefixes first
+_ROUTES = (
+    PATHS.API_SUBMIT,
+    PATHS.API,
+    PATHS.DRM,
+    PATHS.IP,
+    PATHS.METRICS,
+    PATHS.MPD,
+    PATHS.PING,
+    PATHS.REDIRECT,
+    PATHS.STREAM_PROXY,
+)
@@ -9,13 +9,23 @@
 
 from __future__ import absolute_import, division, unicode_literals
 
+import json
 import socket
+from ssl import CERT_REQUIRED, SSLSocket
 from atexit import register as atexit_register
 from collections import OrderedDict
+from copy import copy
 from os.path import exists, isdir
-
-from requests.adapters import HTTPAdapter, Retry
-from requests.exceptions import InvalidJSONError, RequestException, URLRequired
+from threading import Lock
+from time import time
+
+from requests.adapters import BaseAdapter, HTTPAdapter, Retry
+from requests.exceptions import (
+    ConnectionError as RequestsConnectionError,
+    InvalidJSONError,
+    RequestException,
+    URLRequired,
+)
 from requests.hooks import default_hooks
 from requests.models import DEFAULT_REDIRECT_LIMIT, Request
 from requests.sessions import Session
@@ -25,9 +35,16 @@ from requests.utils import (
     default_headers,
     extract_zipped_paths,
 )
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+from urllib3.util.connection import allowed_gai_family
 from urllib3.util.ssl_ import create_urllib3_context
 
 from .. import logging
+from ..compatibility import urlsplit
+from ..constants import CONNECTIVITY_STATE
+from ..debug import Tracer
 from ..utils.datetime import imf_fixdate
 from ..utils.methods import generate_hash
 
@@ -38,6 +55,245 @@ __all__ = (
 )
 
 
+class PoolMetrics(object):
+    """
+    Thread safe per host record of connection and connection pool usage.
+    Values are summed, with the maximum also recorded for timings.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._hosts = {}
+
+    def record(self, host, **values):
+        with self._lock:
+            metrics = self._hosts.get(host)
+            if metrics is None:
+                metrics = self._hosts[host] = {}
+            for name, value in values.items():
+                metrics[name] = metrics.get(name, 0) + value
+                if name.endswith('_time'):
+                    name = name[:-5] + '_max'
+                    if value > metrics.get(name, 0):
+                        metrics[name] = value
+
+    def get(self):
+        with self._lock:
+            hosts = {
+                host: {
+                    name: (round(value, 6)
+                           if isinstance(value, float) else
+                           value)
+                    for name, value in metrics.items()
+                }
+                for host, metrics in self._hosts.items()
+            }
+        for metrics in hosts.values():
+            if 'requests' in metrics:
+                metrics['reused'] = max(
+                    0, metrics['requests'] - metrics.get('opened', 0)
+                )
+        return hosts
+
+    def clear(self):
+        with self._lock:
+            self._hosts.clear()
+
+
+class DNSCache(object):
+    """
+    Thread safe cache of resolved addresses for each host and port.
+    Entries are kept for TTL seconds as the system resolver does not provide
+    the record TTL, and are invalidated if no connection could be made.
+    """
+
+    TTL = 300
+    MAX_SIZE = 128
+
+    def __init__(self, metrics=None):
+        self._lock = Lock()
+        self._cache = OrderedDict()
+        self.metrics = metrics
+
+    def resolve(self, host, port):
+        key = (host, port)
+        now = time()
+        metrics = self.metrics
+        with self._lock:
+            entry = self._cache.pop(key, None)
+            if entry and entry[0] > now:
+                self._cache[key] = entry
+                if metrics:
+                    metrics.record(host, dns_hits=1)
+                return entry[1]
+
+        addresses = socket.getaddrinfo(
+            host, port, allowed_gai_family(), socket.SOCK_STREAM
+        )
+        elapsed = time() - now
+        if metrics:
+            metrics.record(host, dns_lookups=1, dns_time=elapsed)
+
+        with self._lock:
+            cache = self._cache
+            cache[key] = (now + elapsed + self.TTL, addresses)
+            while len(cache) > self.MAX_SIZE:
+                cache.popitem(last=False)
+        return addresses
+
+    def invalidate(self, host, port):
+        with self._lock:
+            self._cache.pop((host, port), None)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+
+class _MeteredPoolMixin(object):
+    metrics = None
+
+    def _new_conn(self):
+        metrics = self.metrics
+        if metrics:
+            metrics.record(self.host, opened=1)
+        return super(_MeteredPoolMixin, self)._new_conn()
+
+    def _get_conn(self, timeout=None):
+        metrics = self.metrics
+        if not metrics:
+            return super(_MeteredPoolMixin, self)._get_conn(timeout)
+        start = time()
+        conn = super(_MeteredPoolMixin, self)._get_conn(timeout)
+        metrics.record(self.host, requests=1, wait_time=(time() - start))
+        return conn
+
+
+class _CachedDNSConnectionMixin(object):
+    dns_cache = None
+
+    def _new_conn(self):
+        dns_cache = self.dns_cache
+        if not dns_cache:
+            return super(_CachedDNSConnectionMixin, self)._new_conn()
+
+        host = self.host.strip('[]')
+        port = self.port
+        timeout = self.timeout
+        start = time()
+        try:
+            addresses = dns_cache.resolve(host, port)
+            sock = None
+            error = None
+            for family, sock_type, proto, _, address in addresses:
+                try:
+                    sock = socket.socket(family, sock_type, proto)
+                    for socket_option in self.socket_options or ():
+                        sock.setsockopt(*socket_option)
+                    # Only set explicit timeouts, not urllib3 default sentinel
+                    if timeout is None or isinstance(timeout, (int, float)):
+                        sock.settimeout(timeout)
+                    if self.source_address:
+                        sock.bind(self.source_address)
+                    sock.connect(address)
+                    break
+                except socket.error as exc:
+                    error = exc
+                    if sock is not None:
+                        sock.close()
+                        sock = None
+            if sock is None:
+                dns_cache.invalidate(host, port)
+                raise error or socket.error('No address found for host')
+        except socket.timeout:
+            raise ConnectTimeoutError(
+                self,
+                'Connection to {0} timed out. (connect timeout={1})'.format(
+                    host, timeout
+                ),
+            )
+        except socket.error as exc:
+            raise NewConnectionError(
+                self,
+                'Failed to establish a new connection: {0}'.format(exc),
+            )
+
+        metrics = dns_cache.metrics
+        if metrics:
+            metrics.record(host, connect_time=(time() - start))
+        return sock
+
+
+class _ResumableSSLSocket(SSLSocket):
+    """
+    SSLSocket that resumes the most recent TLS session for the same server
+    name, to avoid a full handshake when new connections are made
+    """
+
+    metrics = None
+    sessions = OrderedDict()
+    sessions_lock = Lock()
+    MAX_SESSIONS = 64
+
+    @classmethod
+    def _get_session(cls, server_hostname):
+        with cls.sessions_lock:
+            session = cls.sessions.get(server_hostname)
+            if session and time() >= session.time + session.timeout:
+                del cls.sessions[server_hostname]
+                session = None
+        return session
+
+    def _store_session(self):
+        server_hostname = self.server_hostname
+        # Resumed sessions skip certificate verification, so only store
+        # sessions that were established with verification enabled
+        if (not server_hostname
+                or self.context.verify_mode != CERT_REQUIRED):
+            return
+        try:
+            session = self.session
+        except (AttributeError, ValueError):
+            return
+        if not session or not session.has_ticket:
+            return
+        cls = self.__class__
+        with cls.sessions_lock:
+            sessions = cls.sessions
+            sessions.pop(server_hostname, None)
+            sessions[server_hostname] = session
+            while len(sessions) > cls.MAX_SESSIONS:
+                sessions.popitem(last=False)
+
+    @classmethod
+    def _create(cls, *args, **kwargs):
+        server_hostname = kwargs.get('server_hostname')
+        context = kwargs.get('context')
+        if (server_hostname
+                and not kwargs.get('session')
+                and context and context.verify_mode == CERT_REQUIRED):
+            kwargs['session'] = cls._get_session(server_hostname)
+        return super(_ResumableSSLSocket, cls)._create(*args, **kwargs)
+
+    def do_handshake(self, *args, **kwargs):
+        start = time()
+        result = super(_ResumableSSLSocket, self).do_handshake(*args, **kwargs)
+        elapsed = time() - start
+        metrics = self.metrics
+        if metrics:
+            metrics.record(self.server_hostname,
+                           handshakes=1,
+                           handshake_time=elapsed,
+                           resumed=(1 if self.session_reused else 0))
+        self._store_session()
+        return result
+
+    def close(self):
+        # TLS 1.3 session tickets are only received after the handshake
+        self._store_session()
+        super(_ResumableSSLSocket, self).close()
+
+
 class SSLHTTPAdapter(HTTPAdapter):
     _SOCKET_OPTIONS = (
         (socket.SOL_SOCKET, getattr(socket, 'SO_KEEPALIVE', None), 1),
@@ -63,6 +319,45 @@ class SSLHTTPAdapter(HTTPAdapter):
         else:
             _SSL_CONTEXT.load_verify_locations(cafile=_CA_PATH)
 
+    # DNS, connection and TLS handshake timings, shared by all adapters
+    connection_metrics = PoolMetrics()
+    # Not available in Python 2 or with the urllib3 PyOpenSSL backend
+    if hasattr(_SSL_CONTEXT, 'sslsocket_class'):
+        _ResumableSSLSocket.metrics = connection_metrics
+        _SSL_CONTEXT.sslsocket_class = _ResumableSSLSocket
+
+    def __init__(self, *args, **kwargs):
+        dns_cache = kwargs.pop('dns_cache', None)
+        if dns_cache is True:
+            dns_cache = DNSCache(metrics=self.connection_metrics)
+        self.dns_cache = dns_cache
+
+        metrics = PoolMetrics()
+        self.metrics = metrics
+        self._pool_classes_by_scheme = {
+            'http': type(str('MeteredHTTPConnectionPool'),
+                         (_MeteredPoolMixin, HTTPConnectionPool),
+                         {
+                             'metrics': metrics,
+                             'ConnectionCls': type(
+                                 str('CachedDNSHTTPConnection'),
+                                 (_CachedDNSConnectionMixin, HTTPConnection),
+                                 {'dns_cache': dns_cache},
+                             ),
+                         }),
+            'https': type(str('MeteredHTTPSConnectionPool'),
+                          (_MeteredPoolMixin, HTTPSConnectionPool),
+                          {
+                              'metrics': metrics,
+                              'ConnectionCls': type(
+                                  str('CachedDNSHTTPSConnection'),
+                                  (_CachedDNSConnectionMixin, HTTPSConnection),
+                                  {'dns_cache': dns_cache},
+                              ),
+                          }),
+        }
+        super(SSLHTTPAdapter, self).__init__(*args, **kwargs)
+
     def init_poolmanager(self, *args, **kwargs):
         kwargs['ssl_context'] = self._SSL_CONTEXT
 
@@ -71,7 +366,22 @@ class SSLHTTPAdapter(HTTPAdapter):
             if socket_option[1] is not None
         ]
 
-        return super(SSLHTTPAdapter, self).init_poolmanager(*args, **kwargs)
+        super(SSLHTTPAdapter, self).init_poolmanager(*args, **kwargs)
+        # Connection pools are created on demand by the pool manager, so
+        # substitute the pool classes to record usage metrics for each host
+        self.poolmanager.pool_classes_by_scheme = self._pool_classes_by_scheme
+
+    def get_metrics(self):
+        return self.metrics.get()
+
+    @classmethod
+    def get_connection_metrics(cls):
+        return cls.connection_metrics.get()
+
+    def close(self):
+        super(SSLHTTPAdapter, self).close()
+        if self.dns_cache:
+            self.dns_cache.clear()
 
     def cert_verify(self, conn, url, verify, cert):
         if verify:
@@ -85,6 +395,49 @@ class SSLHTTPAdapter(HTTPAdapter):
 
 
 class CustomSession(Session):
+    # Connection pool options for each class of host. Each host has its own
+    # pool in the adapter for its class, with up to pool_maxsize connections.
+    # Requests made to a host with no free connection in a blocking pool will
+    # wait until one is returned. Requests made to media hosts from the stream
+    # proxy should not be delayed, so new connections can be created that are
+    # then discarded once the pool is full.
+    HOST_CLASSES = {
+        'api': {
+            'hosts': (
+                '.youtube.com',
+                '.googleapis.com',
+                '.google.com',
+            ),
+            'pool_connections': 4,
+            'pool_maxsize': 32,
+            'pool_block': True,
+        },
+        'media': {
+            'hosts': (
+                '.googlevideo.com',
+            ),
+            'pool_connections': 10,
+            'pool_maxsize': 8,
+            'pool_block': False,
+            'dns_cache': True,
+        },
+        'images': {
+            'hosts': (
+                '.ytimg.com',
+                '.ggpht.com',
+                '.googleusercontent.com',
+            ),
+            'pool_connections': 4,
+            'pool_maxsize': 8,
+            'pool_block': True,
+        },
+        None: {
+            'pool_connections': 10,
+            'pool_maxsize': 10,
+            'pool_block': True,
+        },
+    }
+
     def __init__(self):
         #: A case-insensitive dictionary of headers to be sent on each
         #: :class:`Request <Request>` sent from this
@@ -144,17 +497,109 @@ class CustomSession(Session):
 
         # Default connection adapters.
         self.adapters = OrderedDict()
-        self.mount('https://', SSLHTTPAdapter(
-            pool_maxsize=20,
-            pool_block=True,
+        self.mount('https://', self._create_adapter(**self.HOST_CLASSES[None]))
+        self.mount('http://', HTTPAdapter())
+
+        # Connection adapters for each class of host, used for HTTPS requests
+        self._host_adapters = OrderedDict(
+            (host_class, self._create_adapter(**options))
+            for host_class, options in self.HOST_CLASSES.items()
+            if host_class is not None
+        )
+        self._host_class_cache = {}
+
+    @staticmethod
+    def _create_adapter(pool_connections=10,
+                        pool_maxsize=10,
+                        pool_block=True,
+                        dns_cache=None,
+                        **_kwargs):
+        return SSLHTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+            dns_cache=dns_cache,
             max_retries=Retry(
                 total=3,
                 backoff_factor=0.1,
                 status_forcelist={500, 502, 503, 504},
                 allowed_methods=None,
             )
-        ))
-        self.mount('http://', HTTPAdapter())
+        )
+
+    def get_host_class(self, hostname):
+        cache = self._host_class_cache
+        if hostname in cache:
+            return cache[hostname]
+
+        _hostname = '.' + hostname
+        for host_class, options in self.HOST_CLASSES.items():
+            if host_class is None:
+                continue
+            if _hostname.endswith(options['hosts']):
+                break
+        else:
+            host_class = None
+
+        if len(cache) > 256:
+            cache.clear()
+        cache[hostname] = host_class
+        return host_class
+
+    def get_adapter(self, url):
+        if url[:8].lower() == 'https://':
+            hostname = urlsplit(url).hostname
+            if hostname:
+                adapter = self._host_adapters.get(
+                    self.get_host_class(hostname.lower())
+                )
+                if adapter:
+                    return adapter
+        return super(CustomSession, self).get_adapter(url)
+
+    def mount_transport(self, host_class, adapter=None):
+        """
+        Replaces the transport used for HTTPS requests to a class of host.
+
+        :param host_class: one of the keys of HOST_CLASSES, or None for the
+                           transport used for all other HTTPS requests
+        :param adapter: requests.adapters.BaseAdapter instance implementing the
+                        transport, for example an HTTP/2 capable adapter. A new
+                        SSLHTTPAdapter is used if not provided.
+        :return: the previous adapter, which is not closed
+        """
+        if host_class is not None and host_class not in self.HOST_CLASSES:
+            raise KeyError('Unknown host class: {0!r}'.format(host_class))
+        if adapter is None:
+            adapter = self._create_adapter(**self.HOST_CLASSES[host_class])
+        elif not isinstance(adapter, BaseAdapter):
+            raise TypeError('Invalid transport adapter: {0!r}'.format(adapter))
+
+        if host_class is None:
+            old_adapter = self.adapters.get('https://')
+            self.mount('https://', adapter)
+        else:
+            old_adapter = self._host_adapters.get(host_class)
+            self._host_adapters[host_class] = adapter
+        return old_adapter
+
+    def get_pool_metrics(self):
+        """
+        Returns connection pool usage for each host, grouped by host class.
+        Transports that do not provide a get_metrics method are omitted.
+        """
+        adapters = [(None, self.adapters.get('https://'))]
+        adapters.extend(self._host_adapters.items())
+        return {
+            (host_class or 'default'): adapter.get_metrics()
+            for host_class, adapter in adapters
+            if callable(getattr(adapter, 'get_metrics', None))
+        }
+
+    def close(self):
+        super(CustomSession, self).close()
+        for adapter in self._host_adapters.values():
+            adapter.close()
 
 
 class BaseRequestsClass(object):
@@ -171,6 +616,21 @@ class BaseRequestsClass(object):
 
     METHODS_TO_CACHE = {'GET', 'HEAD'}
 
+    # Connectivity state is tracked passively from the outcome of requests and
+    # shared between threads, plugin invocations and the service using a
+    # window property. Active checks are only required if the state is
+    # unknown, was invalidated by a connection error, or has been offline for
+    # longer than CONNECTIVITY_OFFLINE_TTL seconds.
+    CONNECTIVITY_OFFLINE_TTL = 60
+    CONNECTIVITY_SYNC_PERIOD = 30
+
+    _connectivity = {
+        'online': None,
+        'timestamp': 0,
+        'synced': 0,
+    }
+    _connectivity_lock = Lock()
+
     def __init__(self,
                  context=None,
                  verify_ssl=None,
@@ -218,6 +678,90 @@ class BaseRequestsClass(object):
     def reinit(self, **kwargs):
         self.__init__(**kwargs)
 
+    def clone(self, context=None):
+        """
+        Returns a shallow copy of the client. If provided, the copy uses
+        context rather than the context shared by all clients.
+        """
+        client = copy(self)
+        if context is not None:
+            client._context = context
+        return client
+
+    @classmethod
+    def get_pool_metrics(cls):
+        return cls._session.get_pool_metrics()
+
+    @staticmethod
+    def get_connection_metrics():
+        return SSLHTTPAdapter.get_connection_metrics()
+
+    @classmethod
+    def _sync_connectivity(cls, state, now, write=False):
+        context = cls._context
+        if not context:
+            return state
+        ui = context.get_ui()
+        if write:
+            ui.set_property(CONNECTIVITY_STATE,
+                            json.dumps({'online': state['online'],
+                                        'timestamp': state['timestamp']}),
+                            stacklevel=3)
+        else:
+            try:
+                stored_state = json.loads(ui.get_property(CONNECTIVITY_STATE,
+                                                          stacklevel=3))
+                if stored_state['timestamp'] > state['timestamp']:
+                    state['online'] = stored_state['online']
+                    state['timestamp'] = stored_state['timestamp']
+            except (KeyError, TypeError, ValueError):
+                pass
+        state['synced'] = now
+        return state
+
+    @classmethod
+    def get_connectivity(cls):
+        """
+        Returns the current connectivity state without making any requests
+        :return: True if online, False if offline, or None if an active check
+                 is required to determine the connectivity state
+        """
+        now = time()
+        with cls._connectivity_lock:
+            state = cls._connectivity
+            if now - state['synced'] >= cls.CONNECTIVITY_SYNC_PERIOD:
+                state = cls._sync_connectivity(state, now)
+            online = state['online']
+            if online is False:
+                if now - state['timestamp'] >= cls.CONNECTIVITY_OFFLINE_TTL:
+                    return None
+            return online
+
+    @classmethod
+    def set_connectivity(cls, online):
+        """
+        Updates the connectivity state, sharing it only if the state changed
+        :param online: True if online, False if offline, None if unknown
+        :return: True if the connectivity state changed, False otherwise
+        """
+        state = cls._connectivity
+        if online and state['online']:
+            return False
+
+        now = time()
+        with cls._connectivity_lock:
+            changed = state['online'] is not online
+            state['online'] = online
+            state['timestamp'] = now
+            if changed or online is False:
+                cls._sync_connectivity(state, now, write=True)
+        if changed:
+            cls.log.debug('Connectivity state changed: {state}',
+                          state=('online' if online else
+                                 'unknown' if online is None else
+                                 'offline'))
+        return changed
+
     def __enter__(self):
         return self
 
@@ -329,6 +873,15 @@ class BaseRequestsClass(object):
                 hooks=hooks,
             ))
 
+        if Tracer.enabled and prepared_request:
+            _, netloc, path, _, _ = urlsplit(prepared_request.url)
+            span = Tracer.span('Request',
+                               'network',
+                               method=prepared_request.method,
+                               url=netloc + path)
+        else:
+            span = Tracer.span('Request', 'network')
+
         if stream:
             cache = False
         if cache is not False:
@@ -392,6 +945,7 @@ class BaseRequestsClass(object):
             status_code = getattr(response, 'status_code', None)
             if not status_code:
                 raise self._default_exc[0](response=response)
+            self.set_connectivity(True)
 
             if cached_response is None or status_code != 304:
                 timestamp = response.headers.get('Date')
@@ -407,6 +961,10 @@ class BaseRequestsClass(object):
                 cached_response = None
 
         except self._default_exc as exc:
+            if isinstance(exc, RequestsConnectionError):
+                # Invalidate connectivity state so that next check is active
+                self.set_connectivity(None)
+
             exc_response = exc.response or response
             if exc_response:
                 response_text = exc_response.text
@@ -416,6 +974,7 @@ class BaseRequestsClass(object):
                 response_text = None
                 response_status = 'Error'
                 response_reason = 'No response'
+            span.end(result='error', status=response_status)
 
             log_msg = [
                 '{title}',
@@ -475,7 +1034,7 @@ class BaseRequestsClass(object):
                 raise exc
 
         if not cache:
-            pass
+            span.end(result='uncached')
         elif cached_response is not None:
             self.log.debug(('Using cached response',
                             'Request ID: {request_id}',
@@ -485,6 +1044,7 @@ class BaseRequestsClass(object):
                            etag=etag,
                            timestamp=timestamp,
                            stacklevel=stacklevel)
+            span.end(result='304')
             cache.set(request_id)
             response = cached_response
         elif response is not None:
@@ -496,6 +1056,8 @@ class BaseRequestsClass(object):
                            etag=etag,
                            timestamp=timestamp,
                            stacklevel=stacklevel)
+            span.end(result='miss')
             cache.set(request_id, response, etag)
+        span.end()
 
         return response
@@ -10,17 +10,31 @@
 
 from __future__ import absolute_import, division, unicode_literals
 
+import json
+import os
+from uuid import uuid4
+
 from ..abstract_plugin import AbstractPlugin
 from ... import logging
-from ...compatibility import string_type, xbmc, xbmcgui, xbmcplugin
+from ...compatibility import (
+    generate_hash,
+    pickle,
+    string_type,
+    xbmc,
+    xbmcgui,
+    xbmcplugin,
+)
 from ...constants import (
     ACTION,
     BUSY_FLAG,
     CONTAINER_FOCUS,
     CONTAINER_ID,
+    CONTAINER_ITEMS,
     CONTAINER_POSITION,
     FOLDER_URI,
     FORCE_PLAY_PARAMS,
+    INCOGNITO,
+    LISTING_CACHE_TOKEN,
     PATHS,
     PLAYBACK_FAILED,
     PLAYER_VIDEO_ID,
@@ -41,11 +55,13 @@ from ...constants import (
     WINDOW_REPLACE,
     WINDOW_RETURN,
 )
+from ...debug import Timings
 from ...exceptions import KodionException
 from ...items import (
     CommandItem,
     directory_listitem,
     image_listitem,
+    listitems,
     media_listitem,
     playback_item,
     uri_listitem,
@@ -75,9 +91,79 @@ class XbmcPlugin(AbstractPlugin):
         'VideoItem': playback_item,
     }
 
+    _LISTING_CACHE_EXCLUDED_PARAMS = frozenset((
+        'refresh',
+    ))
+
     def __init__(self):
         super(XbmcPlugin, self).__init__()
 
+    def _get_listing_cache_id(self, context, ui):
+        """
+        Creates an id for the rendered listing of the current path and params,
+        the state of the settings, the login state, and the state of the local
+        stores used to render items (playback history, bookmarks, watch later
+        and search history), so that changes made elsewhere are not shown
+        stale. The id also includes a token that is replaced whenever a
+        container refresh is requested, so that previously rendered listings
+        are no longer used after any event that would otherwise trigger a
+        refresh.
+        """
+        token = ui.get_property(LISTING_CACHE_TOKEN)
+        if not token:
+            token = uuid4().hex
+            ui.set_property(LISTING_CACHE_TOKEN, token)
+
+        try:
+            settings_state = os.path.getmtime(
+                os.path.join(context.get_data_path(), 'settings.xml')
+            )
+        except (OSError, TypeError):
+            settings_state = None
+
+        login_state = context.get_access_manager().get_refresh_tokens()[1]
+
+        stores_state = [
+            store.get_file_state()
+            for store in (
+                context.get_playback_history(),
+                context.get_bookmarks_list(),
+                context.get_watch_later_list(),
+                context.get_search_history(),
+            )
+        ]
+
+        excluded_params = self._LISTING_CACHE_EXCLUDED_PARAMS
+        params = sorted(
+            (param, value)
+            for param, value in context.get_params().items()
+            if param not in excluded_params
+        )
+        return generate_hash(
+            token,
+            context.get_path().rstrip('/'),
+            params,
+            settings_state,
+            login_state,
+            stores_state,
+        )
+
+    @staticmethod
+    def _listing_cacheable(provider, context, result, options):
+        if not result or context.get_param(INCOGNITO):
+            return False
+        if not options.get(provider.CACHE_TO_DISC, True):
+            return False
+        for option in (provider.FALLBACK,
+                       provider.FORCE_REFRESH,
+                       provider.FORCE_RESOLVE,
+                       provider.FORCE_RETURN,
+                       provider.POST_RUN):
+            if options.get(option):
+                return False
+        # Items with callbacks are processed on each run and cannot be stored
+        return not any(item.callback for item in result)
+
     def run(self,
             provider,
             context,
@@ -196,6 +282,9 @@ class XbmcPlugin(AbstractPlugin):
             provider.run_wizard(context, last_run=setup_wizard_required)
         show_fanart = settings.fanart_selection()
 
+        listing_cache_ttl = settings.cache_listings_ttl()
+        listing_cache_id = None
+        cached_listing = None
         try:
             if route:
                 function_cache = context.get_function_cache()
@@ -206,7 +295,19 @@ class XbmcPlugin(AbstractPlugin):
                     context=context.clone(route),
                 )
             else:
-                result, options = provider.navigate(context)
+                if listing_cache_ttl and path != PATHS.PLAY:
+                    listing_cache = context.get_listing_cache()
+                    listing_cache_id = self._get_listing_cache_id(context, ui)
+                    if not context.refresh_requested():
+                        cached_listing = listing_cache.get_listing(
+                            listing_cache_id,
+                            seconds=listing_cache_ttl * 60,
+                        )
+                if cached_listing:
+                    logging.debug('Using cached listing')
+                    result, options = cached_listing
+                else:
+                    result, options = provider.navigate(context)
                 if ui.get_property(REROUTE_PATH):
                     xbmcplugin.endOfDirectory(
                         handle,
@@ -238,12 +339,24 @@ class XbmcPlugin(AbstractPlugin):
         if play_cancelled:
             result = None
 
+        timings = Timings('Listing', enabled=logging.debugging)
+
         force_resolve = options.get(provider.FORCE_RESOLVE)
         force_return = options.get(provider.FORCE_RETURN)
         result_item = None
         result_item_type = None
         items = None
         if isinstance(result, (list, tuple)):
+            if (listing_cache_id
+                    and not cached_listing
+                    and self._listing_cacheable(provider,
+                                                context,
+                                                result,
+                                                options)):
+                cache_listing = (result, options)
+            else:
+                cache_listing = None
+
             if not result:
                 result = [
                     CommandItem(
@@ -263,30 +376,26 @@ class XbmcPlugin(AbstractPlugin):
                         post_run_actions.append(_post_run_action)
                         _post_run_action = None
 
-            items = []
-            for item in result:
-                item_type = item.__class__.__name__
-
-                if (force_resolve
-                        and not result_item
-                        and item_type in self._PLAY_ITEM_MAP
-                        and item.playable):
-                    result_item = item
-                    result_item_type = item_type
-
-                listitem_type = self._LIST_ITEM_MAP.get(item_type)
-                if (not listitem_type
-                        or (listitem_type == directory_listitem
-                            and not item.available)):
-                    continue
-
-                items.append(listitem_type(
+            if force_resolve:
+                for item in result:
+                    item_type = item.__class__.__name__
+                    if item_type in self._PLAY_ITEM_MAP and item.playable:
+                        result_item = item
+                        result_item_type = item_type
+                        break
+
+            item_details = []
+            with timings('ListItem conversion'):
+                items = listitems(
                     context,
-                    item,
+                    result,
+                    self._LIST_ITEM_MAP,
                     show_fanart=show_fanart,
                     to_sync=sync_items,
-                ))
+                    item_details=item_details,
+                )
         else:
+            cache_listing = None
             result_item = result
             result_item_type = result.__class__.__name__
 
@@ -296,8 +405,17 @@ class XbmcPlugin(AbstractPlugin):
                 context.apply_content(**content_type)
             else:
                 context.apply_content()
-            succeeded = xbmcplugin.addDirectoryItems(
-                handle, items, len(items)
+            with timings('Add directory items'):
+                succeeded = xbmcplugin.addDirectoryItems(
+                    handle, items, len(items)
+                )
+            timings.log_stats(count=len(items))
+            # Details of each item, in listing order, used by the service to
+            # update the focused item properties without querying the item
+            ui.set_property(
+                CONTAINER_ITEMS,
+                json.dumps(item_details, ensure_ascii=False),
+                log_value='<{0} items>'.format(len(item_details)),
             )
             cache_to_disc = options.get(provider.CACHE_TO_DISC, True)
             update_listing = options.get(provider.UPDATE_LISTING, False)
@@ -410,6 +528,14 @@ class XbmcPlugin(AbstractPlugin):
             cacheToDisc=cache_to_disc,
         )
 
+        # Stored once the listing has been displayed
+        if cache_listing and succeeded:
+            try:
+                context.get_listing_cache().set_listing(listing_cache_id,
+                                                        *cache_listing)
+            except (AttributeError, TypeError, pickle.PicklingError) as exc:
+                logging.warning('Unable to cache listing: %s', exc)
+
         if not force_return:
             if any(sync_items):
                 context.send_notification(SYNC_LISTITEM, sync_items)
@@ -17,10 +17,12 @@ from .constants import (
     CHECK_SETTINGS,
     FOLDER_URI,
     PATHS,
+    TEMP_PATH,
 )
 from .context import XbmcContext
-from .debug import Profiler
+from .debug import Profiler, Tracer
 from .plugin import XbmcPlugin
+from .utils.file_system import make_dirs
 from ..youtube import Provider
 
 
@@ -40,7 +42,8 @@ def run(context=_context,
         log=_log,
         plugin=_plugin,
         provider=_provider,
-        profiler=_profiler):
+        profiler=_profiler,
+        tracer=Tracer):
     ui = context.get_ui()
 
     if ui.pop_property(CHECK_SETTINGS):
@@ -65,10 +68,18 @@ def run(context=_context,
         log.verbose_logging = False
         profiler.disable()
 
+    # Tracing is much cheaper than profiling, so is enabled separately
+    trace = settings.trace_enabled()
+    tracer.enable(trace)
+
     old_path = context.get_path().rstrip('/')
     old_uri = ui.get_container_info(FOLDER_URI, container_id=None)
     old_handle = context.get_handle()
     context.init()
+    # The plugin interpreter is reused between invocations, so reload the
+    # access manager data once per invocation, in case tokens were updated by
+    # another process. Data is only parsed again if it has changed.
+    context.get_access_manager().load(ipc=None)
     current_path = context.get_path().rstrip('/')
     current_params = context.get_original_params()
     current_handle = context.get_handle()
@@ -124,13 +135,21 @@ def run(context=_context,
     gc_threshold = gc.get_threshold()
     gc.set_threshold(0)
     try:
-        plugin.run(provider,
-                   context,
-                   forced=forced,
-                   is_same_path=is_same_path,
-                   **new_kwargs)
+        with tracer.span('Plugin run',
+                         'plugin',
+                         path=current_path,
+                         handle=current_handle,
+                         forced=forced):
+            plugin.run(provider,
+                       context,
+                       forced=forced,
+                       is_same_path=is_same_path,
+                       **new_kwargs)
     finally:
         if log_level:
             profiler.print_stats()
+        if trace:
+            tracer.log_stats()
+            tracer.export(make_dirs('/'.join((TEMP_PATH, 'traces'))))
         gc.collect()
         gc.set_threshold(*gc_threshold)
@@ -246,6 +246,9 @@ def _maintenance_actions(context, action, params):
 
         if ui.on_clear_content(localize('maintenance.{0}'.format(target))):
             targets[target]().clear()
+            # Rendered listings are built from the cached data
+            if target in {'data_cache', 'function_cache'}:
+                context.get_listing_cache().clear()
             ui.show_notification(localize('completed'))
 
     elif action == 'refresh':
@@ -297,6 +300,7 @@ def _maintenance_actions(context, action, params):
             'data_cache': 'data_cache.sqlite',
             'feed_history': 'feeds.sqlite',
             'function_cache': 'cache.sqlite',
+            'listing_cache': 'listings.sqlite',
             'playback_history': 'history.sqlite',
             'requests_cache': 'requests_cache.sqlite',
             'search_history': 'search.sqlite',
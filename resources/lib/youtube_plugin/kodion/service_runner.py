@@ -10,6 +10,8 @@
 
 from __future__ import absolute_import, division, unicode_literals
 
+import json
+
 from . import logging
 from .constants import (
     ABORT_FLAG,
@@ -18,6 +20,7 @@ from .constants import (
     BUSY_FLAG,
     CHANNEL_ID,
     CONTAINER_ID,
+    CONTAINER_ITEMS,
     CONTAINER_POSITION,
     CURRENT_ITEM,
     MARK_AS_LABEL,
@@ -64,6 +67,7 @@ def run():
     get_listitem_info = ui.get_listitem_info
     get_listitem_property = ui.get_listitem_property
     clear_property = ui.clear_property
+    get_property = ui.get_property
     set_property = ui.set_property
 
     localize = context.localize
@@ -71,6 +75,7 @@ def run():
     clear_property(ABORT_FLAG)
     if ui.get_property(SERVICE_RUNNING_FLAG) == BUSY_FLAG:
         monitor.refresh_container()
+    monitor.start_ipc_server()
     set_property(SERVICE_RUNNING_FLAG)
 
     # wipe add-on temp folder on updates/restarts (subtitles, and mpd files)
@@ -92,6 +97,29 @@ def run():
     active_interval_ms = 100
     idle_interval_ms = 1000
 
+    prefetch_thread = None
+    prefetch_time_ms = 0
+
+    token_refresh_thread = None
+    token_refresh_time_ms = 0
+    token_refresh_period_ms = 60000
+
+    # Background tasks are run with a detached provider and a clone of the
+    # context, as the provider, its client and the context are also used by
+    # the main loop and the player monitor threads
+    def _warm_cache(_provider, _context, stop_event):
+        def _abort():
+            return (stop_event.is_set()
+                    or monitor.abortRequested()
+                    or monitor.system_sleep
+                    or player.isPlaying())
+
+        _provider.warm_cache(_context, _abort)
+
+    def _refresh_access_tokens(_provider, _context, stop_event):
+        if not stop_event.is_set():
+            _provider.refresh_access_tokens(_context)
+
     def _get_mark_as_label(_name,
                            container_id,
                            unwatched_label=localize('history.mark.unwatched'),
@@ -100,21 +128,84 @@ def run():
             return unwatched_label
         return watched_label
 
+    # Details of the items of the last listing created by the plugin, parsed
+    # from the CONTAINER_ITEMS property, and indexed by URI when required
+    listing = {'data': None, 'items': (), 'index': None}
+
+    def _get_item_details(position, container_id):
+        """
+        Looks up the details of the focused item, from the details of the
+        items of the last listing created by the plugin. The item at the
+        focused position is used if its URI matches the focused item, falling
+        back to a lookup by URI if the listing has been sorted.
+        Returns None if the focused item is not part of the listing.
+        """
+        data = get_property(CONTAINER_ITEMS, log_value='<redacted>')
+        if data != listing['data']:
+            try:
+                items = json.loads(data) if data else ()
+            except ValueError:
+                items = ()
+            listing['data'] = data
+            listing['items'] = items
+            listing['index'] = None
+        items = listing['items']
+        if not items:
+            return None
+
+        uri = get_listitem_info(URI, container_id)
+        try:
+            details = items[int(position) - 1]
+            if details.get(URI) == uri:
+                return details
+        except (IndexError, TypeError, ValueError):
+            pass
+
+        index = listing['index']
+        if index is None:
+            index = {details.get(URI): details for details in items}
+            listing['index'] = index
+        return index.get(uri)
+
     container_id = None
     container_position = None
+    pending_position = None
     item_has_id = None
     plugin_item_details = {
-        VIDEO_ID: {'getter': get_listitem_property, 'value': None},
-        BOOKMARK_ID: {'getter': get_listitem_property, 'value': None},
-        CHANNEL_ID: {'getter': get_listitem_property, 'value': None},
-        PLAYLIST_ID: {'getter': get_listitem_property, 'value': None},
-        PLAYLIST_ITEM_ID: {'getter': get_listitem_property, 'value': None},
-        SUBSCRIPTION_ID: {'getter': get_listitem_property, 'value': None},
-        '__has_id__': {'getter': None, 'value': TypeError},
-        URI: {'getter': get_listitem_info, 'value': None},
-        TITLE: {'getter': get_listitem_info, 'value': None},
-        ARTIST: {'getter': get_listitem_info, 'value': None},
-        MARK_AS_LABEL: {'getter': _get_mark_as_label, 'value': None},
+        VIDEO_ID: {'getter': get_listitem_property,
+                   'listed': True,
+                   'value': None},
+        BOOKMARK_ID: {'getter': get_listitem_property,
+                      'listed': True,
+                      'value': None},
+        CHANNEL_ID: {'getter': get_listitem_property,
+                     'listed': True,
+                     'value': None},
+        PLAYLIST_ID: {'getter': get_listitem_property,
+                      'listed': True,
+                      'value': None},
+        PLAYLIST_ITEM_ID: {'getter': get_listitem_property,
+                           'listed': True,
+                           'value': None},
+        SUBSCRIPTION_ID: {'getter': get_listitem_property,
+                          'listed': True,
+                          'value': None},
+        '__has_id__': {'getter': None,
+                       'listed': False,
+                       'value': TypeError},
+        URI: {'getter': get_listitem_info,
+              'listed': True,
+              'value': None},
+        TITLE: {'getter': get_listitem_info,
+                'listed': True,
+                'value': None},
+        ARTIST: {'getter': get_listitem_info,
+                 'listed': True,
+                 'value': None},
+        # Play count can be changed by Kodi without the listing being updated
+        MARK_AS_LABEL: {'getter': _get_mark_as_label,
+                        'listed': False,
+                        'value': None},
     }
 
     while not monitor.abortRequested():
@@ -159,6 +250,34 @@ def run():
                 else:
                     monitor.shutdown_httpd(terminate=True)
 
+        prefetch_interval_ms = (
+                context.get_settings().cache_prefetch_interval() * 60000
+        )
+        if not prefetch_interval_ms:
+            prefetch_time_ms = 0
+        elif (prefetch_time_ms >= prefetch_interval_ms
+              and plugin_is_idle
+              and not is_asleep
+              and not (prefetch_thread and prefetch_thread.is_alive())
+              and not (token_refresh_thread and token_refresh_thread.is_alive())
+              and not player.isPlaying()):
+            prefetch_time_ms = 0
+            prefetch_thread = provider.run_background_task(_warm_cache,
+                                                           context)
+
+        # Refresh access tokens before they expire, so plugin invocations do
+        # not need to wait for the tokens to be refreshed
+        if is_asleep:
+            token_refresh_time_ms = 0
+        elif (token_refresh_time_ms >= token_refresh_period_ms
+              and not (token_refresh_thread and token_refresh_thread.is_alive())
+              and not (prefetch_thread and prefetch_thread.is_alive())):
+            token_refresh_time_ms = 0
+            token_refresh_thread = provider.run_background_task(
+                _refresh_access_tokens,
+                context,
+            )
+
         container = get_container(container_type=False)
         check_item = not plugin_is_idle and all(container.values())
         if check_item:
@@ -199,7 +318,11 @@ def run():
                     set_property(CONTAINER_ID, container_id)
 
                 _position = get_container_info(CURRENT_ITEM, container_id)
-                if _position and _position != container_position:
+                if _position != pending_position:
+                    # Wait for the position to settle while scrolling
+                    pending_position = _position
+                elif _position and _position != container_position:
+                    item_details = _get_item_details(_position, container_id)
                     _item_has_id = None
                     for name, detail in plugin_item_details.items():
                         value = detail['value']
@@ -211,10 +334,12 @@ def run():
                                     break
                                 _item_has_id = False
                             continue
-                        if _item_has_id is not False:
-                            new_value = detail['getter'](name, container_id)
-                        else:
+                        if _item_has_id is False:
                             new_value = None
+                        elif item_details is not None and detail['listed']:
+                            new_value = item_details.get(name)
+                        else:
+                            new_value = detail['getter'](name, container_id)
                         if new_value:
                             if new_value != value:
                                 detail['value'] = new_value
@@ -238,6 +363,8 @@ def run():
             wait_time_ms += wait_interval_ms
             httpd_idle_time_ms += wait_interval_ms
             plugin_idle_time_ms += wait_interval_ms
+            prefetch_time_ms += wait_interval_ms
+            token_refresh_time_ms += wait_interval_ms
 
             if wait_time_ms >= loop_period_ms:
                 break
@@ -246,10 +373,20 @@ def run():
 
     set_property(ABORT_FLAG)
     clear_property(SERVICE_RUNNING_FLAG)
+    monitor.shutdown_ipc_server()
+    monitor.flush_json_files()
 
     # clean up any/all playback monitoring threads
     player.cleanup_threads(only_ended=False)
 
+    # wait for any cache prefetching or token refresh to stop
+    for thread in (prefetch_thread, token_refresh_thread):
+        if thread and thread.is_alive():
+            try:
+                thread.join(5)
+            except RuntimeError:
+                pass
+
     # shutdown http server
     if monitor.httpd:
         monitor.shutdown_httpd(terminate=True)
@@ -104,6 +104,16 @@ class AbstractSettings(object):
             return self.set_int(SETTINGS.CACHE_SIZE, value)
         return self.get_int(SETTINGS.CACHE_SIZE, 20)
 
+    def cache_prefetch_interval(self, value=None):
+        if value is not None:
+            return self.set_int(SETTINGS.CACHE_PREFETCH, value)
+        return self.get_int(SETTINGS.CACHE_PREFETCH, 0)
+
+    def cache_listings_ttl(self, value=None):
+        if value is not None:
+            return self.set_int(SETTINGS.CACHE_LISTINGS, value)
+        return self.get_int(SETTINGS.CACHE_LISTINGS, 0)
+
     def get_search_history_size(self):
         return self.get_int(SETTINGS.SEARCH_SIZE, 10)
 
@@ -804,6 +814,11 @@ class AbstractSettings(object):
         return (self.get_int(SETTINGS.LOG_LEVEL, 0)
                 or get_kodi_setting_bool('debug.showloginfo'))
 
+    def trace_enabled(self, value=None):
+        if value is not None:
+            return self.set_bool(SETTINGS.TRACE_ENABLED, value)
+        return self.get_bool(SETTINGS.TRACE_ENABLED, False)
+
     def exec_limit(self, value=None):
         if value is not None:
             return self.set_int(SETTINGS.EXEC_LIMIT, value)
@@ -11,6 +11,7 @@ from .bookmarks_list import BookmarksList
 from .data_cache import DataCache
 from .feed_history import FeedHistory
 from .function_cache import FunctionCache
+from .listing_cache import ListingCache
 from .playback_history import PlaybackHistory
 from .request_cache import RequestCache
 from .search_history import SearchHistory
@@ -22,6 +23,7 @@ __all__ = (
     'DataCache',
     'FeedHistory',
     'FunctionCache',
+    'ListingCache',
     'PlaybackHistory',
     'RequestCache',
     'SearchHistory',
@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+"""
+
+    Copyright (C) 2025 plugin.video.youtube
+
+    SPDX-License-Identifier: GPL-2.0-only
+    See LICENSES/GPL-2.0-only for more information.
+"""
+
+from __future__ import absolute_import, division, unicode_literals
+
+from .storage import Storage
+
+
+class ListingCache(Storage):
+    _table_name = 'storage_v2'
+    _table_updated = False
+    _sql = {}
+
+    def __init__(self, filepath, max_file_size_mb=5):
+        max_file_size_kb = max_file_size_mb * 1024
+        super(ListingCache, self).__init__(filepath,
+                                           max_file_size_kb=max_file_size_kb)
+
+    def get_listing(self, listing_id, seconds=None):
+        """
+        Returns the cached (items, options) of a listing, or None if the
+        listing is not cached or is older than seconds
+        """
+        result = self._get(listing_id, seconds=seconds)
+        return result
+
+    def set_listing(self, listing_id, items, options):
+        return self._set(listing_id, (items, options))
+
+    def remove_listing(self, listing_id):
+        self._remove(listing_id)
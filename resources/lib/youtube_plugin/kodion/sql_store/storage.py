@@ -14,52 +14,182 @@ import os
 import sqlite3
 import time
 from atexit import register as atexit_register
-from threading import RLock, Timer
+from threading import Condition, Lock, Timer, current_thread, local
 
 from .. import logging
 from ..compatibility import pickle, to_str
+from ..debug import Tracer
 from ..utils.datetime import fromtimestamp, since_epoch
 from ..utils.file_system import make_dirs
 from ..utils.system_version import current_system_version
 
 
 class StorageLock(object):
+    """
+    Reentrant lock allowing multiple concurrent readers or a single writer.
+    Waiting writers take priority over new readers. If the lock cannot be
+    acquired within the timeout, the caller continues without the lock, as
+    SQLite will still serialise access, and the timeout is recorded.
+
+    A thread holding a read lock cannot upgrade it to a write lock, as two
+    readers attempting to do so would wait on each other.
+    """
+
+    TIMEOUT = 3
+
     def __init__(self):
-        self._lock = RLock()
+        self._condition = Condition(Lock())
+        self._local = local()
+        self._readers = {}
+        self._writer = None
+        self._write_depth = 0
+        self._num_writers_waiting = 0
         self._num_accessing = 0
         self._num_waiting = 0
+        self._stats = {
+            'reads': 0,
+            'writes': 0,
+            'contended': 0,
+            'timeouts': 0,
+            'wait_time': 0.0,
+            'wait_max': 0.0,
+        }
 
-    if current_system_version.compatible(19):
-        def __enter__(self):
-            self._num_waiting += 1
-            locked = not self._lock.acquire(timeout=3)
-            self._num_waiting -= 1
-            return locked
-    else:
-        def __enter__(self):
-            self._num_waiting += 1
-            locked = not self._lock.acquire(blocking=False)
-            self._num_waiting -= 1
-            return locked
+    def __enter__(self):
+        return not self.acquire(write=True)
 
     def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+    def _held(self):
         try:
-            self._lock.release()
-        except RuntimeError:
-            pass
+            return self._local.held
+        except AttributeError:
+            held = self._local.held = []
+            return held
+
+    def acquire(self, write=True, timeout=TIMEOUT):
+        thread = current_thread()
+        held = self._held()
+        condition = self._condition
+        with condition:
+            readers = self._readers
+
+            # Writer can re-enter as either a reader or a writer
+            if self._writer is thread:
+                self._write_depth += 1
+                held.append('write')
+                self._stats['writes' if write else 'reads'] += 1
+                return True
+            if write and thread in readers:
+                raise RuntimeError('StorageLock.acquire - Read lock cannot be'
+                                   ' upgraded to a write lock')
+
+            stats = self._stats
+            stats['writes' if write else 'reads'] += 1
+            # Reader can re-enter as a reader without waiting for writers
+            if not write and thread in readers:
+                readers[thread] += 1
+                held.append('read')
+                return True
+
+            if write:
+                def _available():
+                    return (self._writer is None
+                            and not (len(readers) - (thread in readers)))
+            else:
+                def _available():
+                    return (self._writer is None
+                            and not self._num_writers_waiting)
+
+            if not _available():
+                stats['contended'] += 1
+                self._num_waiting += 1
+                if write:
+                    self._num_writers_waiting += 1
+                start = time.time()
+                end = start + timeout
+                remaining = timeout
+                while remaining > 0 and not _available():
+                    condition.wait(remaining)
+                    remaining = end - time.time()
+                wait_time = time.time() - start
+                stats['wait_time'] += wait_time
+                if wait_time > stats['wait_max']:
+                    stats['wait_max'] = wait_time
+                self._num_waiting -= 1
+                if write:
+                    self._num_writers_waiting -= 1
+                if not _available():
+                    stats['timeouts'] += 1
+                    held.append(None)
+                    # Allow readers that were blocked by this writer to proceed
+                    condition.notify_all()
+                    return False
+
+            if write:
+                self._writer = thread
+                self._write_depth = 1
+                held.append('write')
+            else:
+                readers[thread] = 1
+                held.append('read')
+            return True
+
+    def release(self):
+        held = self._held()
+        if not held:
+            return
+        mode = held.pop()
+        if not mode:
+            return
+        condition = self._condition
+        with condition:
+            if mode == 'write':
+                self._write_depth -= 1
+                if self._write_depth > 0:
+                    return
+                self._writer = None
+            else:
+                thread = current_thread()
+                readers = self._readers
+                count = readers.get(thread, 0) - 1
+                if count > 0:
+                    readers[thread] = count
+                    return
+                readers.pop(thread, None)
+                if readers:
+                    return
+            condition.notify_all()
+
+    def shared(self):
+        """Whether the current thread holds only a shared read lock"""
+        held = self._held()
+        return bool(held) and held[-1] == 'read'
 
     def accessing(self, start=False, done=False):
-        num = self._num_accessing
-        if start:
-            num += 1
-        elif done and num > 0:
-            num -= 1
-        self._num_accessing = num
+        with self._condition:
+            num = self._num_accessing
+            if start:
+                num += 1
+            elif done and num > 0:
+                num -= 1
+            self._num_accessing = num
         return num > 0
 
     def waiting(self):
         return self._num_waiting > 0
 
+    def get_stats(self):
+        with self._condition:
+            stats = self._stats.copy()
+            stats['readers'] = sum(self._readers.values())
+            stats['writing'] = self._writer is not None
+            stats['waiting'] = self._num_waiting
+        stats['wait_time'] = round(stats['wait_time'], 6)
+        stats['wait_max'] = round(stats['wait_max'], 6)
+        return stats
+
 
 class ExistingDBConnection(object):
     def __init__(self, db):
@@ -73,6 +203,17 @@ class ExistingDBConnection(object):
         pass
 
 
+class StorageReader(object):
+    def __init__(self, storage):
+        self._storage = storage
+
+    def __enter__(self):
+        return self._storage._enter(write=False)
+
+    def __exit__(self, *excinfo):
+        self._storage._exit()
+
+
 class Storage(object):
     log = logging.getLogger(__name__)
 
@@ -246,6 +387,9 @@ class Storage(object):
         self.uuid = filepath[1]
         self._filepath = os.path.join(*filepath)
         self._db = None
+        # Read-only connections used by threads holding a shared lock, keyed
+        # by thread id, so that reads are not serialised on one connection
+        self._read_dbs = {}
         self._lock = StorageLock()
         self._memory_store = getattr(self.__class__, '_memory_store', None)
         self._close_timer = None
@@ -290,27 +434,63 @@ class Storage(object):
     def set_max_file_size_kb(self, max_file_size_kb):
         self._max_file_size_kb = max_file_size_kb
 
+    def get_lock_stats(self):
+        return self._lock.get_stats()
+
+    def get_file_state(self):
+        """
+        Returns the modification times of the database file and its write
+        ahead log, which between them change whenever data is committed
+        """
+        filepath = self._filepath
+        state = []
+        for path in (filepath, filepath + '-wal'):
+            try:
+                state.append(os.path.getmtime(path))
+            except OSError:
+                state.append(None)
+        return tuple(state)
+
     if current_system_version.compatible(19):
         def __del__(self):
             self._close(event='deleted')
 
     def __enter__(self):
-        self._lock.accessing(start=True)
+        return self._enter(write=True)
+
+    def __exit__(self, exc_type=None, exc_val=None, exc_tb=None):
+        self._exit()
+
+    def _enter(self, write=True):
+        lock = self._lock
+        lock.accessing(start=True)
 
         close_timer = self._close_timer
         if close_timer:
             close_timer.cancel()
 
-        db = self._db or self._open()
+        # Opening the database may create or update tables
+        lock.acquire(write=(write or not self._db))
+
         try:
-            cursor = db.cursor()
-        except (AttributeError, sqlite3.ProgrammingError):
-            db = self._open()
-            cursor = db.cursor()
+            db = self._db or self._open()
+            if lock.shared():
+                db = self._open_reader() or db
+            try:
+                cursor = db.cursor()
+            except (AttributeError, sqlite3.ProgrammingError):
+                db = self._open()
+                cursor = db.cursor()
+        except Exception:
+            lock.release()
+            lock.accessing(done=True)
+            raise
         cursor.arraysize = 100
         return db, cursor
 
-    def __exit__(self, exc_type=None, exc_val=None, exc_tb=None):
+    def _exit(self):
+        self._lock.release()
+
         close_timer = self._close_timer
         if close_timer:
             close_timer.cancel()
@@ -408,6 +588,40 @@ class Storage(object):
         self._db = db
         return db
 
+    def _open_reader(self):
+        thread_id = current_thread().ident
+        read_dbs = self._read_dbs
+        db = read_dbs.get(thread_id)
+        if db:
+            return db
+        try:
+            db = sqlite3.connect(self._filepath,
+                                 check_same_thread=False,
+                                 isolation_level=None)
+            cursor = db.cursor()
+            for query in (
+                    'PRAGMA busy_timeout = 1000;',
+                    'PRAGMA query_only = TRUE;',
+                    'PRAGMA temp_store = MEMORY;',
+                    'PRAGMA mmap_size = -1;',
+                    'PRAGMA cache_size = -2000;',
+            ):
+                cursor.execute(query)
+        except sqlite3.Error:
+            self.log.exception('Failed to open read connection')
+            return None
+        read_dbs[thread_id] = db
+        return db
+
+    def _close_readers(self):
+        read_dbs = self._read_dbs
+        while read_dbs:
+            _, db = read_dbs.popitem()
+            try:
+                db.close()
+            except sqlite3.Error:
+                pass
+
     def _close(self, commit=False, event=None):
         close_timer = self._close_timer
         if close_timer:
@@ -416,6 +630,15 @@ class Storage(object):
         if self._lock.accessing() or self._lock.waiting():
             return False
 
+        with self._lock as locked:
+            if locked and not event:
+                return False
+            return self._close_locked(commit, event)
+
+    def _close_locked(self, commit=False, event=None):
+        # No readers are active while the write lock is held
+        self._close_readers()
+
         db = self._db
         if not db:
             if self._close_actions:
@@ -490,6 +713,14 @@ class Storage(object):
                 _many = many
                 _values = values
 
+            if Tracer.enabled:
+                span = Tracer.span('Storage query',
+                                   'storage',
+                                   table=self._table_name,
+                                   query=query.split(None, 1)[0].upper())
+            else:
+                span = Tracer.span('Storage query', 'storage')
+
             # Retry DB operation 3 times in case DB is locked or busy
             abort = False
             for attempt in range(1, 4):
@@ -533,7 +764,9 @@ class Storage(object):
             else:
                 abort = True
             if abort:
+                span.end(attempts=attempt, result='failed')
                 break
+            span.end(attempts=attempt)
         return result
 
     def _optimize_file_size(self, defer=False, db=None):
@@ -541,7 +774,9 @@ class Storage(object):
         if self._max_file_size_kb <= 0:
             return False
 
-        with ExistingDBConnection(db) if db else self as (db, cursor):
+        with ExistingDBConnection(db) if db else StorageReader(self) as (
+                db, cursor
+        ):
             result = self._execute(cursor, self._sql['get_total_data_size'])
             result = result.fetchone() if result else None
             result = result[0] if result else None
@@ -785,7 +1020,7 @@ class Storage(object):
         return None
 
     def is_empty(self):
-        with self as (db, cursor):
+        with StorageReader(self) as (db, cursor):
             result = self._execute(cursor, self._sql['is_empty'])
             for item in result:
                 is_empty = item[0] == 0
@@ -836,7 +1071,7 @@ class Storage(object):
                 None,
             )
         else:
-            with self as (db, cursor):
+            with StorageReader(self) as (db, cursor):
                 result = self._execute(
                     cursor,
                     self._sql['get'],
@@ -913,7 +1148,7 @@ class Storage(object):
                     query = None
 
         if query:
-            with self as (db, cursor):
+            with StorageReader(self) as (db, cursor):
                 result = self._execute(cursor, query, item_ids)
                 if result:
                     result = result.fetchall()
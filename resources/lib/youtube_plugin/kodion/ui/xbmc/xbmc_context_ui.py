@@ -32,6 +32,7 @@ from ...constants import (
     HIDE_PROGRESS,
     LISTITEM_INFO,
     LISTITEM_PROP,
+    LISTING_CACHE_TOKEN,
     NUM_ALL_ITEMS,
     PLUGIN_CONTAINER_INFO,
     PROPERTY,
@@ -204,6 +205,9 @@ class XbmcContextUI(AbstractContextUI):
 
         stacklevel = 2 if stacklevel is None else stacklevel + 1
 
+        # Invalidate all previously rendered listings
+        self.clear_property(LISTING_CACHE_TOKEN)
+
         container = self.get_container()
         if not container['is_plugin'] or not container['is_loaded']:
             self.log.debug('No plugin container loaded - cancelling refresh',
@@ -177,13 +177,21 @@ def utc_to_local(dt):
     return dt + offset
 
 
-def datetime_to_since(context, dt, local=True, as_seconds=False):
+def current_datetime(local=True):
     if timezone:
         _now = now(tz=timezone.utc)
         if local:
             _now = _now.astimezone(None)
     else:
         _now = now() if local else datetime.utcnow()
+    return _now
+
+
+def datetime_to_since(context, dt, local=True, as_seconds=False, current=None):
+    if current is None:
+        _now = current_datetime(local)
+    else:
+        _now = current
 
     diff = _now - dt
     seconds = diff.total_seconds()
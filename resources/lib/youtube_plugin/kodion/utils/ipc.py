@@ -0,0 +1,291 @@
+# -*- coding: utf-8 -*-
+"""
+
+    Copyright (C) 2025 plugin.video.youtube
+
+    SPDX-License-Identifier: GPL-2.0-only
+    See LICENSES/GPL-2.0-only for more information.
+"""
+
+from __future__ import absolute_import, division, unicode_literals
+
+import json
+import socket
+from os import urandom
+from binascii import hexlify
+from struct import Struct
+from threading import Lock, Thread
+
+from .. import logging
+
+
+# Each message is framed as the byte lengths of a JSON header and of a binary
+# content block, followed by the header and the content
+_FRAME = Struct('!II')
+_MAX_HEADER_SIZE = 64 * 1024
+_MAX_CONTENT_SIZE = 32 * 1024 * 1024
+
+
+def _send_message(sock, header, content=None):
+    header = json.dumps(header).encode('utf-8')
+    if content is None:
+        content = b''
+    sock.sendall(b''.join((
+        _FRAME.pack(len(header), len(content)),
+        header,
+        content,
+    )))
+
+
+def _recv_exactly(sock, size):
+    data = bytearray(size)
+    view = memoryview(data)
+    received = 0
+    while received < size:
+        num_bytes = sock.recv_into(view[received:], size - received)
+        if not num_bytes:
+            raise EOFError
+        received += num_bytes
+    return bytes(data)
+
+
+def _recv_message(sock, token=None):
+    """
+    Receives a single message. If a token is provided, the token in the header
+    is checked before any content is read from the socket.
+
+    :raises: ValueError if the message is invalid, or the token does not match
+    """
+    header_size, content_size = _FRAME.unpack(_recv_exactly(sock, _FRAME.size))
+    if header_size > _MAX_HEADER_SIZE:
+        raise ValueError('Invalid header size: %d' % header_size)
+    if content_size > _MAX_CONTENT_SIZE:
+        raise ValueError('Invalid content size: %d' % content_size)
+    header = json.loads(_recv_exactly(sock, header_size).decode('utf-8'))
+    if not isinstance(header, dict):
+        raise ValueError('Invalid header')
+    if token is not None and header.pop('token', None) != token:
+        raise ValueError('Invalid token')
+    content = _recv_exactly(sock, content_size) if content_size else None
+    return header, content
+
+
+class IPCServer(object):
+    """
+    Loopback socket server used by the service to respond to requests from
+    plugin and script invocations.
+
+    Connections must provide the token of the server in every request. The
+    address and token are shared through a window property, so only Kodi
+    add-ons are able to connect. Requests on a connection are processed in the
+    order they are received, allowing requests to be pipelined.
+
+    :param handler: callable(target, data, content) returning a tuple of
+                    (response, content) for each request
+    """
+    log = logging.getLogger(__name__)
+
+    def __init__(self, handler):
+        self._handler = handler
+        self._token = hexlify(urandom(16)).decode('ascii')
+        self._socket = None
+        self._thread = None
+        self._connections = set()
+        self._lock = Lock()
+
+    @property
+    def address(self):
+        if not self._socket:
+            return None
+        return '{0}:{1}:{2}'.format(
+            self._socket.getsockname()[0],
+            self._socket.getsockname()[1],
+            self._token,
+        )
+
+    def start(self):
+        if self._socket:
+            return True
+        try:
+            server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            server_socket.bind(('127.0.0.1', 0))
+            server_socket.listen(5)
+        except (OSError, socket.error):
+            self.log.exception('Unable to start')
+            return False
+        self._socket = server_socket
+
+        thread = Thread(target=self._serve, name='IPCServer')
+        thread.daemon = True
+        thread.start()
+        self._thread = thread
+        self.log.debug('Listening on: %s:%d', *server_socket.getsockname())
+        return True
+
+    def stop(self):
+        server_socket = self._socket
+        if not server_socket:
+            return
+        self._socket = None
+        with self._lock:
+            connections = tuple(self._connections)
+            self._connections.clear()
+        for sock in connections + (server_socket,):
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except (OSError, socket.error):
+                pass
+            sock.close()
+        if self._thread:
+            self._thread.join(2)
+            self._thread = None
+
+    def _serve(self):
+        server_socket = self._socket
+        while self._socket:
+            try:
+                sock, _ = server_socket.accept()
+            except (OSError, socket.error):
+                break
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            with self._lock:
+                self._connections.add(sock)
+            thread = Thread(target=self._handle_connection, args=(sock,))
+            thread.daemon = True
+            thread.start()
+
+    def _handle_connection(self, sock):
+        handler = self._handler
+        token = self._token
+        try:
+            while True:
+                try:
+                    data, content = _recv_message(sock, token)
+                except EOFError:
+                    break
+                except ValueError as exc:
+                    self.log.warning('Invalid request - closing connection: %s',
+                                     exc)
+                    break
+
+                request_id = data.pop('id', None)
+                target = data.get('target')
+                try:
+                    response, content = handler(target, data, content)
+                except Exception:
+                    self.log.exception('Request failed: %r', target)
+                    response = False
+                    content = None
+                _send_message(sock, {
+                    'id': request_id,
+                    'target': target,
+                    'response': response,
+                }, content)
+        except (OSError, ValueError, socket.error):
+            pass
+        finally:
+            with self._lock:
+                self._connections.discard(sock)
+            sock.close()
+
+
+class IPCClient(object):
+    """
+    Client for IPCServer. A single connection is opened and reused for all
+    requests sent from the same process.
+
+    Requests without a positive timeout use default_timeout, so that a client
+    can never wait indefinitely for an unresponsive server.
+    """
+    log = logging.getLogger(__name__)
+
+    default_timeout = 30
+
+    _instances = {}
+    _instances_lock = Lock()
+
+    def __init__(self, address):
+        host, port, token = address.rsplit(':', 2)
+        self._address = (host, int(port))
+        self._token = token
+        self._socket = None
+        self._lock = Lock()
+        self._request_id = 0
+
+    @classmethod
+    def get(cls, address):
+        with cls._instances_lock:
+            client = cls._instances.get(address)
+            if client is None:
+                client = cls._instances[address] = cls(address)
+        return client
+
+    def _connect(self, timeout):
+        if not timeout or timeout < 0:
+            timeout = self.default_timeout
+        sock = self._socket
+        if sock is None:
+            sock = socket.create_connection(self._address, timeout=timeout)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self._socket = sock
+        else:
+            sock.settimeout(timeout)
+        return sock
+
+    def close(self):
+        with self._lock:
+            sock = self._socket
+            self._socket = None
+        if sock:
+            sock.close()
+
+    def request(self, target, data=None, content=None, timeout=None):
+        """
+        Sends a single request and waits for the response.
+
+        :return: tuple of (response, content)
+        :raises: EnvironmentError if the request could not be completed
+        """
+        return self.pipeline(((target, data, content),), timeout=timeout)[0]
+
+    def pipeline(self, requests, timeout=None):
+        """
+        Sends all requests before reading the responses, to avoid waiting
+        for each response in turn.
+
+        :param requests: iterable of (target, data, content) tuples
+        :return: list of (response, content) tuples, in request order
+        :raises: EnvironmentError if the requests could not be completed
+        """
+        with self._lock:
+            try:
+                sock = self._connect(timeout)
+                request_ids = []
+                for target, data, content in requests:
+                    self._request_id += 1
+                    header = dict(data) if data else {}
+                    header['id'] = self._request_id
+                    header['target'] = target
+                    header['token'] = self._token
+                    request_ids.append(self._request_id)
+                    _send_message(sock, header, content)
+
+                responses = []
+                for request_id in request_ids:
+                    header, content = _recv_message(sock)
+                    if header.get('id') != request_id:
+                        raise ValueError('Unexpected response id')
+                    responses.append((header.get('response'), content))
+                return responses
+            except (EOFError, ValueError, socket.timeout) as exc:
+                self._reset()
+                raise IOError(exc)
+            except (OSError, socket.error):
+                self._reset()
+                raise
+
+    def _reset(self):
+        sock = self._socket
+        self._socket = None
+        if sock:
+            sock.close()
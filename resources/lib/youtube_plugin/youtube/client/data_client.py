@@ -380,8 +380,9 @@ class YouTubeDataClient(YouTubeLoginClient):
     def reinit(self, **kwargs):
         super(YouTubeDataClient, self).reinit(**kwargs)
 
-    def set_access_token(self, access_tokens=None):
-        super(YouTubeDataClient, self).set_access_token(access_tokens)
+    def set_access_token(self, access_tokens=None, replace=False):
+        super(YouTubeDataClient, self).set_access_token(access_tokens,
+                                                        replace=replace)
         if self.logged_in:
             context = self._context
             function_cache = context.get_function_cache()
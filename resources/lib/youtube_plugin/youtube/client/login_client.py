@@ -94,7 +94,20 @@ class YouTubeLoginClient(YouTubeRequestClient):
             access_tokens = _access_tokens
         return access_tokens
 
-    def set_access_token(self, access_tokens=None):
+    @classmethod
+    def access_tokens_changed(cls, access_tokens):
+        if isinstance(access_tokens, (list, tuple)):
+            access_tokens = cls.convert_access_tokens(
+                access_tokens,
+                to_dict=True,
+            )
+        return access_tokens != {
+            token_type: token
+            for token_type, token in cls._access_tokens.items()
+            if token
+        }
+
+    def set_access_token(self, access_tokens=None, replace=False):
         existing_access_tokens = type(self)._access_tokens
         if access_tokens:
             if isinstance(access_tokens, (list, tuple)):
@@ -107,6 +120,8 @@ class YouTubeLoginClient(YouTubeRequestClient):
                 if token_type in access_tokens:
                     token = access_tokens[token_type]
                     existing_access_tokens[token_type] = token
+                elif replace:
+                    token = existing_access_tokens[token_type] = None
                 if token or token_type == 'dev':
                     token_status |= 1
                 else:
@@ -12,9 +12,10 @@ from __future__ import absolute_import, division, unicode_literals
 
 from base64 import urlsafe_b64encode
 from json import dumps as json_dumps, loads as json_loads
-from os import path as os_path
+from os import listdir, path as os_path
 from random import choice as random_choice
 from re import compile as re_compile, sub as re_sub
+from time import time
 
 from .data_client import YouTubeDataClient
 from .subtitles import SUBTITLE_SELECTIONS, Subtitles
@@ -35,10 +36,11 @@ from ...kodion.compatibility import (
     xbmcvfs,
 )
 from ...kodion.constants import INCOGNITO, PATHS, TEMP_PATH, VALUE_TO_STR
+from ...kodion.debug import Timings
 from ...kodion.network import get_connect_address
 from ...kodion.utils.datetime import fromtimestamp
 from ...kodion.utils.file_system import make_dirs
-from ...kodion.utils.methods import merge_dicts
+from ...kodion.utils.methods import generate_hash, merge_dicts
 from ...kodion.utils.redact import redact_ip_in_uri
 
 
@@ -815,6 +817,10 @@ class YouTubePlayerClient(YouTubeDataClient):
         )),
     }
 
+    # Time, in seconds, allowed for processing of player responses into
+    # streams and manifests, before a warning is logged when debugging
+    STREAM_PROCESSING_BUDGET = 1.0
+
     def __init__(self,
                  context,
                  clients=None,
@@ -1531,10 +1537,10 @@ class YouTubePlayerClient(YouTubeDataClient):
             subtitles.load(captions, client['headers'].copy())
             default_lang = subtitles.get_lang_details()
             subs_data = subtitles.get_subtitles()
-            if subs_data or subs_data is False:
+            if subs_data or subs_data is False or subtitles.pending:
                 return default_lang, subs_data
 
-        video_id = self.video_id
+        video_id = subtitles.video_id
         client_data = {
             'json': {
                 'videoId': video_id,
@@ -1567,11 +1573,33 @@ class YouTubePlayerClient(YouTubeDataClient):
                 subtitles.load(captions, client['headers'])
                 default_lang = subtitles.get_lang_details()
                 subs_data = subtitles.get_subtitles()
-                if subs_data or subs_data is False:
+                if subs_data or subs_data is False or subtitles.pending:
                     return default_lang, subs_data
 
         return default_lang, subs_data
 
+    def prefetch_subtitles(self, video_id):
+        """
+        Downloads the selected subtitles of a video into the subtitle store,
+        so that they are available without delay when the video is played.
+        Only applicable if subtitles are downloaded rather than streamed.
+
+        :param video_id: id of the video
+        :return: True if subtitles were stored, False otherwise
+        """
+        subtitles = Subtitles(self._context, video_id, prefetch=True)
+        if (not subtitles.pre_download
+                or not subtitles.store
+                or subtitles.sub_selection in {SUBTITLE_SELECTIONS['none'],
+                                               SUBTITLE_SELECTIONS['prompt']}):
+            return False
+        if subtitles.store.has_video(video_id):
+            self.log.debug('Subtitles already stored for: %r', video_id)
+            return False
+        _, subs_data = self._process_captions(subtitles=subtitles,
+                                              responses={})
+        return bool(subs_data or subtitles.pending)
+
     def _get_error_details(self,
                            playability_status,
                            details=('errorScreen', (
@@ -1638,6 +1666,8 @@ class YouTubePlayerClient(YouTubeDataClient):
         age_gate_enabled = settings.age_gate()
         use_remote_history = settings.use_remote_history()
 
+        timings = Timings('Stream info', enabled=self.log.debugging)
+
         _client_name = None
         _client = None
         _has_auth = None
@@ -1720,18 +1750,19 @@ class YouTubePlayerClient(YouTubeDataClient):
                         _reason = None
                         continue
 
-                    _result = self.request(
-                        response_hook=self._response_hook_json,
-                        error_title='Player request failed',
-                        error_hook=self._player_error_hook,
-                        video_id=video_id,
-                        client_name=_client_name,
-                        has_auth=_has_auth,
-                        cache=False,
-                        pass_data=True,
-                        raise_exc=False,
-                        **_client
-                    ) or {}
+                    with timings('Player request - ' + _client_name):
+                        _result = self.request(
+                            response_hook=self._response_hook_json,
+                            error_title='Player request failed',
+                            error_hook=self._player_error_hook,
+                            video_id=video_id,
+                            client_name=_client_name,
+                            has_auth=_has_auth,
+                            cache=False,
+                            pass_data=True,
+                            raise_exc=False,
+                            **_client
+                        ) or {}
 
                     if not visitor_data:
                         visitor_data = self.json_traverse(
@@ -1963,6 +1994,7 @@ class YouTubePlayerClient(YouTubeDataClient):
                 for thumb_type, thumb in THUMB_TYPES.items()
             },
             'subtitles': None,
+            'pending_subtitles': None,
         }
 
         if use_remote_history and auth_client:
@@ -1988,26 +2020,31 @@ class YouTubePlayerClient(YouTubeDataClient):
             }
 
         if is_live or live_dvr or ask_for_quality or not use_mpd:
-            self._process_hls(
-                stream_list=stream_list,
-                responses=responses,
-                is_live=is_live,
-                meta_info=meta_info,
-                playback_stats=playback_stats,
-            )
+            with timings('HLS streams'):
+                self._process_hls(
+                    stream_list=stream_list,
+                    responses=responses,
+                    is_live=is_live,
+                    meta_info=meta_info,
+                    playback_stats=playback_stats,
+                )
 
         if not is_live or live_dvr:
-            subtitles = Subtitles(context, video_id, use_mpd=use_mpd)
-            default_lang, subs_data = self._process_captions(
-                subtitles=subtitles,
-                responses=responses,
-            )
-            if subs_data and not subtitles.use_isa:
-                meta_info['subtitles'] = [
-                    subtitle['url'] for subtitle in subs_data.values()
-                    if 'url' in subtitle
-                ]
-                subs_data = None
+            with timings('Captions'):
+                subtitles = Subtitles(context, video_id, use_mpd=use_mpd)
+                default_lang, subs_data = self._process_captions(
+                    subtitles=subtitles,
+                    responses=responses,
+                )
+            if not subtitles.use_isa:
+                if subs_data:
+                    meta_info['subtitles'] = [
+                        subtitle['url'] for subtitle in subs_data.values()
+                        if 'url' in subtitle
+                    ]
+                    subs_data = None
+                # Added to the player by the player monitor once downloaded
+                meta_info['pending_subtitles'] = subtitles.pending
         else:
             default_lang = None
             subs_data = None
@@ -2021,21 +2058,38 @@ class YouTubePlayerClient(YouTubeDataClient):
 
         # extract adaptive streams and create MPEG-DASH manifest
         if use_mpd and not audio_only:
-            self._process_mpd(
-                stream_list=stream_list,
-                responses=responses,
-                meta_info=meta_info,
-                playback_stats=playback_stats,
-            )
-            video_data, audio_data = self._process_adaptive_streams(
-                responses=responses,
-                default_lang_code=(default_lang['default']
-                                   if default_lang['original'] == 'und' else
-                                   default_lang['original']),
-            )
-            manifest_url, main_stream = self._generate_mpd_manifest(
-                video_data, audio_data, subs_data,
+            with timings('MPD streams'):
+                self._process_mpd(
+                    stream_list=stream_list,
+                    responses=responses,
+                    meta_info=meta_info,
+                    playback_stats=playback_stats,
+                )
+            default_lang_code = (default_lang['default']
+                                 if default_lang['original'] == 'und' else
+                                 default_lang['original'])
+            manifest_id = self._get_manifest_id(
+                responses, default_lang_code, subs_data,
             )
+            manifest_info = self._load_manifest_info(manifest_id)
+            if manifest_info:
+                self.log.debug('Using cached manifest: %r',
+                               manifest_info['filename'])
+                manifest_url = self._get_manifest_url(
+                    get_connect_address(context, as_netloc=True),
+                    manifest_info['filename'],
+                )
+                main_stream = manifest_info['main_stream']
+            else:
+                with timings('Adaptive streams'):
+                    video_data, audio_data = self._process_adaptive_streams(
+                        responses=responses,
+                        default_lang_code=default_lang_code,
+                    )
+                with timings('MPD manifest'):
+                    manifest_url, main_stream = self._generate_mpd_manifest(
+                        video_data, audio_data, subs_data, manifest_id,
+                    )
 
             if main_stream:
                 yt_format = self._get_stream_format(
@@ -2075,14 +2129,20 @@ class YouTubePlayerClient(YouTubeDataClient):
 
         # extract non-adaptive streams
         if audio_only or ask_for_quality or not use_mpd:
-            self._process_progressive_streams(
-                stream_list=stream_list,
-                responses=responses,
-                is_live=is_live,
-                use_adaptive=use_mpd,
-                meta_info=meta_info,
-                playback_stats=playback_stats,
-            )
+            with timings('Progressive streams'):
+                self._process_progressive_streams(
+                    stream_list=stream_list,
+                    responses=responses,
+                    is_live=is_live,
+                    use_adaptive=use_mpd,
+                    meta_info=meta_info,
+                    playback_stats=playback_stats,
+                )
+
+        # Network time is excluded when checking against the budget, as only
+        # the processing of the responses is under the control of the addon
+        timings.log_stats(budget=self.STREAM_PROCESSING_BUDGET,
+                          exclude=('Player request',))
 
         if stream_list:
             self.log.debug(('Media details:',
@@ -2139,6 +2199,13 @@ class YouTubePlayerClient(YouTubeDataClient):
         prefer_default_lang = self._language_prefer_default
         lang_role_details = self.LANG_ROLE_DETAILS
 
+        # The same formats are usually provided by each client. Formats are
+        # grouped by itag, xtags and last modified time, and each group is
+        # only processed once, using the format from the first client that
+        # provides it. Formats from other clients are only used if the URL of
+        # the preferred format can not be processed.
+        format_candidates = {}
+        client_formats = {}
         for client_name, response in responses.items():
             client = response['client']
             if not client.get('_use_adaptive', True):
@@ -2148,11 +2215,26 @@ class YouTubePlayerClient(YouTubeDataClient):
             if not stream_data:
                 continue
 
+            for stream in stream_data:
+                format_id = (
+                    stream.get('itag'),
+                    stream.get('xtags'),
+                    stream.get('lastModified'),
+                )
+                candidates = format_candidates.get(format_id)
+                if candidates is None:
+                    candidates = format_candidates[format_id] = []
+                    client_formats.setdefault(client_name, []).append(
+                        (stream, candidates)
+                    )
+                candidates.append((client, stream))
+
+        for client_name, formats in client_formats.items():
             log_client = debugging
             log_audio_header = None
             log_video_header = None
 
-            for stream in stream_data:
+            for stream, candidates in formats:
                 mime_type = stream.get('mimeType')
                 if not mime_type:
                     continue
@@ -2169,12 +2251,6 @@ class YouTubePlayerClient(YouTubeDataClient):
                 if not init_range:
                     continue
 
-                url = stream.get('url')
-                if not url and 'signatureCipher' in stream:
-                    url = self._process_signature_cipher(stream)
-                if not url:
-                    continue
-
                 mime_type, codecs = unquote(mime_type).split('; ')
                 codecs = codec_re.match(codecs)
                 if codecs:
@@ -2401,13 +2477,21 @@ class YouTubePlayerClient(YouTubeDataClient):
                     if log_video_header is None:
                         log_video_header = debugging
 
-                urls = self._process_url_params(
-                    unquote(url),
-                    stream_proxy=True,
-                    headers=client['headers'],
-                    cpn=client.get('_cpn'),
-                )
-                if not urls:
+                for client, _stream in candidates:
+                    url = _stream.get('url')
+                    if not url and 'signatureCipher' in _stream:
+                        url = self._process_signature_cipher(_stream)
+                    if not url:
+                        continue
+                    urls = self._process_url_params(
+                        unquote(url),
+                        stream_proxy=True,
+                        headers=client['headers'],
+                        cpn=client.get('_cpn'),
+                    )
+                    if urls:
+                        break
+                else:
                     continue
 
                 details = {
@@ -2597,7 +2681,8 @@ class YouTubePlayerClient(YouTubeDataClient):
     def _generate_mpd_manifest(self,
                                video_data,
                                audio_data,
-                               subs_data):
+                               subs_data,
+                               manifest_id=None):
         # Following line can be uncommented if needed to use mpd for audio only
         # if (not video_data and not self._audio_only) or not audio_data:
         if not video_data or not audio_data:
@@ -2659,6 +2744,9 @@ class YouTubePlayerClient(YouTubeDataClient):
         stream_select = settings.stream_select()
         localize = context.localize
 
+        video_id = self.video_id
+        address = get_connect_address(context, as_netloc=True)
+
         main_stream = {
             'audio': audio_data[0][1][0],
             'multi_audio': False,
@@ -2902,7 +2990,9 @@ class YouTubePlayerClient(YouTubeDataClient):
         if roles.difference({'', 'main', 'dub'}):
             main_stream['multi_audio'] = True
 
-        filename = '.'.join((self.video_id, 'mpd'))
+        # Manifests are named by their content, so that the HTTP server can
+        # serve a manifest from memory without checking whether it changed
+        filename = '.'.join((video_id, generate_hash(output), 'mpd'))
         filepath = os_path.join(self.BASE_PATH, filename)
         try:
             with xbmcvfs.File(filepath, 'w') as mpd_file:
@@ -2910,12 +3000,146 @@ class YouTubePlayerClient(YouTubeDataClient):
         except (IOError, OSError):
             self.log.exception(('File write failed', 'File: %s'), filepath)
             success = False
-        if success:
-            return urlunsplit((
-                'http',
-                get_connect_address(context, as_netloc=True),
-                PATHS.MPD,
-                urlencode({'file': filename}),
-                '',
-            )), main_stream
-        return None, None
+        if not success:
+            return None, None
+
+        if manifest_id:
+            self._save_manifest_info(manifest_id, {
+                'filename': filename,
+                'expires': self._get_expiry(main_stream),
+                'main_stream': main_stream,
+            })
+        return self._get_manifest_url(address, filename), main_stream
+
+    @staticmethod
+    def _get_manifest_url(address, filename):
+        return urlunsplit((
+            'http',
+            address,
+            PATHS.MPD,
+            urlencode({'file': filename}),
+            '',
+        ))
+
+    @staticmethod
+    def _get_expiry(main_stream):
+        expiry = None
+        for media_type in ('video', 'audio'):
+            stream = main_stream.get(media_type)
+            if not stream:
+                continue
+            params = parse_qs(urlsplit(unescape(stream['baseUrl'])).query)
+            try:
+                expires = int(params['expire'][0])
+            except (KeyError, IndexError, TypeError, ValueError):
+                return None
+            if expiry is None or expires < expiry:
+                expiry = expires
+        return expiry
+
+    def _get_manifest_id(self, responses, default_lang_code, subs_data):
+        """
+        Returns an id for the manifest that would be generated from the
+        adaptive formats in the player responses, using the current settings.
+        Only the format ids are used, so that a cached manifest can be found
+        before any of the streams are processed.
+        """
+        context = self._context
+        settings = context.get_settings()
+        return generate_hash(
+            self.video_id,
+            get_connect_address(context, as_netloc=True),
+            context.get_access_manager().get_current_user_id(),
+            self._audio_only,
+            settings.stream_features(),
+            settings.stream_select(),
+            settings.mpd_video_qualities(),
+            sorted(context.inputstream_adaptive_capabilities()),
+            default_lang_code,
+            self._language_base,
+            self._language_prefer_default,
+            sorted({
+                (str(stream.get('itag')),
+                 str(stream.get('xtags')),
+                 str(stream.get('lastModified')))
+                for response in responses.values()
+                if response['client'].get('_use_adaptive', True)
+                for stream in response['adaptive_fmts'] or ()
+            }),
+            sorted(subs_data) if subs_data else None,
+        )
+
+    def _get_manifest_info_path(self, manifest_id):
+        return os_path.join(
+            self.BASE_PATH,
+            '.'.join((self.video_id, manifest_id, 'json')),
+        )
+
+    def _load_manifest_info(self, manifest_id):
+        """
+        Returns the cached details of a previously generated manifest, or None
+        if there is no manifest, or the stream URLs in the manifest will expire
+        before the video could be played through
+        """
+        if not self.BASE_PATH:
+            return None
+        manifest_info_path = self._get_manifest_info_path(manifest_id)
+        if not xbmcvfs.exists(manifest_info_path):
+            return None
+        try:
+            with xbmcvfs.File(manifest_info_path) as info_file:
+                manifest_info = json_loads(info_file.read())
+        except (IOError, OSError, TypeError, ValueError):
+            self.log.exception(('File read failed', 'File: %s'),
+                               manifest_info_path)
+            return None
+
+        expires = manifest_info.get('expires')
+        main_stream = manifest_info.get('main_stream') or {}
+        stream = main_stream.get('video') or main_stream.get('audio') or {}
+        if (not expires
+                or expires < time() + stream.get('duration', 0)
+                or not xbmcvfs.exists(os_path.join(
+                    self.BASE_PATH, manifest_info.get('filename', '')
+                ))):
+            self._remove_manifest(manifest_info_path, manifest_info)
+            return None
+        return manifest_info
+
+    def _save_manifest_info(self, manifest_id, manifest_info):
+        if not manifest_info['expires']:
+            return
+        manifest_info_path = self._get_manifest_info_path(manifest_id)
+        self._prune_manifests(keep=(
+            os_path.basename(manifest_info_path),
+            manifest_info['filename'],
+        ))
+        try:
+            with xbmcvfs.File(manifest_info_path, 'w') as info_file:
+                info_file.write(json_dumps(manifest_info))
+        except (IOError, OSError, TypeError, ValueError):
+            self.log.exception(('File write failed', 'File: %s'),
+                               manifest_info_path)
+
+    def _prune_manifests(self, keep=()):
+        """
+        Removes manifests, and their cached details, previously generated for
+        the current video that have been superseded by a new manifest
+        """
+        prefix = self.video_id + '.'
+        try:
+            filenames = listdir(self.BASE_PATH)
+        except OSError:
+            return
+        for filename in filenames:
+            if (filename in keep
+                    or not filename.startswith(prefix)
+                    or not filename.endswith(('.mpd', '.json'))):
+                continue
+            xbmcvfs.delete(os_path.join(self.BASE_PATH, filename))
+
+    def _remove_manifest(self, manifest_info_path, manifest_info):
+        filename = manifest_info.get('filename')
+        if filename:
+            xbmcvfs.delete(os_path.join(self.BASE_PATH, filename))
+        xbmcvfs.delete(manifest_info_path)
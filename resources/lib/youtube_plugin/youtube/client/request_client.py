@@ -980,12 +980,20 @@ class YouTubeRequestClient(BaseRequestsClass):
 
         return client
 
-    def internet_available(self, notify=True):
+    def internet_available(self, notify=True, refresh=False):
+        online = None if refresh else self.get_connectivity()
+        if online is not None:
+            return online
+
+        online = False
         response = self.request(**self.CLIENTS['generate_204'])
         if response is not None:
             with response:
                 if response.status_code == 204:
-                    return True
+                    online = True
+        self.set_connectivity(online)
+        if online:
+            return True
         if notify:
             self._context.get_ui().show_notification(
                 self._context.localize('internet.connection.required')
@@ -9,6 +9,8 @@
 from __future__ import absolute_import, division, unicode_literals
 
 import os
+import threading
+from collections import deque
 
 from .request_client import YouTubeRequestClient
 from ...kodion import logging
@@ -18,6 +20,7 @@ from ...kodion.constants import (
     TEMP_PATH,
     TRANSLATION_LANGUAGES,
 )
+from ...kodion.utils.convert_format import fix_subtitle_stream
 from ...kodion.utils.file_system import make_dirs
 
 
@@ -50,12 +53,120 @@ SUBTITLE_SELECTIONS = {
     'all': 5,
 }
 
+# Shared by all stores, as subtitles can be downloaded and prefetched at the
+# same time by different clients
+_store_lock = threading.Lock()
+
+
+class SubtitleStore(object):
+    """
+    Size limited store of downloaded subtitle files. Files are evicted in least
+    recently used order, using the file modification time as the access time.
+    """
+    log = logging.getLogger(__name__)
+
+    EXTENSIONS = ('.srt', '.vtt', '.ttml')
+
+    def __init__(self, path, max_size_mb=5):
+        self._path = path
+        self._max_size = int(max_size_mb * 1024 * 1024)
+
+    def get(self, filename):
+        file_path = os.path.join(self._path, filename)
+        if not xbmcvfs.exists(file_path):
+            return None
+        try:
+            os.utime(file_path, None)
+        except (IOError, OSError):
+            pass
+        return file_path
+
+    def has_video(self, video_id):
+        # Other files, like MPD manifests, are also stored in the same path
+        # using the video_id as a prefix, so only subtitle files are checked
+        prefix = video_id + '.'
+        extensions = self.EXTENSIONS
+        try:
+            return any(filename.startswith(prefix)
+                       and filename.endswith(extensions)
+                       for filename in os.listdir(self._path))
+        except (IOError, OSError):
+            return False
+
+    def set(self, filename, content, stream_type=None, video_id=None):
+        """
+        Writes content to the store, converting the content once for the
+        provided stream_type, and evicts old files if the store is full. Files
+        are only added to the store once completely written, and files of the
+        provided video_id are not evicted.
+        Returns the path of the stored file, or None if the write failed
+        """
+        if stream_type:
+            content = fix_subtitle_stream(stream_type, bytes(content))
+        file_path = os.path.join(self._path, filename)
+        temp_file_path = file_path + '.tmp'
+        success = False
+        try:
+            with xbmcvfs.File(temp_file_path, 'w') as sub_file:
+                success = sub_file.write(content)
+            if success:
+                os.replace(temp_file_path, file_path)
+        except (IOError, OSError):
+            self.log.exception('Write failed for: %r', file_path)
+            success = False
+        if not success:
+            return None
+        with _store_lock:
+            self.evict(keep=filename, keep_video_id=video_id)
+        return file_path
+
+    def evict(self, keep=None, keep_video_id=None):
+        path = self._path
+        files = []
+        total_size = 0
+        try:
+            filenames = os.listdir(path)
+        except (IOError, OSError):
+            self.log.exception('Unable to read: %r', path)
+            return 0
+        for filename in filenames:
+            if not filename.endswith(self.EXTENSIONS):
+                continue
+            try:
+                stat = os.stat(os.path.join(path, filename))
+            except (IOError, OSError):
+                continue
+            files.append((stat.st_mtime, stat.st_size, filename))
+            total_size += stat.st_size
+
+        removed = 0
+        if total_size <= self._max_size:
+            return removed
+        keep_prefix = keep_video_id + '.' if keep_video_id else None
+        for _, size, filename in sorted(files):
+            if filename == keep:
+                continue
+            if keep_prefix and filename.startswith(keep_prefix):
+                continue
+            try:
+                os.remove(os.path.join(path, filename))
+            except (IOError, OSError):
+                continue
+            removed += 1
+            total_size -= size
+            if total_size <= self._max_size:
+                break
+        self.log.debug('Removed %d subtitle files', removed)
+        return removed
+
 
 class Subtitles(YouTubeRequestClient):
     log = logging.getLogger(__name__)
 
     BASE_PATH = make_dirs(TEMP_PATH)
 
+    MAX_DOWNLOAD_THREADS = 4
+
     FORMATS = {
         # '_default': None,
         # '_fallback': None,
@@ -79,7 +190,7 @@ class Subtitles(YouTubeRequestClient):
         },
     }
 
-    def __init__(self, context, video_id, use_mpd=None):
+    def __init__(self, context, video_id, use_mpd=None, prefetch=False):
         settings = context.get_settings()
         super(Subtitles, self).__init__(
             context=context,
@@ -93,8 +204,13 @@ class Subtitles(YouTubeRequestClient):
         self.headers = None
         self.caption_tracks = None
         self.translation_langs = None
+        self.pending = []
 
         self.pre_download = settings.subtitle_download()
+        self.store = SubtitleStore(
+            self.BASE_PATH,
+            max_size_mb=settings.cache_size() / 4,
+        ) if self.BASE_PATH else None
         self.sub_selection = settings.get_subtitle_selection()
         stream_features = settings.stream_features()
         if use_mpd is None:
@@ -145,7 +261,9 @@ class Subtitles(YouTubeRequestClient):
         else:
             self.preferred_lang = ('en',)
 
-        self.prompt_override = bool(
+        # Prefetching runs in the background, and must not consume the prompt
+        # request of the video that is about to be played
+        self.prompt_override = not prefetch and bool(
             context.get_ui().pop_property(PLAY_PROMPT_SUBTITLES)
         )
 
@@ -268,6 +386,7 @@ class Subtitles(YouTubeRequestClient):
             fallback_langs = None
 
         subtitles = {}
+        downloads = {}
         for lang in allowed_langs:
             if lang != 'ASR':
                 track_details = self._get_track(lang, use_asr=use_asr)
@@ -287,7 +406,9 @@ class Subtitles(YouTubeRequestClient):
                 track_key = '_'.join((track_lang, track_kind))
             else:
                 track_key = track_lang
-            url, sub_format = self._get_url(track=track, lang=track_lang)
+            url, sub_format = self._get_url(track=track,
+                                            lang=track_lang,
+                                            downloads=downloads)
             if url:
                 subtitles[track_key] = {
                     'default': track_lang in preferred_lang,
@@ -299,12 +420,14 @@ class Subtitles(YouTubeRequestClient):
                     'codec': sub_format['codec'],
                     'url': url,
                 }
+        self._run_downloads(subtitles, downloads)
         if subtitles and self.use_isa:
             subtitles['_headers'] = self.headers
         return subtitles
 
     def get_all(self):
         subtitles = {}
+        downloads = {}
 
         preferred_lang = self.preferred_lang
         original_lang = self.defaults['original_lang']
@@ -313,7 +436,7 @@ class Subtitles(YouTubeRequestClient):
             track_lang = track.get('languageCode')
             track_kind = track.get('kind')
             track_language = self._get_language_name(track)
-            url, sub_format = self._get_url(track=track)
+            url, sub_format = self._get_url(track=track, downloads=downloads)
             if url:
                 if track_kind:
                     track_key = '_'.join((track_lang, track_kind))
@@ -338,7 +461,9 @@ class Subtitles(YouTubeRequestClient):
                 if not track_lang or track_lang in subtitles:
                     continue
                 track_language = self._get_language_name(track)
-                url, sub_format = self._get_url(track=base, lang=track_lang)
+                url, sub_format = self._get_url(track=base,
+                                                lang=track_lang,
+                                                downloads=downloads)
                 if url:
                     track_key = '_'.join((base_lang, track_lang))
                     subtitles[track_key] = {
@@ -352,6 +477,7 @@ class Subtitles(YouTubeRequestClient):
                         'url': url,
                     }
 
+        self._run_downloads(subtitles, downloads)
         if subtitles and self.use_isa:
             subtitles['_headers'] = self.headers
         return subtitles
@@ -413,7 +539,7 @@ class Subtitles(YouTubeRequestClient):
                 return subtitle
         return None
 
-    def _get_url(self, track, lang=None):
+    def _get_url(self, track, lang=None, downloads=None):
         sub_format = self.FORMATS.get('_default')
         if not sub_format:
             self.log.error_trace('Invalid subtitle options selected')
@@ -438,12 +564,13 @@ class Subtitles(YouTubeRequestClient):
                 lang,
                 self.FORMATS[sub_format]['extension']
             ))
-            if not self.BASE_PATH:
+            store = self.store
+            if not store:
                 self.log.error_trace('Unable to access temp directory')
                 return None, None
 
-            file_path = os.path.join(self.BASE_PATH, filename)
-            if xbmcvfs.exists(file_path):
+            file_path = store.get(filename)
+            if file_path:
                 self.log.debug(('Use existing subtitle for: {lang!r}',
                                 'File: {file}'),
                                lang=lang,
@@ -469,6 +596,18 @@ class Subtitles(YouTubeRequestClient):
         if not download:
             return subtitle_url, self.FORMATS[sub_format]
 
+        download = (subtitle_url, filename, lang, kind, sub_format)
+        if downloads is not None:
+            file_path = os.path.join(self.BASE_PATH, filename)
+            downloads[file_path] = download
+            return file_path, self.FORMATS[sub_format]
+
+        file_path = self._download(*download)
+        if file_path:
+            return file_path, self.FORMATS[sub_format]
+        return None, None
+
+    def _download(self, subtitle_url, filename, lang, kind, sub_format):
         response = self.request(
             subtitle_url,
             headers=self.headers,
@@ -476,26 +615,80 @@ class Subtitles(YouTubeRequestClient):
             sub_lang=lang,
         )
         if response is None:
-            return None, None
+            return None
         with response:
             response_text = response.text
             if not response_text:
-                return None, None
+                return None
 
         output = bytearray(self._unescape(response_text),
                            encoding='utf8',
                            errors='ignore')
-        try:
-            with xbmcvfs.File(file_path, 'w') as sub_file:
-                success = sub_file.write(output)
-        except (IOError, OSError):
-            self.log.exception(('Write failed for: {lang!r}',
-                                'File: {file}'),
-                               lang=lang,
-                               file=file_path)
-        if success:
-            return file_path, self.FORMATS[sub_format]
-        return None, None
+        # Downloaded files are read by Kodi rather than ISA, so SRT files are
+        # stored as is, instead of being converted to WebVTT
+        if sub_format == 'srt':
+            stream_type = None
+        else:
+            stream_type = ('track', sub_format, kind)
+        return self.store.set(filename,
+                              output,
+                              stream_type=stream_type,
+                              video_id=self.video_id)
+
+    def _run_downloads(self, subtitles, downloads):
+        """
+        Downloads the subtitle files queued by _get_url. Files for the default
+        languages are downloaded first, in the calling thread, while the
+        remaining files are downloaded concurrently by a bounded pool of
+        threads, without waiting for them to complete. Subtitles that fail,
+        or are still being downloaded, are removed from subtitles, and the
+        paths of files still being downloaded are stored in self.pending, so
+        that they can be added to the player once completed.
+        """
+        self.pending = []
+        if not downloads:
+            return subtitles
+
+        primary = []
+        queue = deque()
+        for subtitle in subtitles.values():
+            file_path = subtitle['url']
+            if file_path not in downloads:
+                continue
+            if subtitle['default']:
+                primary.append(file_path)
+            else:
+                queue.append(file_path)
+
+        def _worker():
+            while True:
+                try:
+                    _file_path = queue.popleft()
+                except IndexError:
+                    break
+                self._download(*downloads[_file_path])
+
+        pending = list(queue)
+        for _ in range(min(self.MAX_DOWNLOAD_THREADS, len(queue))):
+            threading.Thread(target=_worker).start()
+
+        completed = {
+            file_path
+            for file_path in primary
+            if self._download(*downloads[file_path])
+        }
+
+        for track_key, subtitle in tuple(subtitles.items()):
+            file_path = subtitle['url']
+            if file_path in downloads and file_path not in completed:
+                if file_path in pending:
+                    self.log.debug('Subtitle pending for: %r', track_key)
+                else:
+                    self.log.debug('Subtitle not available for: %r',
+                                   track_key)
+                del subtitles[track_key]
+        self.pending = pending
+        return subtitles
 
     def _get_track(self,
                    lang='en',
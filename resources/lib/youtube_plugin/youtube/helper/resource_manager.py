@@ -15,6 +15,7 @@ from itertools import chain
 from .utils import get_thumbnail
 from ...kodion import logging
 from ...kodion.constants import CHANNEL_ID, FANART_TYPE, INCOGNITO
+from ...kodion.debug import Tracer
 
 
 class ResourceManager(object):
@@ -37,6 +38,11 @@ class ResourceManager(object):
             fanart_type = settings.fanart_selection()
         self._channel_fanart = fanart_type == settings.FANART_CHANNEL
         self._thumb_size = settings.get_thumbnail_size()
+        self._thumb_fanart = (
+            settings.get_thumbnail_size(settings.THUMB_SIZE_BEST)
+            if fanart_type == settings.FANART_THUMBNAIL else
+            None
+        )
 
     def context_changed(self, context, client):
         return self._context != context or self._client != client
@@ -49,12 +55,18 @@ class ResourceManager(object):
             old_progress_dialog.close()
         self._progress_dialog = progress_dialog
 
-    def _list_batch(self, input_list, n=50):
+    def _list_batch(self, input_list, n=50, resource=None):
         if not isinstance(input_list, (list, tuple)):
             input_list = list(input_list)
         num_items = len(input_list)
         for i in range(0, num_items, n):
-            yield input_list[i:i + n]
+            batch = input_list[i:i + n]
+            # Span covers the processing of the batch by the caller
+            with Tracer.span('Resource batch',
+                             'resources',
+                             resource=resource,
+                             size=len(batch)):
+                yield batch
             if self._progress_dialog:
                 self._progress_dialog.update(steps=min(n, num_items))
 
@@ -65,11 +77,7 @@ class ResourceManager(object):
         function_cache = context.get_function_cache()
 
         refresh = context.refresh_requested()
-        forced_cache = not function_cache.run(
-            client.internet_available,
-            function_cache.ONE_MINUTE * 5,
-            _refresh=refresh,
-        )
+        forced_cache = not client.internet_available()
         refresh = not forced_cache and refresh
 
         updated = []
@@ -127,7 +135,9 @@ class ResourceManager(object):
                                             max_results=50,
                                             notify=notify_and_raise,
                                             raise_exc=notify_and_raise)
-                        for list_of_50 in self._list_batch(to_update, n=50)]
+                        for list_of_50 in self._list_batch(
+                            to_update, n=50, resource='channels',
+                        )]
             if any(new_data):
                 new_data = {
                     yt_item['id']: yt_item
@@ -168,14 +178,9 @@ class ResourceManager(object):
                          defer_cache=False):
         context = self._context
         client = self._client
-        function_cache = context.get_function_cache()
 
         refresh = context.refresh_requested()
-        forced_cache = not function_cache.run(
-            client.internet_available,
-            function_cache.ONE_MINUTE * 5,
-            _refresh=refresh,
-        )
+        forced_cache = not client.internet_available()
         refresh = not forced_cache and refresh
 
         if not refresh and channel_data:
@@ -220,7 +225,9 @@ class ResourceManager(object):
                                             max_results=50,
                                             notify=notify_and_raise,
                                             raise_exc=notify_and_raise)
-                        for list_of_50 in self._list_batch(to_update, n=50)]
+                        for list_of_50 in self._list_batch(
+                            to_update, n=50, resource='channels',
+                        )]
             if any(new_data):
                 new_data = {
                     yt_item['id']: yt_item
@@ -279,7 +286,8 @@ class ResourceManager(object):
                                         or snippet.get('title')
                                         or untitled)
                 channel_info['image'] = get_thumbnail(thumb_size,
-                                                      snippet.get('thumbnails'))
+                                                      snippet.get('thumbnails'),
+                                                      cache=snippet)
             result[key] = channel_info
 
         return result
@@ -289,14 +297,9 @@ class ResourceManager(object):
 
         context = self._context
         client = self._client
-        function_cache = context.get_function_cache()
 
         refresh = context.refresh_requested()
-        forced_cache = not function_cache.run(
-            client.internet_available,
-            function_cache.ONE_MINUTE * 5,
-            _refresh=refresh,
-        )
+        forced_cache = not client.internet_available()
         refresh = not forced_cache and refresh
 
         if refresh or not ids:
@@ -333,7 +336,9 @@ class ResourceManager(object):
                                              max_results=50,
                                              notify=notify_and_raise,
                                              raise_exc=notify_and_raise)
-                        for list_of_50 in self._list_batch(to_update, n=50)]
+                        for list_of_50 in self._list_batch(
+                            to_update, n=50, resource='playlists',
+                        )]
             if any(new_data):
                 new_data = {
                     yt_item['id']: yt_item
@@ -379,15 +384,10 @@ class ResourceManager(object):
 
         context = self._context
         client = self._client
-        function_cache = context.get_function_cache()
 
         refresh = context.refresh_requested()
         forced_cache = (
-                not function_cache.run(
-                    client.internet_available,
-                    function_cache.ONE_MINUTE * 5,
-                    _refresh=refresh,
-                )
+                not client.internet_available()
                 or (context.get_param(CHANNEL_ID) == 'mine'
                     and not client.logged_in)
         )
@@ -564,14 +564,9 @@ class ResourceManager(object):
 
         context = self._context
         client = self._client
-        function_cache = context.get_function_cache()
 
         refresh = context.refresh_requested()
-        forced_cache = not function_cache.run(
-            client.internet_available,
-            function_cache.ONE_MINUTE * 5,
-            _refresh=refresh,
-        )
+        forced_cache = not client.internet_available()
         refresh = not forced_cache and refresh
 
         if refresh or not ids:
@@ -612,7 +607,9 @@ class ResourceManager(object):
                                           max_results=50,
                                           notify=notify_and_raise,
                                           raise_exc=notify_and_raise)
-                        for list_of_50 in self._list_batch(to_update, n=50)]
+                        for list_of_50 in self._list_batch(
+                            to_update, n=50, resource='videos',
+                        )]
             if any(new_data):
                 new_data = {
                     yt_item['id']: yt_item
@@ -662,11 +659,33 @@ class ResourceManager(object):
 
         return result
 
+    def select_thumbnails(self, data):
+        """
+        Selects thumbnails for the resources in data, so that the selections
+        are stored along with the resources and reused from the DataCache.
+        """
+        thumb_size = self._thumb_size
+        thumb_fanart = self._thumb_fanart
+        for yt_item in data.values():
+            if not yt_item or not isinstance(yt_item, dict):
+                continue
+            snippet = yt_item.get('snippet')
+            if not snippet:
+                continue
+            thumbnails = snippet.get('thumbnails')
+            if not thumbnails:
+                continue
+            get_thumbnail(thumb_size, thumbnails, cache=snippet)
+            if thumb_fanart:
+                get_thumbnail(thumb_fanart, thumbnails, cache=snippet)
+
     def cache_data(self, data=None, defer=False):
         if not data:
             return None
 
         incognito = self._incognito
+        if not incognito:
+            self.select_thumbnails(data)
         if not defer and self.log.debugging:
             self.log.debug(
                 (
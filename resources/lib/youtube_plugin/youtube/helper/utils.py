@@ -24,10 +24,9 @@ from operator import (
 from re import (
     compile as re_compile,
     error as re_error,
-    search as re_search,
 )
 
-from ...kodion import logging
+from ...kodion import KodionException, logging
 from ...kodion.compatibility import string_type, unquote, urlsplit
 from ...kodion.constants import (
     CHANNEL_ID,
@@ -247,21 +246,22 @@ def update_channel_items(provider, context, channel_id_dict,
         False
     )
 
-    cxm_unsubscribe_from_channel = menu_items.channel_unsubscribe_from(
-        context,
+    templates = context.get_menu_templates()
+    cxm_unsubscribe_from_channel = templates.get(
+        menu_items.channel_unsubscribe_from,
         subscription_id=menu_items.SUBSCRIPTION_ID_INFOLABEL,
     )
     cxm_subscribe_to_channel = (
-        menu_items.channel_subscribe_to(context)
+        templates.get(menu_items.channel_subscribe_to)
         if logged_in and not in_subscription_list else
         None
     )
-    cxm_filter_remove = menu_items.my_subscriptions_filter_remove(context)
-    cxm_filter_add = menu_items.my_subscriptions_filter_add(context)
+    cxm_filter_remove = templates.get(menu_items.my_subscriptions_filter_remove)
+    cxm_filter_add = templates.get(menu_items.my_subscriptions_filter_add)
     cxm_bookmark_channel = (
         None
         if in_bookmarks_list else
-        menu_items.bookmark_add_channel(context)
+        templates.get(menu_items.bookmark_add_channel)
     )
 
     for channel_id, yt_item in data.items():
@@ -343,12 +343,16 @@ def update_channel_items(provider, context, channel_id_dict,
             channel_item.set_date_from_datetime(local_datetime)
 
         # try to find a better resolution for the image
-        image = get_thumbnail(thumb_size, snippet.get('thumbnails'))
+        image = get_thumbnail(thumb_size,
+                              snippet.get('thumbnails'),
+                              cache=snippet)
         channel_item.set_image(image)
 
         # try to find a better resolution for the fanart
         if thumb_fanart:
-            fanart = get_thumbnail(thumb_fanart, snippet.get('thumbnails'))
+            fanart = get_thumbnail(thumb_fanart,
+                                   snippet.get('thumbnails'),
+                                   cache=snippet)
             channel_item.set_fanart(fanart)
 
         subscription_id = subscription_id_dict.get(channel_id, '')
@@ -444,36 +448,45 @@ def update_playlist_items(provider, context, playlist_id_dict,
     elif path.startswith(PATHS.SAVED_PLAYLISTS):
         in_saved_playlists = True
 
-    cxm_playlist_delete = menu_items.playlist_delete(context)
-    cxm_playlist_rename = menu_items.playlist_rename(context)
-    cxm_watch_later_unassign = menu_items.watch_later_list_unassign(context)
-    cxm_watch_later_assign = menu_items.watch_later_list_assign(context)
-    cxm_history_list_unassign = menu_items.history_list_unassign(context)
-    cxm_history_list_assign = menu_items.history_list_assign(context)
+    templates = context.get_menu_templates()
+    cxm_playlist_delete = templates.get(menu_items.playlist_delete)
+    cxm_playlist_rename = templates.get(menu_items.playlist_rename)
+    cxm_watch_later_unassign = templates.get(
+        menu_items.watch_later_list_unassign
+    )
+    cxm_watch_later_assign = templates.get(menu_items.watch_later_list_assign)
+    cxm_history_list_unassign = templates.get(
+        menu_items.history_list_unassign
+    )
+    cxm_history_list_assign = templates.get(menu_items.history_list_assign)
     cxm_separator = menu_items.separator()
-    cxm_play_playlist = menu_items.playlist_play(context)
-    cxm_play_recently_added = menu_items.playlist_play_recently_added(context)
-    cxm_view_playlist = menu_items.playlist_view(context)
-    cxm_play_shuffled_playlist = menu_items.playlist_shuffle(context)
+    cxm_play_playlist = templates.get(menu_items.playlist_play)
+    cxm_play_recently_added = templates.get(
+        menu_items.playlist_play_recently_added
+    )
+    cxm_view_playlist = templates.get(menu_items.playlist_view)
+    cxm_play_shuffled_playlist = templates.get(menu_items.playlist_shuffle)
     cxm_refresh_listing = menu_items.refresh_listing(context, path, params)
-    cxm_remove_saved_playlist = menu_items.playlist_remove_from_library(context)
+    cxm_remove_saved_playlist = templates.get(
+        menu_items.playlist_remove_from_library
+    )
     cxm_save_playlist = (
-        menu_items.playlist_save_to_library(context)
+        templates.get(menu_items.playlist_save_to_library)
         if logged_in and not (in_my_playlists or in_saved_playlists) else
         None
     )
     cxm_go_to_channel = (
-        menu_items.channel_go_to(context)
+        templates.get(menu_items.channel_go_to)
         if not in_my_playlists else
         None
     )
     cxm_subscribe_to_channel = (
-        menu_items.channel_subscribe_to(context)
+        templates.get(menu_items.channel_subscribe_to)
         if logged_in and not in_my_playlists else
         None
     )
     cxm_bookmark_channel = (
-        menu_items.bookmark_add_channel(context)
+        templates.get(menu_items.bookmark_add_channel)
         if not in_my_playlists else
         None
     )
@@ -554,12 +567,16 @@ def update_playlist_items(provider, context, playlist_id_dict,
             playlist_item.set_date_from_datetime(local_datetime)
 
         # try to find a better resolution for the image
-        image = get_thumbnail(thumb_size, snippet.get('thumbnails'))
+        image = get_thumbnail(thumb_size,
+                              snippet.get('thumbnails'),
+                              cache=snippet)
         playlist_item.set_image(image)
 
         # try to find a better resolution for the fanart
         if thumb_fanart:
-            fanart = get_thumbnail(thumb_fanart, snippet.get('thumbnails'))
+            fanart = get_thumbnail(thumb_fanart,
+                                   snippet.get('thumbnails'),
+                                   cache=snippet)
             playlist_item.set_fanart(fanart)
 
         # update channel mapping
@@ -705,57 +722,58 @@ def update_video_items(provider, context, video_id_dict,
             playlist_id = playlist_match.group(PLAYLIST_ID)
             playlist_channel_id = playlist_match.group(CHANNEL_ID)
 
-    cxm_remove_from_playlist = menu_items.playlist_remove_from(
-        context,
+    templates = context.get_menu_templates()
+    cxm_remove_from_playlist = templates.get(
+        menu_items.playlist_remove_from,
         playlist_id=playlist_id,
     )
     cxm_separator = menu_items.separator()
-    cxm_play = menu_items.media_play(context)
+    cxm_play = templates.get(menu_items.media_play)
     cxm_play_with_subtitles = (
         None
         if subtitles_prompt else
-        menu_items.media_play_with_subtitles(context)
+        templates.get(menu_items.media_play_with_subtitles)
     )
     cxm_play_audio_only = (
         None
         if audio_only else
-        menu_items.media_play_audio_only(context)
+        templates.get(menu_items.media_play_audio_only)
     )
     cxm_play_ask_for_quality = (
         None
         if ask_quality else
-        menu_items.media_play_ask_for_quality(context)
+        templates.get(menu_items.media_play_ask_for_quality)
     )
-    cxm_play_timeshift = menu_items.media_play_timeshift(context)
+    cxm_play_timeshift = templates.get(menu_items.media_play_timeshift)
     cxm_play_using = (
-        menu_items.media_play_using(context)
+        templates.get(menu_items.media_play_using)
         if alternate_player else
         None
     )
-    cxm_play_from = menu_items.playlist_play_from(context, playlist_id)
-    cxm_queue = menu_items.media_queue(context)
-    cxm_watch_later = menu_items.playlist_add_to(
-        context,
+    cxm_play_from = templates.get(menu_items.playlist_play_from, playlist_id)
+    cxm_queue = templates.get(menu_items.media_queue)
+    cxm_watch_later = templates.get(
+        menu_items.playlist_add_to,
         watch_later_id,
         'watch_later',
     )
-    cxm_go_to_channel = menu_items.channel_go_to(context)
-    cxm_unsubscribe_from_channel = menu_items.channel_unsubscribe_from(
-        context,
+    cxm_go_to_channel = templates.get(menu_items.channel_go_to)
+    cxm_unsubscribe_from_channel = templates.get(
+        menu_items.channel_unsubscribe_from,
         channel_id=menu_items.CHANNEL_ID_INFOLABEL,
     )
-    cxm_subscribe_to_channel = menu_items.channel_subscribe_to(context)
-    cxm_remove_bookmarked_channel = menu_items.bookmark_remove(
-        context,
+    cxm_subscribe_to_channel = templates.get(menu_items.channel_subscribe_to)
+    cxm_remove_bookmarked_channel = templates.get(
+        menu_items.bookmark_remove,
         menu_items.CHANNEL_ID_INFOLABEL,
         menu_items.ARTIST_INFOLABEL,
     )
-    cxm_bookmark_channel = menu_items.bookmark_add_channel(context)
-    cxm_mark_as = menu_items.history_local_mark_as(context)
-    cxm_reset_resume = menu_items.history_local_reset_resume(context)
-    cxm_refresh_listing = menu_items.refresh_listing(context)
-    cxm_more = menu_items.video_more_for(
-        context,
+    cxm_bookmark_channel = templates.get(menu_items.bookmark_add_channel)
+    cxm_mark_as = templates.get(menu_items.history_local_mark_as)
+    cxm_reset_resume = templates.get(menu_items.history_local_reset_resume)
+    cxm_refresh_listing = templates.get(menu_items.refresh_listing)
+    cxm_more = templates.get(
+        menu_items.video_more_for,
         logged_in=logged_in,
         refresh=path.startswith((PATHS.LIKED_VIDEOS, PATHS.DISLIKED_VIDEOS)),
     )
@@ -1039,7 +1057,9 @@ def update_video_items(provider, context, video_id_dict,
         if (not image
                 or get_better_thumbs
                 or image.startswith(('Default', 'special://'))):
-            image = get_thumbnail(thumb_size, snippet.get('thumbnails'))
+            image = get_thumbnail(thumb_size,
+                                  snippet.get('thumbnails'),
+                                  cache=snippet)
         if image and media_item.live:
             if '?' in image:
                 image = ''.join((image, '&ct=', thumb_stamp))
@@ -1049,7 +1069,9 @@ def update_video_items(provider, context, video_id_dict,
 
         # try to find a better resolution for the fanart
         if thumb_fanart:
-            fanart = get_thumbnail(thumb_fanart, snippet.get('thumbnails'))
+            fanart = get_thumbnail(thumb_fanart,
+                                   snippet.get('thumbnails'),
+                                   cache=snippet)
             if fanart and media_item.live:
                 if '?' in fanart:
                     fanart = ''.join((fanart, '&ct=', thumb_stamp))
@@ -1319,19 +1341,23 @@ THUMB_TYPES = {
 }
 
 
-def get_thumbnail(thumb_size, thumbnails, default_thumb=None):
-    if not thumbnails:
-        return default_thumb
-    is_dict = isinstance(thumbnails, dict)
-    size_limit = thumb_size['size']
-    ratio_limit = thumb_size['ratio']
+def _select_thumbnail(thumbnails, size_limit, ratio_limit):
+    if ratio_limit:
+        ratio_min = ratio_limit * 0.9
+        ratio_max = ratio_limit * 1.1
+    else:
+        ratio_min = ratio_max = None
 
-    def _sort_ratio_size(thumb):
-        if is_dict:
-            thumb_type, thumb = thumb
-        else:
-            thumb_type = None
+    if isinstance(thumbnails, dict):
+        thumbnails = thumbnails.items()
+    else:
+        thumbnails = [(None, thumb) for thumb in thumbnails]
 
+    # Single pass equivalent of taking the first item of the thumbnails
+    # sorted in descending order of (ratio match, verified, size)
+    selected = None
+    selected_key = None
+    for thumb_type, thumb in thumbnails:
         if 'size' in thumb:
             size = thumb['size']
             ratio = thumb['ratio']
@@ -1341,23 +1367,27 @@ def get_thumbnail(thumb_size, thumbnails, default_thumb=None):
             size = width * height
             ratio = width / height
         elif thumb_type in THUMB_TYPES:
-            thumb = THUMB_TYPES[thumb_type]
-            size = thumb['size']
-            ratio = thumb['ratio']
+            _thumb = THUMB_TYPES[thumb_type]
+            size = _thumb['size']
+            ratio = _thumb['ratio']
         else:
-            return False, False, False
-        return (
-            ratio_limit and ratio_limit * 0.9 <= ratio <= ratio_limit * 1.1,
-            not thumb.get('unverified', False),
-            size <= size_limit and size if size_limit else size,
-        )
+            size = ratio = None
+
+        if size is None:
+            key = (False, False, False)
+        else:
+            key = (
+                ratio_limit and ratio_min <= ratio <= ratio_max,
+                not thumb.get('unverified', False),
+                size <= size_limit and size if size_limit else size,
+            )
+        if selected_key is None or key > selected_key:
+            selected = thumb
+            selected_key = key
 
-    thumbnail = sorted(thumbnails.items() if is_dict else thumbnails,
-                       key=_sort_ratio_size,
-                       reverse=True)[0]
-    url = (thumbnail[1] if is_dict else thumbnail).get('url')
+    url = selected.get('url') if selected else None
     if not url:
-        return default_thumb
+        return None
     if url.startswith('//'):
         url = 'https:' + url
     if '?' in url:
@@ -1372,6 +1402,40 @@ def get_thumbnail(thumb_size, thumbnails, default_thumb=None):
     return url
 
 
+def get_thumbnail(thumb_size, thumbnails, default_thumb=None, cache=None):
+    """
+    Selects the thumbnail url that best matches the requested size and ratio.
+
+    :param thumb_size: dict of maximum size and preferred aspect ratio
+    :param thumbnails: list or dict of thumbnails from the API response
+    :param default_thumb: value returned if no thumbnail url is available
+    :param cache: optional dict containing the thumbnails, typically the
+                  snippet of the resource, in which the selected url for each
+                  size and ratio is stored and reused. Resources are stored in
+                  the DataCache with these selections.
+    :return: thumbnail url, or default_thumb
+    """
+    if not thumbnails:
+        return default_thumb
+    size_limit = thumb_size['size']
+    ratio_limit = thumb_size['ratio']
+
+    if cache is None:
+        url = _select_thumbnail(thumbnails, size_limit, ratio_limit)
+        return url or default_thumb
+
+    key = '{0}:{1:.4f}'.format(size_limit, ratio_limit)
+    selected = cache.get('_thumbnails')
+    if selected is None:
+        selected = {}
+        cache['_thumbnails'] = selected
+    elif key in selected:
+        return selected[key] or default_thumb
+    url = _select_thumbnail(thumbnails, size_limit, ratio_limit)
+    selected[key] = url
+    return url or default_thumb
+
+
 def add_related_video_to_playlist(provider, context, client, v3, video_id):
     playlist_player = context.get_playlist_player()
     if playlist_player.size() > 999:
@@ -1436,13 +1500,15 @@ def filter_videos(items,
                   **_kwargs):
     accepted = []
     rejected = []
+    if custom and not callable(custom):
+        custom = compile_filter(custom)
     for item in items:
         rejected_reason = None
         if item.callback and not item.callback():
             rejected_reason = 'Item callback'
         elif callback and not callback(item):
             rejected_reason = 'Collection callback'
-        elif custom and not filter_parse(item, custom):
+        elif custom and not custom(item):
             rejected_reason = 'Custom filter'
         elif item.playable:
             if exclude and item.video_id in exclude:
@@ -1470,74 +1536,149 @@ def filter_videos(items,
     return accepted, rejected
 
 
-def filter_parse(item,
-                 all_criteria,
-                 criteria_re=re_compile(
-                     r'{?{([^}]+)}{([^}]+)}{([^}]+)}}?'
-                 ),
-                 op_map={
-                     '=': op_eq,
-                     '==': op_eq,
-                     '>': op_gt,
-                     '>=': op_ge,
-                     '<': op_lt,
-                     '<=': op_le,
-                     'contains': op_contains,
-                     'endswith': str.endswith,
-                     'startswith': str.startswith,
-                     'search': re_search,
-                 },
-                 _none=lambda: None):
-    criteria_met = False
-    for idx, criteria in enumerate(all_criteria):
-        if isinstance(criteria, string_type):
-            criteria = criteria_re.findall(criteria)
-            all_criteria[idx] = criteria
-        for input_1, op_str, input_2 in criteria:
-            try:
-                if input_1.startswith('.'):
-                    input_1 = getattr(item, input_1[1:], None)
-                else:
-                    input_1 = getattr(item, 'get_{0}'.format(input_1), _none)()
-
-                if input_2.startswith('"'):
-                    input_2 = unquote(input_2[1:-1])
-                    if input_1 is None:
-                        input_1 = ''
-                    elif isinstance(input_1, (dt_date, dt_datetime)):
-                        input_2 = parse_to_dt(input_2)
-                else:
-                    input_2 = float(input_2)
-                    if input_1 is None:
-                        input_1 = -1
-
-                _, negate, op_str = op_str.rpartition('!')
-                op = op_map.get(op_str)
-                if not op:
-                    break
-                if op_str == 'search':
-                    input_1, input_2 = input_2, input_1
+def _compile_condition(condition,
+                       op_map={
+                           '=': op_eq,
+                           '==': op_eq,
+                           '>': op_gt,
+                           '>=': op_ge,
+                           '<': op_lt,
+                           '<=': op_le,
+                           'contains': op_contains,
+                           'endswith': str.endswith,
+                           'startswith': str.startswith,
+                           'search': None,
+                       },
+                       _none=lambda: None):
+    input_1, op_str, input_2 = condition
+    try:
+        _, negate, op_str = op_str.rpartition('!')
+        if op_str not in op_map:
+            raise ValueError('Unknown operator')
+        op = op_map[op_str]
+
+        if input_1.startswith('.'):
+            attr = input_1[1:]
+            getter = None
+        else:
+            attr = None
+            getter = 'get_{0}'.format(input_1)
+
+        if input_2.startswith('"'):
+            value = unquote(input_2[1:-1])
+            default = ''
+            if op_str == 'search':
+                pattern = re_compile(value)
+                op = lambda _input, _value: pattern.search(_input)
+        else:
+            value = float(input_2)
+            default = -1
+            if op_str == 'search':
+                raise ValueError('Invalid search pattern')
+    except (AttributeError, TypeError, ValueError, re_error):
+        logging.exception(('Invalid criteria',
+                           'Criteria: {criteria!r}'),
+                          criteria=condition)
+        return None
+
+    state = {
+        'value_dt': None,
+        'logged': False,
+    }
 
-                result = op(input_1, input_2)
-                if negate:
-                    result = not result
-                if not result:
-                    break
-            except (AttributeError, TypeError, ValueError, re_error):
+    def _predicate(item):
+        if getter:
+            _input = getattr(item, getter, _none)()
+        else:
+            _input = getattr(item, attr, None)
+        _value = value
+        if _input is None:
+            _input = default
+        try:
+            if default == '' and isinstance(_input, (dt_date, dt_datetime)):
+                value_dt = state['value_dt']
+                if value_dt is None:
+                    value_dt = state['value_dt'] = parse_to_dt(value)
+                _value = value_dt
+            result = op(_input, _value)
+        except (AttributeError, TypeError, ValueError, re_error,
+                KodionException):
+            if not state['logged']:
+                state['logged'] = True
                 logging.exception(('Error',
                                    'Criteria: {criteria!r}',
                                    'input_1:  {input_1!r}',
-                                   'op:       {op_str!r}',
                                    'input_2:  {input_2!r}'),
-                                  criteria=criteria,
-                                  input_1=input_1,
-                                  op_str=op_str,
-                                  input_2=input_2)
-                break
-        else:
-            criteria_met = True
+                                  criteria=condition,
+                                  input_1=_input,
+                                  input_2=_value)
+            return False
+        return not result if negate else bool(result)
+
+    return _predicate
+
+
+def compile_filter(all_criteria,
+                   criteria_re=re_compile(
+                       r'{?{([^}]+)}{([^}]+)}{([^}]+)}}?'
+                   ),
+                   _cache={}):
+    """
+    Compiles custom filter criteria into a predicate function. Criteria are
+    met if all conditions in any of the criteria are met. Compiled predicates
+    are memoised, so invalid criteria are only reported once.
+
+    :param all_criteria: iterable of criteria, each either a filter string
+                         of the form {input_1}{op}{input_2}..., or a sequence
+                         of (input_1, op, input_2) conditions
+    :return: function taking an item, returning True if criteria are met,
+             or None if the criteria are always met
+    """
+    key = tuple([
+        criteria
+        if isinstance(criteria, string_type) else
+        tuple([tuple(condition) for condition in criteria])
+        for criteria in all_criteria
+    ])
+    if key in _cache:
+        return _cache[key]
+
+    compiled_criteria = []
+    for criteria in key:
+        if isinstance(criteria, string_type):
+            criteria = criteria_re.findall(criteria)
+        # Empty criteria are always met
+        if not criteria:
+            compiled_criteria = None
             break
-    return criteria_met
+        conditions = [
+            _compile_condition(condition)
+            for condition in criteria
+        ]
+        # Criteria with invalid conditions can never be met
+        if all(conditions):
+            compiled_criteria.append(tuple(conditions))
+
+    def predicate(item):
+        for conditions in compiled_criteria:
+            for condition in conditions:
+                if not condition(item):
+                    break
+            else:
+                return True
+        return False
+
+    if compiled_criteria is None:
+        predicate = None
+    if len(_cache) >= 32:
+        _cache.clear()
+    _cache[key] = predicate
+    return predicate
+
+
+def filter_parse(item, all_criteria):
+    predicate = compile_filter(all_criteria)
+    return predicate(item) if predicate else True
 
 
 def update_duplicate_items(updated_item,
@@ -1552,14 +1693,10 @@ def update_duplicate_items(updated_item,
                                                 '_track_number',
                                                 '_uri')),
                            skip_vals=(None, '', -1)):
-    updates = {
-        key: val
-        for key, val in updated_item.__dict__.items()
-        if key not in skip_keys and val not in skip_vals
-    }
+    updates = updated_item.get_fields(skip_keys, skip_vals)
     for item in items:
         if item != updated_item:
-            item.__dict__.update(updates)
+            item.set_fields(updates)
         if context_menu:
             item.add_context_menu(context_menu)
 
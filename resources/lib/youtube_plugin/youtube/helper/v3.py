@@ -44,6 +44,7 @@ from ...kodion.constants import (
     PLAYLIST_ID,
     VIDEO_ID,
 )
+from ...kodion.debug import Timings
 from ...kodion.items import (
     BookmarkItem,
     CommandItem,
@@ -77,6 +78,8 @@ def _process_list_response(provider,
         log.warning('Items list is empty')
         return None
 
+    timings = Timings('List response', enabled=log.debugging)
+
     yt_items_dict = {}
     new_video_id_dict = {}
     new_playlist_id_dict = {}
@@ -97,7 +100,10 @@ def _process_list_response(provider,
     }
 
     settings = context.get_settings()
-    thumb_re = re_compile(r'[^/._]+(?=[^/.]*?\.(?:jpg|webp))')
+    # Name of the thumbnail image, matched without backtracking so that long
+    # URLs without an image extension, like channel avatars, fail quickly
+    thumb_re = re_compile(r'(?<![^/._])(?=([^/._]+))\1'
+                          r'(?=[^/.]*\.(?:jpg|webp))')
     thumb_size = settings.get_thumbnail_size()
     fanart_type = params.get(FANART_TYPE)
     if fanart_type is None:
@@ -108,6 +114,7 @@ def _process_list_response(provider,
         fanart_type = False
     ui = context.get_ui()
     untitled = context.localize('untitled')
+    cxm_search_sort_by = None
 
     for yt_item in yt_items:
         if not yt_item:
@@ -195,14 +202,17 @@ def _process_list_response(provider,
             else:
                 item_id = None
             if item_id:
-                yt_item['_context_menu'] = {
-                    'context_menu': (
+                # Same for all search results, so only create once
+                if cxm_search_sort_by is None:
+                    cxm_search_sort_by = (
                         menu_items.search_sort_by(context, params, 'relevance'),
                         menu_items.search_sort_by(context, params, 'date'),
                         menu_items.search_sort_by(context, params, 'viewCount'),
                         menu_items.search_sort_by(context, params, 'rating'),
                         menu_items.search_sort_by(context, params, 'title'),
-                    ),
+                    )
+                yt_item['_context_menu'] = {
+                    'context_menu': cxm_search_sort_by,
                     'position': 0,
                 }
             else:
@@ -524,6 +534,8 @@ def _process_list_response(provider,
 
         items.append(item)
 
+    timings.mark('Item creation')
+
     if progress_dialog:
         delta = (len(new_video_id_dict)
                  + len(new_channel_id_dict)
@@ -628,7 +640,9 @@ def _process_list_response(provider,
         thread_id = threading.current_thread().ident
         active_thread_ids.add(thread_id)
         try:
-            data = resource['fetcher'](*resource['args'], **resource['kwargs'])
+            fetcher = resource['fetcher']
+            with timings(fetcher.__name__):
+                data = fetcher(*resource['args'], **resource['kwargs'])
 
             updater = resource['updater']
             if not updater:
@@ -639,7 +653,8 @@ def _process_list_response(provider,
                 return
             kwargs['data'] = data
 
-            updater(*resource['upd_args'], **kwargs)
+            with timings(updater.__name__):
+                updater(*resource['upd_args'], **kwargs)
         except Exception:
             log.exception('Error')
         finally:
@@ -705,6 +720,7 @@ def _process_list_response(provider,
         resource['thread'] = new_thread
         new_thread.start()
 
+    timings.log_stats(count=len(items))
     return items, do_callbacks
 
 
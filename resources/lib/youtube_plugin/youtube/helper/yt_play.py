@@ -43,6 +43,7 @@ from ...kodion.constants import (
     VIDEO_ID,
     VIDEO_IDS,
 )
+from ...kodion.debug import Timings
 from ...kodion.items import AudioItem, UriItem, VideoItem
 from ...kodion.network import get_connect_address
 from ...kodion.utils.datetime import datetime_to_since
@@ -100,13 +101,19 @@ def _play_stream(provider, context):
             logging.debug('No streams found')
             return False
 
-        stream = _select_stream(
-            context,
-            streams,
-            ask_for_quality=ask_for_quality,
-            audio_only=audio_only,
-            use_mpd=use_mpd,
-        )
+        # Selection is not timed if the user is prompted to select a stream
+        timings = Timings('Play stream',
+                          enabled=logging.debugging and not ask_for_quality,
+                          trace=not ask_for_quality)
+        with timings('Stream selection'):
+            stream = _select_stream(
+                context,
+                streams,
+                ask_for_quality=ask_for_quality,
+                audio_only=audio_only,
+                use_mpd=use_mpd,
+            )
+        timings.log_stats()
         if stream is None:
             return False
 
@@ -174,7 +181,8 @@ def _play_stream(provider, context):
         'start_time': start_time,
         'end_time': end_time,
         'clip': params.get('clip', False),
-        'refresh_only': screensaver
+        'refresh_only': screensaver,
+        'pending_subtitles': metadata.get('pending_subtitles'),
     }
 
     ui.set_property(PLAYER_DATA,
@@ -212,6 +220,19 @@ def _play_playlist(provider, context):
     resource_manager = provider.get_resource_manager(context)
     ui = context.get_ui()
 
+    if playlist_ids and action != 'list':
+        result = _play_playlist_pages(provider,
+                                      context,
+                                      resource_manager,
+                                      playlist_ids,
+                                      action)
+        if result is not None:
+            return result, {
+                provider.CACHE_TO_DISC: False,
+                provider.FORCE_RESOLVE: True,
+                provider.UPDATE_LISTING: True,
+            }
+
     with ui.create_progress_dialog(
             heading=context.localize('playlist.progress.updating'),
             message=context.localize('please_wait'),
@@ -271,6 +292,114 @@ def _play_playlist(provider, context):
         return result, options
 
 
+def _play_playlist_pages(provider,
+                         context,
+                         resource_manager,
+                         playlist_ids,
+                         action):
+    """
+    Plays or queues the first page of the playlist(s) as soon as it has been
+    retrieved. Remaining pages are then added to the Kodi playlist, one page
+    at a time, by a background thread.
+
+    Only used if the playlist is played from the start in the default order.
+    Returns None if this is not possible, in which case the complete playlist
+    should be loaded before being played.
+    """
+    params = context.get_params()
+    if params.get(VIDEO_ID) is not None:
+        return None
+
+    recent_days = params.get('recent_days')
+    order = params.get(ORDER)
+    if not order and recent_days is None:
+        order = 'ask'
+
+    playlist_id = playlist_ids[0]
+    json_data = resource_manager.get_playlist_items(batch_id=(playlist_id, 0))
+    if not json_data:
+        return None
+    page_token = json_data.get('nextPageToken')
+    if not page_token and len(playlist_ids) == 1:
+        return None
+
+    if order == 'ask':
+        order = _select_order(context)
+        # Don't ask again if all pages need to be loaded instead
+        context.set_params(**{ORDER: order})
+    if order in {'reverse', 'shuffle'}:
+        return None
+
+    items = v3.response_to_items(provider,
+                                 context,
+                                 json_data,
+                                 process_next_page=False,
+                                 hide_progress=True)
+    result = process_items_for_playlist(context,
+                                        items,
+                                        action=action,
+                                        play_from='start',
+                                        order='default',
+                                        recent_days=recent_days)
+    if result is False:
+        return None
+
+    remaining = [(playlist_id, page_token)] if page_token else []
+    remaining.extend((_playlist_id, 0) for _playlist_id in playlist_ids[1:])
+    provider.run_background_task(_queue_playlist_pages,
+                                 context,
+                                 remaining,
+                                 recent_days)
+    return result
+
+
+def _queue_playlist_pages(provider,
+                          context,
+                          stop_event,
+                          batch_ids,
+                          recent_days=None):
+    playlist_player = context.get_playlist_player()
+    num_items = playlist_player.size()
+    recent_limit = recent_days * 24 * 60 * 60 if recent_days else None
+    resource_manager = provider.get_resource_manager(context)
+
+    for playlist_id, page_token in batch_ids:
+        while 1:
+            if stop_event.is_set() or context.abort_requested():
+                return
+            json_data = resource_manager.get_playlist_items(
+                batch_id=(playlist_id, page_token),
+            )
+            if not json_data:
+                break
+            items = v3.response_to_items(provider,
+                                         context,
+                                         json_data,
+                                         process_next_page=False,
+                                         hide_progress=True)
+            if stop_event.is_set():
+                return
+            # Stop if the playlist has been cleared or replaced
+            if playlist_player.size() < num_items:
+                logging.debug('Playlist changed - stopped adding items')
+                return
+            for item in items:
+                if not item.playable:
+                    continue
+                if (recent_limit and datetime_to_since(
+                        context,
+                        item.get_dateadded(),
+                        as_seconds=True,
+                ) > recent_limit):
+                    continue
+                playlist_player.add(item)
+                num_items += 1
+            page_token = json_data.get('nextPageToken')
+            if not page_token:
+                break
+    logging.debug('Playlist loaded - {num} items', num=num_items)
+
+
 def _play_channel_live(provider, context):
     channel_id = context.get_param(CHANNEL_ID)
     _, json_data = provider.get_client(context).search_with_params(params={
@@ -376,6 +505,20 @@ def _select_stream(context,
     return stream_list[selected_stream]
 
 
+def _select_order(context, order_list=('default', 'reverse', 'shuffle')):
+    selection_list = [
+        (context.localize('playlist.play.%s' % order), order)
+        for order in order_list
+    ]
+    order = context.get_ui().on_select(
+        context.localize('playlist.play.select'),
+        selection_list,
+    )
+    if order not in order_list:
+        order = 'default'
+    return order
+
+
 def process_items_for_playlist(context,
                                items,
                                action=None,
@@ -398,17 +541,7 @@ def process_items_for_playlist(context,
         if not order and play_from is None and recent_days is None:
             order = 'ask'
         if order == 'ask':
-            order_list = ('default', 'reverse', 'shuffle')
-            selection_list = [
-                (context.localize('playlist.play.%s' % order), order)
-                for order in order_list
-            ]
-            order = context.get_ui().on_select(
-                context.localize('playlist.play.select'),
-                selection_list,
-            )
-            if order not in order_list:
-                order = 'default'
+            order = _select_order(context)
 
         # reverse the list
         if order == 'reverse':
@@ -300,7 +300,10 @@ def _process_select_playlist(provider, context):
                     snippet.get('description', ''),
                     playlist_id,
                     get_thumbnail(
-                        thumb_size, snippet.get('thumbnails'), default_thumb
+                        thumb_size,
+                        snippet.get('thumbnails'),
+                        default_thumb,
+                        cache=snippet,
                     )
                 ))
 
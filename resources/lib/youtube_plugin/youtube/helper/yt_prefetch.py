@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+
+    Copyright (C) 2025 plugin.video.youtube
+
+    SPDX-License-Identifier: GPL-2.0-only
+    See LICENSES/GPL-2.0-only for more information.
+"""
+
+from __future__ import absolute_import, division, unicode_literals
+
+from . import v3
+from ...kodion import logging
+from ...kodion.constants import CHANNEL_ID, PLAYLIST_ID
+
+
+_log = logging.getLogger(__name__)
+
+
+def _warm_listing(provider, context, json_data):
+    if not json_data:
+        return False
+    # Run the response through the same pipeline used for listings so that
+    # video, channel and playlist details are stored in the DataCache
+    v3.response_to_items(
+        provider,
+        context,
+        json_data,
+        process_next_page=False,
+        hide_progress=True,
+    )
+    return True
+
+
+def _warm_my_subscriptions(provider, context, client):
+    # Stale feeds (older than the FeedHistory TTL) are re-fetched and stored
+    json_data = client.get_my_subscriptions(page_token=1)
+    return _warm_listing(provider, context, json_data)
+
+
+def _warm_home(provider, context, client, ttl):
+    function_cache = context.get_function_cache()
+    # Same cache signature as yt_specials._process_related_videos, but with a
+    # shorter TTL so the cached result is renewed before the listing expires it
+    json_data = function_cache.run(
+        client.get_related_for_home,
+        ttl,
+    )
+    return _warm_listing(provider, context, json_data)
+
+
+def _warm_playlist(provider, context, playlist_id):
+    if not playlist_id:
+        return False
+    context = context.clone(new_params={
+        CHANNEL_ID: 'mine',
+        PLAYLIST_ID: playlist_id,
+    })
+    resource_manager = provider.get_resource_manager(context)
+    json_data = resource_manager.get_playlist_items(batch_id=(playlist_id, 0))
+    return _warm_listing(provider, context, json_data)
+
+
+def warm_cache(provider, context, abort_check=None, log=_log):
+    """
+    Pre-fetches the first page of the most commonly used feeds, so that the
+    first visit to these listings is served from the cache.
+
+    :param provider: Provider instance
+    :param context: context used for the cache and client, without params
+    :param abort_check: callable returning True if warming should stop
+    :return: number of feeds that were refreshed, or None if aborted
+    """
+    client = provider.get_client(context)
+    if not client.internet_available(notify=False):
+        log.debug('Skipped - no internet connection')
+        return None
+
+    settings = context.get_settings()
+    function_cache = context.get_function_cache()
+    access_manager = context.get_access_manager()
+    logged_in = client.logged_in
+
+    steps = []
+    if settings.get_bool(settings.SHOW_MY_SUBSCRIPTIONS, True):
+        steps.append(('my_subscriptions', _warm_my_subscriptions, (
+            provider, context, client,
+        )))
+    if settings.get_bool(settings.SHOW_RELATED, True):
+        steps.append(('home', _warm_home, (
+            provider, context, client, 3 * function_cache.ONE_HOUR // 4,
+        )))
+    if logged_in:
+        if settings.get_bool(settings.SHOW_WATCH_LATER, True):
+            steps.append(('watch_later', _warm_playlist, (
+                provider, context, access_manager.get_watch_later_id(),
+            )))
+        if settings.get_bool(settings.SHOW_HISTORY, True):
+            steps.append(('history', _warm_playlist, (
+                provider, context, access_manager.get_watch_history_id(),
+            )))
+
+    num_warmed = 0
+    for name, step, args in steps:
+        if abort_check and abort_check():
+            log.debug('Aborted')
+            return None
+        try:
+            if step(*args):
+                num_warmed += 1
+                log.debug('Refreshed: %s', name)
+        except Exception:
+            log.exception('Failed: %s', name)
+    return num_warmed
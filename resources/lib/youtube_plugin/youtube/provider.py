@@ -11,8 +11,11 @@
 from __future__ import absolute_import, division, unicode_literals
 
 from atexit import register as atexit_register
+from copy import copy
 from functools import partial
 from re import compile as re_compile
+from threading import Event, Thread
+from time import time
 from weakref import proxy
 
 from .client import YouTubePlayerClient
@@ -24,6 +27,7 @@ from .helper import (
     yt_login,
     yt_play,
     yt_playlist,
+    yt_prefetch,
     yt_setup_wizard,
     yt_specials,
     yt_subscriptions,
@@ -76,6 +80,7 @@ class Provider(AbstractProvider):
         super(Provider, self).__init__()
         self._resource_manager = None
         self._client = None
+        self._background_task = None
 
         self.on_video_x = self.register_path(r''.join((
             '^',
@@ -254,7 +259,11 @@ class Provider(AbstractProvider):
         ) = access_manager.get_refresh_tokens(dev_id)
 
         if num_access_tokens and client.logged_in:
-            self.log.debug('User is %s logged in', client.logged_in)
+            if client.access_tokens_changed(access_tokens):
+                self.log.debug('Access tokens changed - updating client')
+                client.set_access_token(access_tokens, replace=True)
+            else:
+                self.log.debug('User is %s logged in', client.logged_in)
             return client
         if num_access_tokens or num_refresh_tokens:
             self.log.debug(('# Access tokens:  %d',
@@ -264,61 +273,125 @@ class Provider(AbstractProvider):
         else:
             self.log.debug('User is not logged in')
             access_manager.update_access_token(dev_id, access_token='')
+            if client.logged_in:
+                client.set_access_token(None)
             return client
 
         # create new access tokens
         with client:
-            function_cache = context.get_function_cache()
-            if not function_cache.run(
-                    client.internet_available,
-                    function_cache.ONE_MINUTE * 5,
-                    _refresh=refresh or context.refresh_requested(),
+            if not client.internet_available(
+                    refresh=refresh or context.refresh_requested(),
             ):
                 num_refresh_tokens = 0
             if num_refresh_tokens and num_access_tokens != num_refresh_tokens:
-                access_tokens = [None, None, None, None]
-                token_expiry = 0
-                try:
-                    for token_type, value in enumerate(refresh_tokens):
-                        if not value:
-                            continue
+                access_tokens = self._refresh_access_tokens(
+                    context,
+                    client,
+                    access_manager,
+                    dev_id,
+                    refresh_tokens,
+                )
+            client.set_access_token(access_tokens, replace=True)
+        return client
 
-                        json_data = client.refresh_token(token_type, value)
-                        if not json_data:
-                            continue
+    def _refresh_access_tokens(self,
+                               context,
+                               client,
+                               access_manager,
+                               dev_id,
+                               refresh_tokens):
+        access_tokens = [None, None, None, None]
+        token_expiry = 0
+        try:
+            for token_type, value in enumerate(refresh_tokens):
+                if not value:
+                    continue
 
-                        token = json_data.get('access_token')
-                        expiry = int(json_data.get('expires_in', 3600))
-                        if token and expiry > 0:
-                            access_tokens[token_type] = token
-                            if not token_expiry or expiry < token_expiry:
-                                token_expiry = expiry
-
-                    if any(access_tokens) and token_expiry:
-                        access_manager.update_access_token(
-                            dev_id,
-                            access_token=access_tokens,
-                            expiry=token_expiry,
-                        )
-                    else:
-                        raise InvalidGrant('Failed to refresh access token(s)')
-
-                except (InvalidGrant, LoginException) as exc:
-                    self.handle_exception(context, exc)
-                    # reset access token
-                    # reset refresh token if InvalidGrant otherwise leave as-is
-                    # to retry later
-                    if isinstance(exc, InvalidGrant):
-                        refresh_token = ''
-                    else:
-                        refresh_token = None
-                    access_manager.update_access_token(
-                        dev_id,
-                        access_token='',
-                        refresh_token=refresh_token,
-                    )
-            client.set_access_token(access_tokens)
-        return client
+                json_data = client.refresh_token(token_type, value)
+                if not json_data:
+                    continue
+
+                token = json_data.get('access_token')
+                expiry = int(json_data.get('expires_in', 3600))
+                if token and expiry > 0:
+                    access_tokens[token_type] = token
+                    if not token_expiry or expiry < token_expiry:
+                        token_expiry = expiry
+
+            if any(access_tokens) and token_expiry:
+                access_manager.update_access_token(
+                    dev_id,
+                    access_token=access_tokens,
+                    expiry=token_expiry,
+                )
+            else:
+                raise InvalidGrant('Failed to refresh access token(s)')
+
+        except (InvalidGrant, LoginException) as exc:
+            self.handle_exception(context, exc)
+            # reset access token
+            # reset refresh token if InvalidGrant otherwise leave as-is
+            # to retry later
+            if isinstance(exc, InvalidGrant):
+                refresh_token = ''
+            else:
+                refresh_token = None
+            access_manager.update_access_token(
+                dev_id,
+                access_token='',
+                refresh_token=refresh_token,
+            )
+        return access_tokens
+
+    def refresh_access_tokens(self, context, expiry_margin=300):
+        """
+        Refreshes the access tokens of the current user if they will expire
+        within expiry_margin seconds. Used by the service so that the tokens
+        are refreshed in the background, before they expire, rather than when
+        a listing or playback is requested. Plugin invocations obtain the new
+        tokens from the access manager data held by the service.
+
+        :return: seconds until the access tokens expire, or None if there are
+                 no refresh tokens
+        """
+        access_manager = context.get_access_manager()
+        # Tokens may have been updated by a plugin invocation
+        access_manager.load()
+
+        client = self.get_client(context)
+
+        (
+            refresh_tokens,
+            num_refresh_tokens,
+        ) = access_manager.get_refresh_tokens()
+        if not num_refresh_tokens:
+            return None
+        (
+            _,
+            num_access_tokens,
+            expiry_timestamp,
+        ) = access_manager.get_access_tokens()
+        remaining = expiry_timestamp - time()
+        if num_access_tokens and remaining > expiry_margin:
+            return remaining
+
+        with client:
+            if not client.internet_available():
+                return remaining
+            self.log.debug('Refreshing access tokens - Expires in %ds',
+                           remaining)
+            access_tokens = self._refresh_access_tokens(
+                context,
+                client,
+                access_manager,
+                None,
+                refresh_tokens,
+            )
+            client.set_access_token(access_tokens, replace=True)
+        return access_manager.get_access_tokens()[2] - time()
+
+    def warm_cache(self, context, abort_check=None):
+        return yt_prefetch.warm_cache(self, context, abort_check)
 
     def get_resource_manager(self, context, progress_dialog=None):
         resource_manager = self._resource_manager
@@ -337,6 +410,50 @@ class Provider(AbstractProvider):
             resource_manager.update_progress_dialog(progress_dialog)
         return resource_manager
 
+    def detach(self, context):
+        """
+        Returns a copy of the provider, with its own client and resource
+        manager, bound to context. The client is only updated when first used
+        by the copy, so that any requests are made by the copy.
+        """
+        client = self._client
+        provider = copy(self)
+        provider._client = client.clone(context) if client else None
+        provider._resource_manager = None
+        provider._background_task = None
+        return provider
+
+    def run_background_task(self, target, context, *args):
+        """
+        Runs target(provider, context, stop_event, *args) in a daemon thread,
+        stopping any background task that is already running.
+
+        The plugin interpreter is reused, so the provider, its client, and the
+        context are re-initialised by the next invocation while the task may
+        still be running. The task is therefore run with a detached provider
+        and a clone of the context. The task should return once stop_event is
+        set.
+        """
+        self.stop_background_task()
+        context = context.clone()
+        stop_event = Event()
+        thread = Thread(target=target,
+                        args=(self.detach(context), context, stop_event) + args)
+        thread.daemon = True
+        self._background_task = (thread, stop_event)
+        thread.start()
+        return thread
+
+    def stop_background_task(self, timeout=None):
+        task = self._background_task
+        if not task:
+            return
+        self._background_task = None
+        thread, stop_event = task
+        stop_event.set()
+        if timeout:
+            thread.join(timeout)
+
     @AbstractProvider.register_path('^/uri2addon/?$')
     @staticmethod
     def on_uri2addon(provider, context, uri=None, **_kwargs):
@@ -2251,6 +2368,7 @@ class Provider(AbstractProvider):
         return True
 
     def tear_down(self):
+        self.stop_background_task(timeout=1)
         attrs = (
             '_resource_manager',
             '_client',